@@ -0,0 +1,18 @@
+from pathlib import Path
+import pickle
+
+from gedcom.tree import FamilyTree
+
+
+def write_to_cache(ft: FamilyTree, output_folder: Path):
+    cache_file = Path(output_folder) / "cache.pkl"
+    with open(cache_file, "wb") as f:
+        pickle.dump(ft, f)
+
+
+def load_from_cache(output_folder: Path) -> FamilyTree | None:
+    cache_file = Path(output_folder) / "cache.pkl"
+    if cache_file.exists():
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    return None
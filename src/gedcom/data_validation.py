@@ -1,7 +1,10 @@
 from datetime import datetime
 from collections import defaultdict
+from gedcom.duplicates import find_duplicates
 from gedcom.tree import FamilyTree
 
+MAX_DUPLICATES = 200  # merge candidates listed in the report, best first
+
 
 def validate_family_tree(family_tree: FamilyTree) -> dict:
     """
@@ -72,16 +75,20 @@ def validate_family_tree(family_tree: FamilyTree) -> dict:
                 f"Person {person_id} is not linked to any family."
             )
 
-    # Duplicate or Conflicting Records
-    person_data = defaultdict(list)
-    for person_id, person in family_tree.persons.items():
-        key = (person.name, person.birthday, person.death)
-        person_data[key].append(person_id)
-    for key, ids in person_data.items():
-        if len(ids) > 1:
-            issues["Duplicate Records"].append(
-                f"Duplicate individuals found: {', '.join(ids)}."
-            )
+    # Duplicate Records, ranked as merge candidates
+    candidates = find_duplicates(family_tree)
+    for score, a, b, reasons in candidates[:MAX_DUPLICATES]:
+        # Only people with a name are compared
+        name_a = (family_tree.persons[a].name or "").strip()
+        name_b = (family_tree.persons[b].name or "").strip()
+        issues["Duplicate Records"].append(
+            f"{a} ({name_a}) and {b} ({name_b}) may be the same person, "
+            f"{score:.0%} alike: {', '.join(reasons)}."
+        )
+    if len(candidates) > MAX_DUPLICATES:
+        issues["Duplicate Records"].append(
+            f"{len(candidates) - MAX_DUPLICATES:,} more pairs are less alike."
+        )
 
     # Invalid or Highly Unusual Date Ranges
     for person_id, person in family_tree.persons.items():
@@ -184,7 +191,6 @@ def generate_validation_html(family_tree: FamilyTree) -> str:
                 if category in [
                     "Broken Links",
                     "Unlinked Individuals",
-                    "Duplicate Records",
                 ]:
                     sorted_problems = sorted(
                         problems, key=lambda x: extract_sortable_name(x)
@@ -0,0 +1,301 @@
+import functools
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from gedcom.fact import GedcomTag
+from gedcom.person import Person
+from gedcom.privacy import LIVING
+from gedcom.sex import Sex
+from gedcom.timeline import extract_year
+from gedcom.tree import FamilyTree
+
+MIN_SCORE = 0.8  # pairs scoring lower are not reported
+MAX_UNCONFIRMED_SCORE = 0.75  # highest score when no date or place agrees
+MIN_NAME_SCORE = 0.7  # pairs whose given names are less alike are not scored at all
+MAX_BLOCK = 50  # blocks up to this size compare every pair
+WINDOW = 20  # in larger blocks each person is compared with the next WINDOW people
+
+# How much each piece of evidence counts, if both people have it
+WEIGHTS = {
+    "given name": 3,
+    "surname": 1,
+    "birth": 2,
+    "death": 2,
+    "birth place": 1,
+    "death place": 1,
+    "parents": 2,
+}
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def _letters(text: str) -> str:
+    """Upper case ASCII letters only, with accents taken off."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text.upper() if "A" <= c <= "Z")
+
+
+def soundex(name: str) -> str:
+    """American Soundex, e.g. "R163" for both Robert and Rupert, "" without letters."""
+    letters = _letters(name)
+    if not letters:
+        return ""
+    code = letters[0]
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W don't separate two letters with the same code, vowels do
+        if c not in "HW":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def split_name(person: Person) -> tuple[str, str]:
+    """(given names, surname) from the /Surname/ of the first GEDCOM name, or else the
+    last word of the name."""
+    for name in person.gedcom_names:
+        if name.count("/") >= 2:
+            given, surname, rest = name.split("/", 2)
+            return " ".join((given + rest).split()), surname.strip()
+    words = (person.name or "").split()
+    if len(words) < 2:
+        return " ".join(words), ""
+    return " ".join(words[:-1]), words[-1]
+
+
+def _norm(text: str | None) -> str:
+    """Letters and digits of each word, e.g. "LEOPOLD II" for "Leopold_II"."""
+    text = unicodedata.normalize("NFKD", (text or "").replace("_", " "))
+    words = ("".join(c for c in w if c.isascii() and c.isalnum()) for w in text.split())
+    return " ".join(w for w in words if w).upper()
+
+
+def _numbers(given: str) -> list[str]:
+    """Numbers and regnal numerals in a name, e.g. ["2"] for Son_2."""
+    return [w for w in given.split() if w.isdigit() or not w.strip("IVX")]
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _similar(text_a: str, text_b: str) -> float:
+    """difflib's ratio, or 0 as soon as the cheaper upper bounds are below
+    MIN_NAME_SCORE. Names repeat a lot, so the ratios are cached."""
+    if text_a == text_b:
+        return 1.0
+    matcher = SequenceMatcher(None, text_a, text_b)
+    if matcher.real_quick_ratio() < MIN_NAME_SCORE:
+        return 0.0
+    if matcher.quick_ratio() < MIN_NAME_SCORE:
+        return 0.0
+    return matcher.ratio()
+
+
+def _place(person: Person, tag: GedcomTag) -> str:
+    for fact in person.facts:
+        if fact.tag == tag:
+            for sub in fact.sub_facts:
+                if sub.tag == GedcomTag.PLAC:
+                    return " ".join(sub.value.lower().split())
+    return ""
+
+
+class _Record:
+    """What a person is compared on, worked out once per person."""
+
+    __slots__ = (
+        "xref",
+        "given",
+        "first",
+        "numbers",
+        "surname",
+        "sex",
+        "birthday",
+        "birth",
+        "death_date",
+        "death",
+        "birth_place",
+        "death_place",
+        "parents",
+    )
+
+    def __init__(self, tree: FamilyTree, person: Person) -> None:
+        given, surname = split_name(person)
+        self.xref = person.xref_id
+        self.given = _norm(given)
+        self.first = self.given.split(" ", 1)[0]
+        self.numbers = _numbers(self.given)
+        self.surname = _norm(surname)
+        self.sex = person.sex
+        self.birthday = " ".join((person.birthday or "").upper().split())
+        self.birth = person.timeline.birth_year
+        death = person.death if person.death not in ("Alive", "Dead") else None
+        self.death_date = " ".join(str(death or "").upper().split())
+        self.death = extract_year(self.death_date)
+        self.birth_place = _place(person, GedcomTag.BIRT)
+        self.death_place = _place(person, GedcomTag.DEAT)
+        # Parents match by ID, or by name when one of the two is itself a duplicate
+        self.parents: set[str] = set()
+        for fam_id in person.famc:
+            family = tree.families.get(fam_id)
+            if family is None:
+                continue
+            for parent_id in (family.husb, family.wife):
+                if parent_id is None or parent_id not in tree.persons:
+                    continue
+                parent = tree.persons[parent_id]
+                self.parents.add(parent_id)
+                if parent.name:
+                    self.parents.add(_norm(parent.name))
+
+
+def _date_score(
+    date_a: str, year_a: int | None, date_b: str, year_b: int | None
+) -> tuple[float, str | None] | None:
+    if year_a is None or year_b is None:
+        return None
+    if date_a == date_b:
+        return 1.0, "same date"
+    gap = abs(year_a - year_b)
+    if gap == 0:
+        return 0.75, "same year"
+    if gap <= 2:
+        return 0.5, f"{gap} year{'s' if gap > 1 else ''} apart"
+    return 0.0, None
+
+
+def _place_score(place_a: str, place_b: str) -> tuple[float, str | None] | None:
+    if not place_a or not place_b:
+        return None
+    if place_a == place_b:
+        return 1.0, "same place"
+    # Same town, e.g. "Bath" and "Bath, Somerset, England"
+    if place_a.split(",")[0] == place_b.split(",")[0]:
+        return 0.5, "same town"
+    return 0.0, None
+
+
+def score_pair(a: _Record, b: _Record) -> tuple[float, list[str]] | None:
+    """
+    How alike two people are, from 0 to 1: the weighted average of the evidence both
+    have, with the reasons worth showing. None for people of a different sex, with
+    unlike given names, or with nothing to compare besides their names.
+
+    Names and parents alone score at most MAX_UNCONFIRMED_SCORE: siblings can share a
+    name, e.g. a child named after an older sibling who died young.
+    """
+    if a.sex != b.sex and Sex.U not in (a.sex, b.sex) and None not in (a.sex, b.sex):
+        return None
+    # Leopold I and Leopold II, or placeholders like Son_1 and Son_2, are different
+    if a.numbers != b.numbers:
+        return None
+    # A shared middle name is not enough, the first names have to be alike too
+    if _similar(a.first, b.first) < MIN_NAME_SCORE:
+        return None
+    given = _similar(a.given, b.given)
+    if given < MIN_NAME_SCORE:
+        return None
+    surname = _similar(a.surname, b.surname)
+
+    evidence = {
+        "birth": _date_score(a.birthday, a.birth, b.birthday, b.birth),
+        "death": _date_score(a.death_date, a.death, b.death_date, b.death),
+        "birth place": _place_score(a.birth_place, b.birth_place),
+        "death place": _place_score(a.death_place, b.death_place),
+    }
+    if a.parents and b.parents:
+        evidence["parents"] = (
+            (1.0, "same parents") if a.parents & b.parents else (0.0, None)
+        )
+    if all(result is None for result in evidence.values()):
+        return None
+    total = WEIGHTS["given name"] * given + WEIGHTS["surname"] * surname
+    weight = WEIGHTS["given name"] + WEIGHTS["surname"]
+    reasons = []
+    confirmed = False
+    for field, result in evidence.items():
+        if result is None:
+            continue
+        score, reason = result
+        total += WEIGHTS[field] * score
+        weight += WEIGHTS[field]
+        if reason:
+            reasons.append(reason if field == "parents" else f"{field}: {reason}")
+        confirmed = confirmed or (field != "parents" and score > 0)
+    if not confirmed:
+        return min(total / weight, MAX_UNCONFIRMED_SCORE), reasons
+    return total / weight, reasons
+
+
+def _blocks(records: list[_Record]) -> dict[tuple, list[_Record]]:
+    """
+    People grouped by the Soundex of their surname and their birth decade. Each dated
+    person is in two blocks, of decades starting in a year ending in 0 and in 5, so two
+    people born up to five years apart always share a block. Undated people are only
+    grouped by surname.
+    """
+    blocks: dict[tuple, list[_Record]] = defaultdict(list)
+    for record in records:
+        code = soundex(record.surname)
+        if record.birth is None:
+            blocks[(code, None, None)].append(record)
+        else:
+            blocks[(code, 0, record.birth // 10)].append(record)
+            blocks[(code, 5, (record.birth + 5) // 10)].append(record)
+    return blocks
+
+
+def _pairs(block: list[_Record]):
+    """Every pair of a small block. A large block is sorted by name and year, and each
+    person paired with the next WINDOW people only, so the work stays linear."""
+    if len(block) <= MAX_BLOCK:
+        for i, a in enumerate(block):
+            for b in block[i + 1 :]:
+                yield a, b
+        return
+    block = sorted(block, key=lambda r: (r.given, r.birth or 0, r.xref))
+    for i, a in enumerate(block):
+        for b in block[i + 1 : i + 1 + WINDOW]:
+            yield a, b
+
+
+def find_duplicates(
+    tree: FamilyTree, min_score: float = MIN_SCORE
+) -> list[tuple[float, str, str, list[str]]]:
+    """
+    People who may have been entered more than once, best matches first. Only people
+    whose surnames sound alike and who were born around the same time are compared,
+    see _blocks() and _pairs(), so this takes about linear time in the size of the tree.
+
+    :return: (score, ID, ID, reasons) for every pair scoring at least min_score
+    """
+    records = [
+        _Record(tree, person)
+        for person in tree.persons.values()
+        if person.name and person.name != LIVING
+    ]
+    # Without a given name there is too little to go on
+    records = [record for record in records if record.given]
+    candidates = []
+    for (_, offset, _), block in _blocks(records).items():
+        for a, b in _pairs(block):
+            # Pairs born in the same decade were already compared in its block
+            if offset == 5 and a.birth // 10 == b.birth // 10:
+                continue
+            key = (a.xref, b.xref) if a.xref < b.xref else (b.xref, a.xref)
+            result = score_pair(a, b)
+            if result is not None and result[0] >= min_score:
+                candidates.append((result[0], *key, result[1]))
+    # Ties go to the pairs with the most evidence
+    candidates.sort(key=lambda c: (-c[0], -len(c[3]), c[1], c[2]))
+    return candidates
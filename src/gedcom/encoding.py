@@ -0,0 +1,199 @@
+import codecs
+import re
+import threading
+import unicodedata
+from typing import TYPE_CHECKING, TextIO
+
+if TYPE_CHECKING:
+    from typing_extensions import Buffer
+
+# ANSEL (ANSI Z39.47) as used by GEDCOM 5.5: ASCII below 0x80, special characters from
+# 0xA1 and combining diacritics from 0xE0. Bytes not listed cannot be decoded.
+# fmt: off
+ANSEL_TO_UNICODE: dict[int, str] = {
+    0xA1: "Ł", 0xA2: "Ø", 0xA3: "Đ", 0xA4: "Þ", 0xA5: "Æ",
+    0xA6: "Œ", 0xA7: "ʹ", 0xA8: "·", 0xA9: "♭", 0xAA: "®",
+    0xAB: "±", 0xAC: "Ơ", 0xAD: "Ư", 0xAE: "ʼ", 0xB0: "ʻ",
+    0xB1: "ł", 0xB2: "ø", 0xB3: "đ", 0xB4: "þ", 0xB5: "æ",
+    0xB6: "œ", 0xB7: "ʺ", 0xB8: "ı", 0xB9: "£", 0xBA: "ð",
+    0xBC: "ơ", 0xBD: "ư", 0xBE: "□", 0xBF: "■", 0xC0: "°",
+    0xC1: "ℓ", 0xC2: "℗", 0xC3: "©", 0xC4: "♯", 0xC5: "¿",
+    0xC6: "¡", 0xC7: "ß", 0xC8: "€", 0xCF: "ß",
+    # Combining diacritics, written before the letter they modify
+    0xE0: "\u0309", 0xE1: "\u0300", 0xE2: "\u0301", 0xE3: "\u0302", 0xE4: "\u0303",
+    0xE5: "\u0304", 0xE6: "\u0306", 0xE7: "\u0307", 0xE8: "\u0308", 0xE9: "\u030c",
+    0xEA: "\u030a", 0xEB: "\ufe20", 0xEC: "\ufe21", 0xED: "\u0315", 0xEE: "\u030b",
+    0xEF: "\u0310", 0xF0: "\u0327", 0xF1: "\u0328", 0xF2: "\u0323", 0xF3: "\u0324",
+    0xF4: "\u0325", 0xF5: "\u0333", 0xF6: "\u0332", 0xF7: "\u0326", 0xF8: "\u031c",
+    0xF9: "\u032e", 0xFA: "\ufe22", 0xFB: "\ufe23", 0xFE: "\u0313",
+}
+# fmt: on
+
+# A 256 character table for codecs.charmap_decode, U+FFFE marks undefined bytes
+_DECODING_TABLE = "".join(
+    chr(b) if b < 0x80 else ANSEL_TO_UNICODE.get(b, "\ufffe") for b in range(256)
+)
+# 0xC7 and 0xCF both decode to ß, which encodes to 0xCF as GEDCOM 5.5 lists it
+_ENCODING_TABLE = codecs.charmap_build(_DECODING_TABLE.replace("ß", "\ufffe", 1))
+_MARK_BYTES = bytes(b for b in ANSEL_TO_UNICODE if b >= 0xE0)
+# 1 for the bytes of combining diacritics, 0 for everything else
+_FLAG_MARKS = bytes(1 if b in _MARK_BYTES else 0 for b in range(256))
+_MARKS = re.compile("[\u0300-\u036f\ufe20-\ufe23]")
+_MARKS_AFTER = re.compile(
+    "([^\u0300-\u036f\ufe20-\ufe23\n\r])([\u0300-\u036f\ufe20-\ufe23]+)"
+)
+
+
+def _decode(data: bytes, errors: str) -> str:
+    """
+    ANSEL writes diacritics before their letter, Unicode after it. Each byte decodes to
+    one character through the table, so the diacritics are found in the bytes by
+    memchr-speed searches and only those few spots are rebuilt and composed.
+    """
+    text = codecs.charmap_decode(data, errors, _DECODING_TABLE)[0]
+    flags = data.translate(_FLAG_MARKS)
+    start = flags.find(1)
+    if start == -1 or len(text) != len(data):
+        return text
+    pieces = []
+    pos = 0
+    while start != -1:
+        end = flags.find(0, start)
+        if end == -1 or text[end] in "\r\n":
+            # Nothing to attach to, the diacritics stay as they are
+            start = flags.find(1, end) if end != -1 else -1
+            continue
+        pieces.append(text[pos:start])
+        pieces.append(unicodedata.normalize("NFC", text[end] + text[start:end]))
+        pos = end + 1
+        start = flags.find(1, pos)
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def ansel_decode(data: "Buffer", errors: str = "strict") -> tuple[str, int]:
+    data = bytes(data)
+    return _decode(data, errors), len(data)
+
+
+def ansel_encode(text: str, errors: str = "strict") -> tuple[bytes, int]:
+    decomposed = unicodedata.normalize("NFD", text)
+    if _MARKS.search(decomposed) is not None:
+        decomposed = _MARKS_AFTER.sub(r"\2\1", decomposed)
+    data, _ = codecs.charmap_encode(decomposed, errors, _ENCODING_TABLE)
+    return data, len(text)
+
+
+class AnselIncrementalDecoder(codecs.IncrementalDecoder):
+    """Holds back diacritics at the end of a chunk until their letter arrives."""
+
+    def __init__(self, errors: str = "strict") -> None:
+        super().__init__(errors)
+        self.pending = b""
+
+    def decode(self, data: "Buffer", final: bool = False) -> str:
+        data = self.pending + bytes(data)
+        self.pending = b""
+        if not final:
+            kept = data.rstrip(_MARK_BYTES)
+            self.pending = data[len(kept) :]
+            data = kept
+        return _decode(data, self.errors)
+
+    def reset(self) -> None:
+        self.pending = b""
+
+    def getstate(self) -> tuple[bytes, int]:
+        return self.pending, 0
+
+    def setstate(self, state: tuple[bytes, int]) -> None:
+        self.pending = state[0]
+
+
+class AnselIncrementalEncoder(codecs.IncrementalEncoder):
+    def encode(self, text: str, final: bool = False) -> bytes:
+        return ansel_encode(text, self.errors)[0]
+
+
+def _search_codec(name: str) -> codecs.CodecInfo | None:
+    if name != "ansel":
+        return None
+    return codecs.CodecInfo(
+        name="ansel",
+        encode=ansel_encode,
+        decode=ansel_decode,
+        incrementalencoder=AnselIncrementalEncoder,
+        incrementaldecoder=AnselIncrementalDecoder,
+    )
+
+
+codecs.register(_search_codec)
+
+# Python codec for each HEAD.CHAR value; ASCII files are read as UTF-8, its superset
+CHARSETS: dict[str, str] = {
+    "ANSEL": "ansel",
+    "UTF-8": "utf-8",
+    "UTF8": "utf-8",
+    "UNICODE": "utf-16",
+    "UTF-16": "utf-16",
+    "ASCII": "utf-8",
+    "ANSI": "cp1252",
+    "IBM WINDOWS": "cp1252",
+    "IBMPC": "cp437",
+    "MACINTOSH": "mac_roman",
+}
+_CHAR_LINE = re.compile(rb"^[ \t]*1[ \t]+CHAR[ \t]+([^\r\n]+?)[ \t]*$", re.MULTILINE)
+HEAD_BYTES = 1 << 16
+
+
+def sniff_encoding(path: str) -> str:
+    """
+    The codec to read a GEDCOM file with: from its byte order mark, from the zero
+    bytes of UTF-16 without one, otherwise from the CHAR line of its header.
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEAD_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if head[:2] == b"0\x00":
+        return "utf-16-le"
+    if head[:2] == b"\x000":
+        return "utf-16-be"
+    match = _CHAR_LINE.search(head)
+    if match is not None:
+        declared = match.group(1).decode("ascii", "replace").upper()
+        codec = CHARSETS.get(declared, "utf-8")
+        # UNICODE without zero bytes in the header is not actually UTF-16
+        return "utf-8" if codec == "utf-16" else codec
+    return "utf-8"
+
+
+_replaced = threading.local()
+
+
+def _replace_and_count(error: UnicodeError) -> tuple[str, int]:
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    _replaced.bytes = getattr(_replaced, "bytes", 0) + error.end - error.start
+    return "\ufffd", error.end
+
+
+codecs.register_error("gedcom-replace", _replace_and_count)
+
+
+def open_gedcom(path: str, encoding: str | None = None) -> TextIO:
+    """
+    Open a GEDCOM file as text in its own encoding, streamed line by line. Bytes that do
+    not decode become U+FFFD and are counted for replaced_bytes().
+    """
+    _replaced.bytes = 0
+    return open(
+        path, "r", encoding=encoding or sniff_encoding(path), errors="gedcom-replace"
+    )
+
+
+def replaced_bytes() -> int:
+    """Bytes replaced by U+FFFD since the last open_gedcom() in this thread."""
+    return getattr(_replaced, "bytes", 0)
@@ -3,11 +3,8 @@ from enum import Enum, EnumMeta
 
 class CustomEnumMeta(EnumMeta):
     def __getitem__(cls, name):
-        try:
-            return super().__getitem__(name)
-        except KeyError:
-            # print(f"Missing name: {name}")  # Handle the missing name case
-            return cls.OTHER  # Fallback value
+        # Unknown names fall back to OTHER, use lookup_tag to keep them by name
+        return cls._member_map_.get(name, cls._member_map_["OTHER"])
 
 
 class GedcomTag(Enum, metaclass=CustomEnumMeta):
@@ -41,6 +38,7 @@ class GedcomTag(Enum, metaclass=CustomEnumMeta):
     CHRA = "Adult Christening"
     CITY = "City"
     CONC = "Concatenation"
+    CONT = "Continued"
     CONF = "Confirmation"
     CONL = "LDS Confirmation"
     CORP = "Corporation"
@@ -174,9 +172,49 @@ class GedcomTag(Enum, metaclass=CustomEnumMeta):
         return cls.OTHER
 
 
+class CustomTag:
+    """
+    A tag that GedcomTag does not know, e.g. _FSFTID from FamilySearch exports. Both
+    name and value are the tag as written, so renderers show the real tag. Instances
+    are interned by lookup_tag and compare by identity, like enum members.
+    """
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.value = name
+
+    def __repr__(self) -> str:
+        return f"<CustomTag.{self.name}>"
+
+    def __reduce__(self):
+        # Unpickling goes through the registry so cached trees share the instances
+        return lookup_tag, (self.name,)
+
+
+Tag = GedcomTag | CustomTag
+
+# Every known tag by name, as str and as bytes; custom tags are added as they are seen
+TAGS: dict[str | bytes, Tag] = {}
+for _name, _member in GedcomTag.__members__.items():
+    TAGS[_name] = _member
+    TAGS[_name.encode("ascii")] = _member
+
+
+def lookup_tag(name: str | bytes) -> Tag:
+    """The tag called `name`, a single dict lookup for every tag seen before."""
+    tag = TAGS.get(name)
+    if tag is None:
+        text = name.decode("utf-8", "replace") if isinstance(name, bytes) else name
+        tag = TAGS.setdefault(text, CustomTag(text))
+        TAGS.setdefault(text.encode("utf-8"), tag)
+    return tag
+
+
 class Fact:
-    def __init__(self, level: int, tag: GedcomTag, value: str) -> None:
-        self.tag: GedcomTag = tag
+    def __init__(self, level: int, tag: Tag, value: str) -> None:
+        self.tag: Tag = tag
         self.value: str = value
         self.level: int = level
         self.sub_facts: list[Fact] = []  # Details about this Gedcom Tag
@@ -0,0 +1,116 @@
+from collections import deque
+
+from gedcom.tree import FamilyTree
+from gedcom.relations import parents_of, children_of, spouses_of
+
+
+class Numbering:
+    """
+    Genealogical numbers relative to one or more root persons.
+
+    - generation: signed generation offset from the nearest root, for everyone connected
+      to a root (+1 parents, -1 children, spouses share a generation)
+    - sosa: Ahnentafel number of each ancestor of the first root (root 1, father 2n,
+      mother 2n + 1)
+    - daboville: d'Aboville number of each descendant, with root i numbered "i" and
+      children numbered in birth-family order ("1.2.1" is the first child of the second
+      child of root 1)
+
+    With pedigree collapse a person has several valid numbers; the smallest Sosa number
+    and the first d'Aboville number reached are kept, so each person is numbered once.
+    """
+
+    def __init__(self, roots: list[str]) -> None:
+        self.roots = roots
+        self.generation: dict[str, int] = {}
+        self.sosa: dict[str, int] = {}
+        self.daboville: dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"Numbering(roots={self.roots}, generation={len(self.generation)}, "
+            f"sosa={len(self.sosa)}, daboville={len(self.daboville)})"
+        )
+
+
+def compute_generations(tree: FamilyTree, roots: list[str]) -> dict[str, int]:
+    generation: dict[str, int] = {}
+    queue: deque[str] = deque()
+    for root in roots:
+        if root in tree.persons and root not in generation:
+            generation[root] = 0
+            queue.append(root)
+
+    while queue:
+        person_id = queue.popleft()
+        current = generation[person_id]
+        for step, offset in (
+            (parents_of, 1),
+            (children_of, -1),
+            (spouses_of, 0),
+        ):
+            for next_id in step(tree, person_id):
+                if next_id not in generation:
+                    generation[next_id] = current + offset
+                    queue.append(next_id)
+    return generation
+
+
+def compute_sosa(tree: FamilyTree, root: str) -> dict[str, int]:
+    """
+    FIFO order visits Sosa numbers in increasing order, so the first number assigned to a
+    collapsed ancestor is their smallest one, and their ancestry is only walked once.
+    """
+    sosa: dict[str, int] = {}
+    if root not in tree.persons:
+        return sosa
+    sosa[root] = 1
+    queue = deque([(root, 1)])
+    while queue:
+        person_id, number = queue.popleft()
+        person = tree.persons[person_id]
+        # Ahnentafel assumes one pair of parents, use the first recorded family
+        family = next(
+            (tree.families[f] for f in person.famc if f in tree.families), None
+        )
+        if family is None:
+            continue
+        for parent_id, parent_number in (
+            (family.husb, 2 * number),
+            (family.wife, 2 * number + 1),
+        ):
+            if parent_id and parent_id in tree.persons and parent_id not in sosa:
+                sosa[parent_id] = parent_number
+                queue.append((parent_id, parent_number))
+    return sosa
+
+
+def compute_daboville(tree: FamilyTree, roots: list[str]) -> dict[str, str]:
+    daboville: dict[str, str] = {}
+    queue: deque[str] = deque()
+    for i, root in enumerate(roots, start=1):
+        if root in tree.persons and root not in daboville:
+            daboville[root] = str(i)
+            queue.append(root)
+
+    while queue:
+        person_id = queue.popleft()
+        number = daboville[person_id]
+        for i, child_id in enumerate(
+            dict.fromkeys(children_of(tree, person_id)), start=1
+        ):
+            if child_id not in daboville:
+                daboville[child_id] = f"{number}.{i}"
+                queue.append(child_id)
+    return daboville
+
+
+def compute_numbering(tree: FamilyTree, roots: list[str]) -> Numbering:
+    """Linear-time, non-recursive numbering of the tree relative to roots."""
+    numbering = Numbering([r for r in roots if r in tree.persons])
+    if not numbering.roots:
+        return numbering
+    numbering.generation = compute_generations(tree, numbering.roots)
+    numbering.sosa = compute_sosa(tree, numbering.roots[0])
+    numbering.daboville = compute_daboville(tree, numbering.roots)
+    return numbering
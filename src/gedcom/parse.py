@@ -1,72 +1,131 @@
 from gedcom.tree import FamilyTree
-from gedcom.fact import GedcomTag, Fact
-import time
+from gedcom.encoding import open_gedcom, replaced_bytes, sniff_encoding
+from gedcom.fact import GedcomTag, Fact, lookup_tag
+from pipeline.trace import count
 
 non_fact_tags: list[GedcomTag] = [
     GedcomTag.FAM,
     GedcomTag.INDI,
     GedcomTag.SOUR,
 ]  # this should probably be dynamic but it is what is it right now
+continuation_tags = ("CONC", "CONT")
 
 
 def extract_fact(line: str) -> Fact | None:
-    parts = line.strip().split()
+    parts = line.split()
     if parts[0].isdigit():
         # Start of a new fact
         level = int(parts[0])
         if len(parts) > 1:
-            tag = GedcomTag[parts[1]]
-            if (
-                level == 0
-                and tag == GedcomTag.OTHER
-                and len(parts) >= 3
-                and GedcomTag[parts[2]] in non_fact_tags
-            ):
-                tag = GedcomTag[parts[2]]
-                value = parts[1]
-            else:
-                value = " ".join(parts[2:]) if len(parts) > 2 else ""
-
-            return Fact(level, tag, value)
+            if level == 0 and parts[1].startswith("@"):
+                # Record with an xref, e.g. "0 @I1@ INDI"
+                record = lookup_tag(parts[2]) if len(parts) > 2 else None
+                if record in non_fact_tags:
+                    return Fact(level, record, parts[1])
+                # Other records keep the whole line so the writer can restore it
+                return Fact(level, GedcomTag.OTHER, f"{parts[1]} {raw_value(line)}")
+
+            return Fact(level, lookup_tag(parts[1]), raw_value(line))
     return None
 
 
-def parse(gedcom_path: str) -> FamilyTree | None:
+def raw_value(line: str) -> str:
+    """
+    The value of a line exactly as written, after the single space that ends the tag.
+    Runs of spaces are kept, so a file written back from the facts is the same byte for
+    byte, and leading and trailing spaces are part of the text when CONC splits it
+    mid-sentence.
+    """
+    start = line.lstrip().rstrip("\n")
+    tag_end = start.find(" ", start.find(" ") + 1)
+    return start[tag_end + 1 :] if tag_end != -1 else ""
+
+
+def parse_facts(gedcom_path: str) -> list[Fact]:
+    """
+    Read the file into its level 0 records, each with its nested sub facts.
+
+    CONC lines continue their parent's value and CONT lines continue it after a line
+    break. The pieces are collected in a list and joined once when the fact is done, so
+    a note of thousands of lines takes linear time.
+    """
     facts: list[Fact] = []
     final_facts: list[Fact] = []
+    # The fact whose value is being continued, and the pieces of that value
+    target: Fact | None = None
+    chunks: list[str] = []
 
-    start = time.time()
-
-    with open(gedcom_path, "r", encoding="utf-8", errors="ignore") as file:
-        text = file.read()
-        lines = text.splitlines()
-        lines[0] = "0 HEAD"  # weird hardcode to get this to work
+    line_count = 0
+    encoding = sniff_encoding(gedcom_path)
 
-        for line in lines:
+    # Lines are streamed with their "\n", which split() and strip() drop anyway
+    with open_gedcom(gedcom_path, encoding) as file:
+        for line_count, line in enumerate(file, 1):
             if len(line) > 0 and line[0].isdigit():
+                # Continuations are most of the lines in long notes, they skip the
+                # full split of extract_fact
+                head = line.split(None, 2)
+                if len(head) > 1 and head[1] in continuation_tags:
+                    level = int(head[0])
+                    parent = next((f for f in reversed(facts) if f.level < level), None)
+                    if parent is None:
+                        continue
+                    if parent is not target:
+                        if target is not None:
+                            target.value = "".join(chunks)
+                        target = parent
+                        chunks = [parent.value]
+                    if head[1] == "CONT":
+                        chunks.append("\n")
+                    chunks.append(raw_value(line))
+                    continue
+
                 fact = extract_fact(line)
-                if fact and fact.tag == GedcomTag.CONC:
-                    facts[-1].value += fact.value
-                elif fact:
-                    while len(facts) > 0 and fact.level <= facts[-1].level:
-                        done = facts.pop(-1)
-                        if done.level == 0:
-                            final_facts.append(done)
-
-                    if len(facts) > 0:
-                        facts[-1].sub_facts.append(fact)
-                    facts.append(fact)
-            else:
-                # Continuation of the previous fact value
-                if facts:
-                    facts[-1].value += f" {line.strip()}"
-
-    print(f"Time to parse: {time.time() - start}")
-    start = time.time()
+                if fact is None:
+                    continue
+
+                if target is not None:
+                    target.value = "".join(chunks)
+                    target = None
+                while len(facts) > 0 and fact.level <= facts[-1].level:
+                    done = facts.pop(-1)
+                    if done.level == 0:
+                        final_facts.append(done)
+
+                if len(facts) > 0:
+                    facts[-1].sub_facts.append(fact)
+                facts.append(fact)
+            elif line.strip() and facts:
+                # Wrapped line without a level, continues the previous fact value
+                if facts[-1] is not target:
+                    if target is not None:
+                        target.value = "".join(chunks)
+                    target = facts[-1]
+                    chunks = [target.value]
+                chunks.append(f" {line.strip()}")
+
+        if target is not None:
+            target.value = "".join(chunks)
+        # The last record, usually TRLR, has no following record to close it
+        if facts and facts[0].level == 0:
+            final_facts.append(facts[0])
+
+    replaced = replaced_bytes()
+    if replaced:
+        print(
+            f"Warning: {replaced:,} bytes of {gedcom_path} are not valid {encoding}, "
+            "they were replaced with U+FFFD"
+        )
+        count("decode_errors", replaced)
+    count("lines", line_count)
+    count("records", len(final_facts))
+    return final_facts
+
+
+def parse(gedcom_path: str) -> FamilyTree | None:
+    final_facts = parse_facts(gedcom_path)
 
     if len(final_facts) > 0:
-        ft = FamilyTree(final_facts)
-        print(f"Time to create tree: {time.time() - start}")
-        return ft
+        return FamilyTree(final_facts)
     else:
         return None
@@ -5,6 +5,7 @@ from io import BytesIO
 
 from gedcom.fact import GedcomTag, Fact
 from gedcom.sex import Sex
+from gedcom.timeline import Timeline, build_timeline
 
 
 class Person:
@@ -13,6 +14,8 @@ class Person:
         self.famc: list[str] = []  # Family IDs where this person is a child
         self.fams: list[str] = []  # Family IDs where this person is a spouse
         self.facts: list[Fact] = []  # List of facts that go with this person
+        # NAME values as written, with the surname between slashes, for the writer
+        self.gedcom_names: list[str] = []
 
         # Common facts that nearly everyone has:
         self.name: str | None = None
@@ -27,6 +30,9 @@ class Person:
         for f in fact.sub_facts:
             self.parse_fact(f)
 
+        # Life stages of the facts, shared by the person page and the LLM context
+        self.timeline: Timeline = build_timeline(self.facts, self.birthday, self.death)
+
     def parse_fact(self, fact: Fact) -> None:
         if fact.tag == GedcomTag.SEX:
             self.sex = Sex[fact.value]
@@ -34,16 +40,18 @@ class Person:
             for sub in fact.sub_facts:
                 if GedcomTag.DATE == sub.tag:
                     # TODO: write gedcom date to datetime function
-                    self.birthday = sub.value
+                    self.birthday = sub.value.strip()
         elif fact.tag == GedcomTag.DEAT:
             if fact.value == "Y":
                 self.death = "Dead"
 
             for sub in fact.sub_facts:
                 if GedcomTag.DATE == sub.tag:
-                    self.death = sub.value
+                    self.death = sub.value.strip()
         elif fact.tag == GedcomTag.NAME:
-            fact.value = "".join([c for c in fact.value if c != "/"])
+            self.gedcom_names.append(fact.value)
+            # Values keep the spacing of the file, names shown have single spaces
+            fact.value = " ".join(fact.value.replace("/", "").split())
             if fact.value != "":
                 self.name = fact.value
         elif fact.tag == GedcomTag.OBJE:
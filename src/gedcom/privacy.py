@@ -0,0 +1,171 @@
+import copy
+from collections import deque
+from datetime import datetime
+
+from gedcom.fact import Fact, GedcomTag
+from gedcom.family import Family
+from gedcom.person import Person
+from gedcom.subset import extract_subset
+from gedcom.timeline import build_timeline, extract_year
+from gedcom.tree import FamilyTree
+
+PRIVACY_MODES = ["redact", "omit", "off"]
+LIVING = "Living"
+
+MAX_AGE = 110  # nobody born longer ago than this is still alive
+MIN_PARENT_AGE = 12  # a parent is born at least this long before their child
+MAX_PARENT_AGE = 60  # and at most this long before
+MAX_SPOUSE_GAP = 40  # years between the births of two spouses
+
+# Facts that mean the person has died, even without a date
+DEATH_TAGS = {GedcomTag.DEAT, GedcomTag.BURI, GedcomTag.CREM, GedcomTag.PROB}
+# Family links, the only facts a redacted person or family keeps
+LINK_TAGS = {
+    GedcomTag.FAMC,
+    GedcomTag.FAMS,
+    GedcomTag.HUSB,
+    GedcomTag.WIFE,
+    GedcomTag.CHIL,
+}
+
+
+def _after(fact: Fact) -> bool:
+    """An "AFT" date only bounds the year from below."""
+    return any(
+        sub.tag == GedcomTag.DATE and sub.value.strip().upper().startswith("AFT")
+        for sub in fact.sub_facts
+    )
+
+
+def _latest_year(entries: list[tuple[int | None, Fact]]) -> int | None:
+    """The earliest year of the dated facts, which the person was born by."""
+    years = [year for year, _ in entries if year is not None]
+    if not years:
+        return None
+    latest = min(years)
+    # Rare enough to only look for once the earliest year is known
+    if any(year == latest and _after(fact) for year, fact in entries):
+        return _latest_year([entry for entry in entries if not _after(entry[1])])
+    return latest
+
+
+def latest_births(tree: FamilyTree) -> dict[str, int]:
+    """
+    The latest year each person can have been born in, for everyone it can be bounded
+    for: from their own dated facts and family events, then carried to relatives
+    through the family links. A parent is born at least MIN_PARENT_AGE years before a
+    child, a child at most MAX_PARENT_AGE years after a parent and a spouse at most
+    MAX_SPOUSE_GAP years after the other. Every cycle of links adds years, so the
+    relaxation settles after a few visits per person.
+    """
+    latest: dict[str, int] = {}
+    for xref, person in tree.persons.items():
+        # The timeline already has the year of every dated fact
+        timeline = person.timeline
+        year = _latest_year(
+            timeline.early + timeline.mid + timeline.late + timeline.other
+        )
+        if year is not None:
+            latest[xref] = year
+    for family in tree.families.values():
+        year = _latest_year(
+            [
+                (extract_year(sub.value), fact)
+                for fact in family.facts
+                for sub in fact.sub_facts
+                if sub.tag == GedcomTag.DATE
+            ]
+        )
+        if year is None:
+            continue
+        for spouse in (family.husb, family.wife):
+            if spouse in tree.persons and year < latest.get(spouse, year + 1):
+                latest[spouse] = year
+
+    queue = deque(latest)
+    queued = set(latest)
+    persons, families = tree.persons, tree.families
+    while queue:
+        xref = queue.popleft()
+        queued.discard(xref)
+        year = latest[xref]
+        person = persons[xref]
+        steps: list[tuple[str | None, int]] = []
+        for fam_id in person.famc:
+            family = families[fam_id]
+            parent_bound = year - MIN_PARENT_AGE
+            steps += ((family.husb, parent_bound), (family.wife, parent_bound))
+        for fam_id in person.fams:
+            family = families[fam_id]
+            spouse = family.wife if family.husb == xref else family.husb
+            steps.append((spouse, year + MAX_SPOUSE_GAP))
+            child_bound = year + MAX_PARENT_AGE
+            steps += [(child, child_bound) for child in family.children]
+        for other, bound in steps:
+            if other in persons and bound < latest.get(other, bound + 1):
+                latest[other] = bound
+                if other not in queued:
+                    queued.add(other)
+                    queue.append(other)
+    return latest
+
+
+def living_persons(tree: FamilyTree, year: int | None = None) -> set[str]:
+    """
+    People who may still be alive in `year` (default this year): no death, burial or
+    similar fact, and no evidence they were born more than MAX_AGE years before.
+    Without dates on them or their relatives people count as living.
+    """
+    year = year or datetime.now().year
+    latest = latest_births(tree)
+    living = set()
+    for xref, person in tree.persons.items():
+        if person.death != "Alive" or any(f.tag in DEATH_TAGS for f in person.facts):
+            continue
+        if latest.get(xref, year) > year - MAX_AGE:
+            living.add(xref)
+    return living
+
+
+def _redact_person(person: Person) -> Person:
+    redacted = copy.copy(person)
+    redacted.name = LIVING
+    redacted.gedcom_names = [LIVING]
+    redacted.birthday = None
+    redacted.images = []
+    redacted.facts = [f for f in person.facts if f.tag in LINK_TAGS]
+    redacted.timeline = build_timeline(redacted.facts, None, "Alive")
+    return redacted
+
+
+def privatize(tree: FamilyTree, mode: str = "redact") -> tuple[FamilyTree, set[str]]:
+    """
+    The tree to publish: with "redact" living people keep their place in the tree as
+    "Living" without any facts, dates or images, and so do the events of families with
+    a living spouse. With "omit" they are left out with every link to them. The full
+    tree is not changed, redacted people and families are copies.
+
+    :return: (tree, IDs of the living people)
+    """
+    if mode == "off":
+        return tree, set()
+    living = living_persons(tree)
+    if not living:
+        return tree, living
+    if mode == "omit":
+        return extract_subset(tree, tree.persons.keys() - living), living
+
+    published = copy.copy(tree)
+    published.persons = {
+        xref: _redact_person(person) if xref in living else person
+        for xref, person in tree.persons.items()
+    }
+    published.families = {}
+    for fam_id, family in tree.families.items():
+        if family.husb in living or family.wife in living:
+            private: Family = copy.copy(family)
+            private.facts = [f for f in family.facts if f.tag in LINK_TAGS]
+            private.name = published.family_name(private)
+            family = private
+        published.families[fam_id] = family
+    return published, living
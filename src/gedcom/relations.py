@@ -0,0 +1,138 @@
+from collections import deque
+from typing import Callable
+
+from gedcom.tree import FamilyTree
+
+
+def parents_of(tree: FamilyTree, person_id: str) -> list[str]:
+    """IDs of the husband and wife of every family the person is a child in."""
+    parents: list[str] = []
+    person = tree.persons.get(person_id)
+    if person is None:
+        return parents
+    for fam_id in person.famc:
+        family = tree.families.get(fam_id)
+        if family is None:
+            continue
+        for parent_id in (family.husb, family.wife):
+            if parent_id and parent_id in tree.persons:
+                parents.append(parent_id)
+    return parents
+
+
+def children_of(tree: FamilyTree, person_id: str) -> list[str]:
+    """IDs of the children of every family the person is a spouse in."""
+    children: list[str] = []
+    person = tree.persons.get(person_id)
+    if person is None:
+        return children
+    for fam_id in person.fams:
+        family = tree.families.get(fam_id)
+        if family is None:
+            continue
+        for child_id in family.children:
+            if child_id in tree.persons:
+                children.append(child_id)
+    return children
+
+
+def spouses_of(tree: FamilyTree, person_id: str) -> list[str]:
+    spouses: list[str] = []
+    person = tree.persons.get(person_id)
+    if person is None:
+        return spouses
+    for fam_id in person.fams:
+        family = tree.families.get(fam_id)
+        if family is None:
+            continue
+        for spouse_id in (family.husb, family.wife):
+            if spouse_id and spouse_id != person_id and spouse_id in tree.persons:
+                spouses.append(spouse_id)
+    return spouses
+
+
+def ancestors(
+    tree: FamilyTree, person_id: str, max_depth: int | None = None
+) -> dict[str, int]:
+    """
+    Breadth-first walk up the famc links.
+
+    :return: ancestor_id -> number of generations above person_id. With pedigree collapse
+             an ancestor is reported once, at its closest generation.
+    """
+    return _walk(tree, person_id, parents_of, max_depth)
+
+
+def descendants(
+    tree: FamilyTree, person_id: str, max_depth: int | None = None
+) -> dict[str, int]:
+    """Breadth-first walk down the fams links, see ancestors()."""
+    return _walk(tree, person_id, children_of, max_depth)
+
+
+def _walk(
+    tree: FamilyTree,
+    person_id: str,
+    step: Callable[[FamilyTree, str], list[str]],
+    max_depth: int | None,
+) -> dict[str, int]:
+    found: dict[str, int] = {}
+    if person_id not in tree.persons:
+        return found
+    queue = deque([(person_id, 0)])
+    seen = {person_id}
+    while queue:
+        current, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for next_id in step(tree, current):
+            if next_id not in seen:
+                seen.add(next_id)
+                found[next_id] = depth + 1
+                queue.append((next_id, depth + 1))
+    return found
+
+
+def relationship_path(
+    tree: FamilyTree, from_id: str, to_id: str
+) -> list[tuple[str, str]] | None:
+    """
+    Shortest chain of parent/child/spouse links between two people.
+
+    :return: [(edge, person_id), ...] starting with ("self", from_id), where edge is the
+             role of person_id relative to the previous person in the chain, or None if
+             the two people are not connected.
+    """
+    if from_id not in tree.persons or to_id not in tree.persons:
+        return None
+
+    previous: dict[str, tuple[str, str] | None] = {from_id: None}
+    queue = deque([from_id])
+    while queue:
+        current = queue.popleft()
+        if current == to_id:
+            break
+        for edge, step in (
+            ("parent", parents_of),
+            ("child", children_of),
+            ("spouse", spouses_of),
+        ):
+            for next_id in step(tree, current):
+                if next_id not in previous:
+                    previous[next_id] = (edge, current)
+                    queue.append(next_id)
+
+    if to_id not in previous:
+        return None
+
+    path: list[tuple[str, str]] = []
+    current = to_id
+    link = previous[current]
+    while link is not None:
+        edge, parent = link
+        path.append((edge, current))
+        current = parent
+        link = previous[current]
+    path.append(("self", from_id))
+    path.reverse()
+    return path
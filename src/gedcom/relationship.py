@@ -0,0 +1,273 @@
+import heapq
+
+from gedcom.tree import FamilyTree
+from gedcom.sex import Sex
+from gedcom.relations import parents_of, children_of, spouses_of
+
+ORDINALS = [
+    "zeroth",
+    "first",
+    "second",
+    "third",
+    "fourth",
+    "fifth",
+    "sixth",
+    "seventh",
+    "eighth",
+    "ninth",
+    "tenth",
+]
+
+TIMES = ["", "once", "twice", "three times", "four times"]
+
+
+def _numeric_ordinal(n: int) -> str:
+    suffix = (
+        "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    )
+    return f"{n}{suffix}"
+
+
+def _ordinal(n: int) -> str:
+    return ORDINALS[n] if n < len(ORDINALS) else _numeric_ordinal(n)
+
+
+def _greats(n: int) -> str:
+    """Prefix for n generations beyond 'grand': '', 'great-', '2nd great-', ..."""
+    if n <= 0:
+        return ""
+    if n == 1:
+        return "great-"
+    return f"{_numeric_ordinal(n)} great-"
+
+
+def _gendered(sex: Sex | None, male: str, female: str, neutral: str) -> str:
+    if sex == Sex.M:
+        return male
+    if sex == Sex.F:
+        return female
+    return neutral
+
+
+def name_relationship(up_x: int, up_y: int, sex: Sex | None, half: bool = False) -> str:
+    """
+    Name the relationship of Y to X, where X is up_x and Y is up_y generations below
+    their lowest common ancestor. sex is Y's sex, used for the gendered terms.
+    """
+    if up_x == 0 and up_y == 0:
+        return "self"
+    if up_y == 0:
+        # Y is X's ancestor
+        base = _gendered(sex, "father", "mother", "parent")
+        if up_x == 1:
+            return base
+        return f"{_greats(up_x - 2)}grand{base}"
+    if up_x == 0:
+        # Y is X's descendant
+        base = _gendered(sex, "son", "daughter", "child")
+        if up_y == 1:
+            return base
+        return f"{_greats(up_y - 2)}grand{base}"
+    if up_x == 1 and up_y == 1:
+        sibling = _gendered(sex, "brother", "sister", "sibling")
+        return f"half-{sibling}" if half else sibling
+    if up_x == 1:
+        base = _gendered(sex, "nephew", "niece", "nibling")
+        if up_y == 2:
+            return base
+        return f"{_greats(up_y - 3)}grand{base}"
+    if up_y == 1:
+        base = _gendered(sex, "uncle", "aunt", "pibling")
+        if up_x == 2:
+            return base
+        return f"{_greats(up_x - 3)}grand{base}"
+
+    degree = min(up_x, up_y) - 1
+    removed = abs(up_x - up_y)
+    name = f"{_ordinal(degree)} cousin"
+    if removed:
+        times = TIMES[removed] if removed < len(TIMES) else f"{removed} times"
+        name += f" {times} removed"
+    return name
+
+
+class Relationship:
+    def __init__(
+        self, up_x: int, up_y: int, common_ancestors: list[str], description: str
+    ) -> None:
+        self.up_x = up_x  # generations from X up to the common ancestor
+        self.up_y = up_y  # generations from Y up to the common ancestor
+        self.common_ancestors = common_ancestors
+        self.description = description
+
+    def __repr__(self) -> str:
+        return (
+            f"Relationship({self.description}, up_x={self.up_x}, up_y={self.up_y}, "
+            f"common_ancestors={self.common_ancestors})"
+        )
+
+
+def _preference(up: tuple[int, int]) -> tuple[int, bool, int]:
+    """
+    Sort key of the ways two people are related: fewest steps first, then direct
+    ancestry over a collateral line, then the most even split. With pedigree collapse
+    an ancestor can also be a grandaunt at the same distance, and both the pairwise
+    and the batch search then name them as the ancestor.
+    """
+    return up[0] + up[1], min(up) != 0, max(up)
+
+
+class RelationshipCalculator:
+    """
+    Computes how two people are related through their lowest common ancestors.
+
+    Pairwise queries use a bidirectional breadth-first search up the famc links, so a
+    query only touches the ancestors of both people up to the closest common one.
+    Unrelated pairs walk both full ancestries; pass depth to only look for common
+    ancestors that many generations up, which bounds the work on any tree size.
+    """
+
+    def __init__(self, tree: FamilyTree) -> None:
+        self.tree = tree
+        self.parents: dict[str, list[str]] = {}
+
+    def _parents(self, person_id: str) -> list[str]:
+        parents = self.parents.get(person_id)
+        if parents is None:
+            parents = parents_of(self.tree, person_id)
+            self.parents[person_id] = parents
+        return parents
+
+    def lowest_common_ancestors(
+        self, x: str, y: str, depth: int | None = None
+    ) -> tuple[int, int, list[str]] | None:
+        """
+        Bidirectional BFS up from x and y, expanding the shallower side first. A common
+        ancestor not yet seen by both sides is at least min(level_x, level_y) + 1 steps
+        away in total, so the search stops once that bound passes the best found.
+
+        :param depth: Only look for common ancestors at most this many generations above
+                      both x and y.
+        :return: (up_x, up_y, common_ancestors) for the closest common ancestors, or None
+        """
+        if x not in self.tree.persons or y not in self.tree.persons:
+            return None
+        if x == y:
+            return 0, 0, [x]
+
+        dist = ({x: 0}, {y: 0})
+        frontier: tuple[list[str], list[str]] = ([x], [y])
+        level = [0, 0]
+        best: tuple[int, bool, int] | None = None  # _preference of the best meeting
+        meetings: dict[str, tuple[int, int]] = {}
+
+        while frontier[0] or frontier[1]:
+            lower = min(
+                level[side] if frontier[side] else float("inf") for side in (0, 1)
+            )
+            # A meeting as short as the best may still be preferred, see _preference
+            if best is not None and lower + 1 > best[0]:
+                break
+
+            side = 0 if frontier[0] and (level[0] <= level[1] or not frontier[1]) else 1
+            mine, theirs = dist[side], dist[1 - side]
+            next_frontier = []
+            for person_id in frontier[side]:
+                for parent_id in self._parents(person_id):
+                    if parent_id in mine:
+                        continue
+                    mine[parent_id] = level[side] + 1
+                    next_frontier.append(parent_id)
+                    if parent_id in theirs:
+                        up = (dist[0][parent_id], dist[1][parent_id])
+                        meetings[parent_id] = up
+                        key = _preference(up)
+                        if best is None or key < best:
+                            best = key
+            frontier = (
+                (next_frontier, frontier[1])
+                if side == 0
+                else (frontier[0], next_frontier)
+            )
+            level[side] += 1
+            if depth is not None and level[side] >= depth:
+                frontier = ([], frontier[1]) if side == 0 else (frontier[0], [])
+
+        if best is None:
+            return None
+        chosen = min(up for up in meetings.values() if _preference(up) == best)
+        common = sorted(pid for pid, up in meetings.items() if up == chosen)
+        return chosen[0], chosen[1], common
+
+    def _is_half_sibling(self, x: str, y: str) -> bool:
+        shared = set(self._parents(x)) & set(self._parents(y))
+        return len(shared) == 1 and (
+            len(set(self._parents(x))) > 1 or len(set(self._parents(y))) > 1
+        )
+
+    def describe(self, x: str, y: str, up_x: int, up_y: int) -> str:
+        person = self.tree.persons[y]
+        half = up_x == 1 and up_y == 1 and self._is_half_sibling(x, y)
+        return name_relationship(up_x, up_y, person.sex, half)
+
+    def relationship(
+        self, x: str, y: str, depth: int | None = None
+    ) -> Relationship | None:
+        """
+        How y is related to x, by blood or, failing that, by marriage. depth limits the
+        search for common ancestors, see lowest_common_ancestors().
+        """
+        found = self.lowest_common_ancestors(x, y, depth)
+        if found is not None:
+            up_x, up_y, common = found
+            return Relationship(up_x, up_y, common, self.describe(x, y, up_x, up_y))
+        if y in spouses_of(self.tree, x):
+            sex = self.tree.persons[y].sex
+            return Relationship(0, 0, [], _gendered(sex, "husband", "wife", "spouse"))
+        return None
+
+    def relationships_to(
+        self, home_id: str, depth: int | None = None
+    ) -> dict[str, str]:
+        """
+        Name everyone's relationship to home_id in one pass. The search walks up from
+        home_id and then only down, settling each (person, direction) state once in the
+        order of _preference, so every blood relative is named through the same common
+        ancestor as relationship() picks. With depth, only through common ancestors at
+        most that many generations above both people.
+        """
+        results: dict[str, str] = {}
+        if home_id not in self.tree.persons:
+            return results
+
+        done_up: set[str] = set()
+        done_down: set[str] = set()
+        # (preference, person, up_x, up_y); up_y > 0 means the walk has turned down
+        heap = [(_preference((0, 0)), home_id, 0, 0)]
+        while heap:
+            _, person_id, up_x, up_y = heapq.heappop(heap)
+            done = done_down if up_y else done_up
+            if person_id in done or (up_y and person_id in done_up):
+                continue
+            done.add(person_id)
+            if person_id not in results:
+                results[person_id] = self.describe(home_id, person_id, up_x, up_y)
+
+            if up_y == 0 and (depth is None or up_x < depth):
+                for parent_id in self._parents(person_id):
+                    if parent_id not in done_up:
+                        up = (up_x + 1, 0)
+                        heapq.heappush(heap, (_preference(up), parent_id, *up))
+            if depth is not None and up_y >= depth:
+                continue
+            for child_id in children_of(self.tree, person_id):
+                if child_id in done_up or child_id in done_down:
+                    continue
+                up = (up_x, up_y + 1)
+                heapq.heappush(heap, (_preference(up), child_id, *up))
+
+        for spouse_id in spouses_of(self.tree, home_id):
+            if spouse_id not in results:
+                sex = self.tree.persons[spouse_id].sex
+                results[spouse_id] = _gendered(sex, "husband", "wife", "spouse")
+        return results
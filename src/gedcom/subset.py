@@ -0,0 +1,111 @@
+import copy
+
+from gedcom.fact import Fact, GedcomTag
+from gedcom.family import Family
+from gedcom.person import Person
+from gedcom.relations import ancestors, descendants, spouses_of
+from gedcom.tree import FamilyTree
+
+
+def select_branch(
+    tree: FamilyTree,
+    roots: list[str],
+    up: int | None = None,
+    down: int | None = None,
+    spouses: bool = True,
+) -> set[str]:
+    """
+    The roots with their ancestors up to `up` generations and descendants down to
+    `down` generations (None for all), plus the spouses of everyone found.
+    """
+    selected: set[str] = set()
+    for root in roots:
+        if root not in tree.persons:
+            print(f"Root {root} not found, skipping it")
+            continue
+        selected.add(root)
+        if up != 0:
+            selected.update(ancestors(tree, root, up))
+        if down != 0:
+            selected.update(descendants(tree, root, down))
+    if spouses:
+        for person_id in list(selected):
+            selected.update(spouses_of(tree, person_id))
+    return selected
+
+
+def _xrefs(facts: list[Fact], found: set[str]) -> None:
+    """Every @XREF@ value in the facts and their sub facts."""
+    stack = list(facts)
+    while stack:
+        fact = stack.pop()
+        value = fact.value
+        if value.startswith("@") and value.endswith("@"):
+            found.add(value)
+        stack.extend(fact.sub_facts)
+
+
+def _linked(fact: Fact, persons: set[str], families: set[str]) -> bool:
+    """False for a link fact to a person or family outside the subset."""
+    if fact.tag in (GedcomTag.FAMC, GedcomTag.FAMS):
+        return fact.value in families
+    if fact.tag in (GedcomTag.HUSB, GedcomTag.WIFE, GedcomTag.CHIL):
+        return fact.value in persons
+    return True
+
+
+def extract_subset(tree: FamilyTree, person_ids: set[str]) -> FamilyTree:
+    """
+    A new tree of the given persons, the families that link two or more of them and
+    the sources and other records they refer to. Persons and families are shallow
+    copies with their links pruned to the subset; facts and sources are shared with
+    the full tree, not copied.
+    """
+    persons = {xref for xref in person_ids if xref in tree.persons}
+    families: set[str] = set()
+    for fam_id, family in tree.families.items():
+        members = (family.husb, family.wife, *family.children)
+        if sum(1 for member in members if member in persons) >= 2:
+            families.add(fam_id)
+
+    subset = FamilyTree([])
+    subset.header = tree.header
+    subset.trailer = tree.trailer
+    referenced: set[str] = set()
+
+    for xref, person in tree.persons.items():
+        if xref not in persons:
+            continue
+        part: Person = copy.copy(person)
+        part.famc = [f for f in person.famc if f in families]
+        part.fams = [f for f in person.fams if f in families]
+        part.facts = [f for f in person.facts if _linked(f, persons, families)]
+        _xrefs(part.facts, referenced)
+        subset.persons[xref] = part
+
+    for fam_id, family in tree.families.items():
+        if fam_id not in families:
+            continue
+        part_family: Family = copy.copy(family)
+        part_family.husb = family.husb if family.husb in persons else None
+        part_family.wife = family.wife if family.wife in persons else None
+        part_family.children = [c for c in family.children if c in persons]
+        part_family.facts = [f for f in family.facts if _linked(f, persons, families)]
+        _xrefs(part_family.facts, referenced)
+        subset.families[fam_id] = part_family
+
+    if tree.header is not None:
+        _xrefs(tree.header.sub_facts, referenced)
+    # Sources can cite other records, e.g. a repository or a note
+    for xref in sorted(referenced & tree.sources.keys()):
+        _xrefs(tree.sources[xref].facts, referenced)
+    subset.sources = {
+        xref: source for xref, source in tree.sources.items() if xref in referenced
+    }
+    # Other records keep their "@XREF@ TAG" line as the value
+    subset.data = [
+        fact
+        for fact in tree.data
+        if not fact.value.startswith("@") or fact.value.split()[0] in referenced
+    ]
+    return subset
@@ -0,0 +1,97 @@
+import re
+from datetime import datetime
+
+from gedcom.fact import Fact, GedcomTag
+
+_YEAR = re.compile(r"(\d{4})")
+
+EARLY_LIFE_YEARS = 18  # early life ends at birth + 18
+MID_LIFE_YEARS = 65  # mid life ends at birth + 65
+
+# Record links and bookkeeping, never shown as life events
+_NOT_EVENTS = {GedcomTag.OBJE, GedcomTag.RIN, GedcomTag.FAMC, GedcomTag.FAMS}
+
+
+def is_bookkeeping(fact: Fact) -> bool:
+    """
+    Known vendor tags like _UID and _UPD only track the record. Custom tags the parser
+    kept by name, e.g. FamilySearch's _FSFTID, are shown as written.
+    """
+    return isinstance(fact.tag, GedcomTag) and fact.tag.name.startswith("_")
+
+
+def extract_year(date: str | None) -> int | None:
+    if not date:
+        return None
+    match = _YEAR.search(str(date))
+    return int(match.group(1)) if match else None
+
+
+class Timeline:
+    """
+    A person's facts split into life stages, built once while the tree is parsed and
+    read by the person page and the LLM context builder.
+
+    Each stage holds (year, fact) pairs in record order; year is None for undated facts.
+    Dated facts go to early (up to birth + 18), mid (up to birth + 65) or late life (up
+    to the death year, or this year for the living). Everything else, including all
+    facts of people without a known birth year, goes to other.
+    """
+
+    __slots__ = ("birth_year", "death_year", "early", "mid", "late", "other")
+
+    def __init__(self, birth_year: int | None, death_year: int) -> None:
+        self.birth_year = birth_year
+        self.death_year = death_year
+        self.early: list[tuple[int | None, Fact]] = []
+        self.mid: list[tuple[int | None, Fact]] = []
+        self.late: list[tuple[int | None, Fact]] = []
+        self.other: list[tuple[int | None, Fact]] = []
+
+    def stages(self) -> list[tuple[str, list[tuple[int | None, Fact]]]]:
+        return [
+            ("early", self.early),
+            ("mid", self.mid),
+            ("late", self.late),
+            ("other", self.other),
+        ]
+
+    def __repr__(self) -> str:
+        return (
+            f"Timeline(birth={self.birth_year}, death={self.death_year}, "
+            f"early={len(self.early)}, mid={len(self.mid)}, late={len(self.late)}, "
+            f"other={len(self.other)})"
+        )
+
+
+def build_timeline(
+    facts: list[Fact], birthday: str | None, death: datetime | str | None
+) -> Timeline:
+    birth_year = extract_year(birthday)
+    death_year = extract_year(str(death) if death else None) or datetime.now().year
+    timeline = Timeline(birth_year, death_year)
+
+    for fact in facts:
+        if fact.tag in _NOT_EVENTS or is_bookkeeping(fact):
+            continue
+        date = next((s.value for s in fact.sub_facts if s.tag == GedcomTag.DATE), None)
+        year = extract_year(date)
+        if year is None or birth_year is None:
+            timeline.other.append((year, fact))
+        elif year <= birth_year + EARLY_LIFE_YEARS:
+            timeline.early.append((year, fact))
+        elif year <= birth_year + MID_LIFE_YEARS:
+            timeline.mid.append((year, fact))
+        elif year <= death_year:
+            timeline.late.append((year, fact))
+        else:
+            timeline.other.append((year, fact))
+    return timeline
+
+
+def timeline_of(person) -> Timeline:
+    """The person's timeline, built on the spot for people loaded from an older cache."""
+    timeline = getattr(person, "timeline", None)
+    if timeline is None:
+        timeline = build_timeline(person.facts, person.birthday, person.death)
+    return timeline
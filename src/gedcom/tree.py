@@ -2,8 +2,7 @@ from gedcom.person import Person
 from gedcom.family import Family
 from gedcom.fact import Fact, GedcomTag
 from gedcom.source import Source
-
-import time
+from pipeline.trace import count, span
 
 
 class FamilyTree:
@@ -15,38 +14,29 @@ class FamilyTree:
         self.trailer: Fact | None = None
         self.data: list[Fact] = []  # list of facts not related to above facts
 
-        self.parse_facts(facts)
-        start = time.time()
-        self.link_families()
-        print(f"Total link family time: {time.time() - start}")
+        with span("tree:records"):
+            self.parse_facts(facts)
+        with span("tree:link"):
+            self.link_families()
+        count("persons", len(self.persons))
+        count("families", len(self.families))
+        count("sources", len(self.sources))
 
     def parse_facts(self, facts: list[Fact]) -> None:
-        person_time = family_time = source_time = 0.0
-
         for fact in facts:
             if fact.tag == GedcomTag.HEAD:
                 self.header = fact
             elif fact.tag == GedcomTag.TRLR:
                 self.trailer = fact
             elif fact.tag == GedcomTag.INDI:
-                start = time.time()
                 self.persons[fact.value] = Person(fact)
-                person_time += time.time() - start
             elif fact.tag == GedcomTag.FAM:
-                start = time.time()
                 self.families[fact.value] = Family(fact)
-                family_time += time.time() - start
             elif fact.tag == GedcomTag.SOUR:
-                start = time.time()
                 self.sources[fact.value] = Source(fact)
-                source_time += time.time() - start
             else:
                 self.data.append(fact)
 
-        print(f"Total person time: {person_time}")
-        print(f"Total family time: {family_time}")
-        print(f"Total source time: {source_time}")
-
     def link_families(self) -> None:
         """After parsing all individuals and families, link them."""
         for fam_id, family in self.families.items():
@@ -55,23 +45,18 @@ class FamilyTree:
             if family.wife and self.persons.get(family.wife, None):
                 self.persons[family.wife].fams.append(fam_id)
 
-            if (
-                family.husb
-                and self.persons[family.husb].name
-                and family.wife
-                and self.persons[family.wife].name
-            ):
-                family.name = f"{self.persons[family.husb].name} and {self.persons[family.wife].name}"
-            elif family.husb and self.persons[family.husb].name:
-                family.name = self.persons[family.husb].name
-            elif family.wife and self.persons[family.wife].name:
-                family.name = self.persons[family.wife].name
-            else:
-                family.name = "Unknown"
+            family.name = self.family_name(family)
 
             for c in family.children:
                 if c in self.persons:
                     self.persons[c].famc.append(fam_id)
 
+    def family_name(self, family: Family) -> str:
+        husb = self.persons[family.husb].name if family.husb else None
+        wife = self.persons[family.wife].name if family.wife else None
+        if husb and wife:
+            return f"{husb} and {wife}"
+        return husb or wife or "Unknown"
+
     def __repr__(self) -> str:
         return f"FamilyTree(persons={len(self.persons)}, families={len(self.families)})"
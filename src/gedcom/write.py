@@ -0,0 +1,190 @@
+from functools import partial
+from itertools import chain
+from typing import Callable, Iterable
+
+import gedcom.encoding  # registers the ansel codec
+from gedcom.fact import Fact, GedcomTag
+from gedcom.family import Family
+from gedcom.person import Person
+from gedcom.source import Source
+from gedcom.tree import FamilyTree
+from pipeline.trace import count
+
+LINE_LENGTH = 255  # longest line GEDCOM 5.5.1 allows, without the line terminator
+BATCH_LINES = 10_000  # lines joined into one write call
+
+# Python codec for each HEAD.CHAR value the writer can declare
+WRITE_CHARSETS: dict[str, str] = {
+    "UTF-8": "utf-8",
+    "UNICODE": "utf-16",
+    "ANSEL": "ansel",
+    "ASCII": "ascii",
+}
+
+LINK_TAGS = (GedcomTag.HUSB, GedcomTag.WIFE, GedcomTag.CHIL)
+# Source attributes parsed out of their facts, and the tag each came from
+SOURCE_FIELDS = (
+    ("title", GedcomTag.TITL),
+    ("origin", GedcomTag._TYPE),
+    ("publisher", GedcomTag.PUBL),
+    ("link", GedcomTag.FILE),
+)
+
+
+def split_value(text: str, first_width: int, width: int) -> list[str]:
+    """
+    Pieces for a line and its CONC lines. Cuts never fall next to a space, which
+    readers that trim lines would lose.
+    """
+    pieces = []
+    start = 0
+    limit = first_width
+    while len(text) - start > limit:
+        cut = start + limit
+        while cut > start + 1 and (text[cut - 1] == " " or text[cut] == " "):
+            cut -= 1
+        if cut == start + 1:
+            cut = start + limit
+        pieces.append(text[start:cut])
+        start = cut
+        limit = width
+    pieces.append(text[start:])
+    return pieces
+
+
+def value_lines(prefix: str, level: int, value: str, out: list[str]) -> None:
+    """A value over several lines: CONT for each line break, CONC for long lines."""
+    conc = f"{level} CONC "
+    for i, text in enumerate(value.split("\n")):
+        first = prefix if i == 0 else f"{level} CONT "
+        pieces = split_value(text, LINE_LENGTH - len(first), LINE_LENGTH - len(conc))
+        out.append(first + pieces[0] if pieces[0] else first[:-1])
+        out.extend(conc + piece for piece in pieces[1:])
+
+
+def fact_lines(
+    fact: Fact, level: int, out: list[str], value: str | None = None
+) -> None:
+    """Lines for the fact and its sub facts, with levels from their nesting."""
+    if value is None:
+        value = fact.value
+    prefix = f"{level} {fact.tag.name} "
+    if not value:
+        out.append(prefix[:-1])
+    elif "\n" in value or len(prefix) + len(value) > LINE_LENGTH:
+        value_lines(prefix, level + 1, value, out)
+    else:
+        out.append(prefix + value)
+    for sub in fact.sub_facts:
+        fact_lines(sub, level + 1, out)
+
+
+def header_lines(header: Fact | None, charset: str, out: list[str]) -> None:
+    out.append("0 HEAD")
+    if header is None:
+        out += ["1 SOUR gedcom2wiki", "1 GEDC", "2 VERS 5.5.1", "2 FORM LINEAGE-LINKED"]
+        out.append(f"1 CHAR {charset}")
+        return
+    # CHAR always names the encoding the file is written in
+    wrote_char = False
+    for fact in header.sub_facts:
+        if fact.tag is GedcomTag.CHAR:
+            fact_lines(fact, 1, out, charset)
+            wrote_char = True
+        else:
+            fact_lines(fact, 1, out)
+    if not wrote_char:
+        out.append(f"1 CHAR {charset}")
+
+
+def person_lines(person: Person, out: list[str]) -> None:
+    out.append(f"0 {person.xref_id} INDI")
+    # Person strips the slashes around surnames from NAME facts, they are kept aside
+    names = iter(getattr(person, "gedcom_names", ()))
+    for fact in person.facts:
+        if fact.tag is GedcomTag.NAME:
+            fact_lines(fact, 1, out, next(names, fact.value))
+        else:
+            fact_lines(fact, 1, out)
+
+
+def family_lines(family: Family, out: list[str]) -> None:
+    out.append(f"0 {family.xref_id} FAM")
+    # Family keeps only the HUSB/WIFE/CHIL facts that have sub facts
+    kept = {(f.tag, f.value) for f in family.facts if f.tag in LINK_TAGS}
+    links = [(GedcomTag.HUSB, family.husb), (GedcomTag.WIFE, family.wife)]
+    links += [(GedcomTag.CHIL, child) for child in family.children]
+    for tag, xref in links:
+        if xref and (tag, xref) not in kept:
+            out.append(f"1 {tag.name} {xref}")
+    for fact in family.facts:
+        fact_lines(fact, 1, out)
+
+
+def source_lines(source: Source, out: list[str]) -> None:
+    out.append(f"0 {source.xref_id} SOUR")
+    kept = {f.tag for f in source.facts}
+    for attribute, tag in SOURCE_FIELDS:
+        value = getattr(source, attribute)
+        if value != "Unknown" and tag not in kept:
+            fact_lines(Fact(1, tag, value), 1, out)
+    for fact in source.facts:
+        fact_lines(fact, 1, out)
+
+
+def record_lines(fact: Fact, out: list[str]) -> None:
+    if fact.tag is GedcomTag.OTHER:
+        # Records such as "0 @S1@ SUBM" keep their whole line as the value, notes
+        # such as "0 @N1@ NOTE ..." continue it on CONT/CONC lines
+        xref, _, rest = fact.value.partition(" ")
+        end = next((i for i, c in enumerate(rest) if c in " \n"), len(rest))
+        prefix = f"0 {xref} {rest[:end]} "
+        text = rest[end + 1 :] if rest[end : end + 1] == " " else rest[end:]
+        if "\n" in text or len(prefix) + len(text) > LINE_LENGTH:
+            value_lines(prefix, 1, text, out)
+        else:
+            out.append(f"0 {fact.value}")
+        for sub in fact.sub_facts:
+            fact_lines(sub, 1, out)
+    else:
+        fact_lines(fact, 0, out)
+
+
+def write_gedcom(tree: FamilyTree, path: str, charset: str = "UTF-8") -> int:
+    """
+    Write the tree as a GEDCOM 5.5.1 file in `charset`, one of WRITE_CHARSETS. Lines
+    are built per record and written in batches, so memory stays flat however large
+    the tree is. Characters the charset cannot encode raise UnicodeEncodeError.
+
+    :return: the number of lines written
+    """
+    codec = WRITE_CHARSETS[charset.upper()]
+    total = 0
+    with open(path, "w", encoding=codec, newline="\n", buffering=1 << 20) as f:
+        lines: list[str] = []
+
+        def flush() -> None:
+            nonlocal total
+            if lines:
+                f.write("\n".join(lines))
+                f.write("\n")
+                total += len(lines)
+                lines.clear()
+
+        header_lines(tree.header, charset.upper(), lines)
+        for fact in tree.data:
+            record_lines(fact, lines)
+        records: Iterable[Callable[[list[str]], None]] = chain(
+            (partial(person_lines, person) for person in tree.persons.values()),
+            (partial(family_lines, family) for family in tree.families.values()),
+            (partial(source_lines, source) for source in tree.sources.values()),
+        )
+        for write in records:
+            write(lines)
+            if len(lines) >= BATCH_LINES:
+                flush()
+        lines.append("0 TRLR")
+        flush()
+
+    count("records_written", len(tree.persons) + len(tree.families) + len(tree.sources))
+    return total
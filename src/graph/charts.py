@@ -0,0 +1,261 @@
+import os
+import json
+import hashlib
+
+from gedcom.tree import FamilyTree, Person
+from gedcom.relations import children_of
+from gedcom.timeline import extract_year
+
+CHART_GENERATIONS = 4
+MAX_DESCENDANT_NODES = 255  # keeps every chart file at a few KB
+
+
+def _label(person: Person) -> list[str]:
+    birth = extract_year(person.birthday)
+    death = extract_year(str(person.death) if person.death else None)
+    years = ""
+    if birth or death:
+        years = f"{birth or '?'}-{death or ''}"
+    return [person.xref_id, person.name or person.xref_id, years]
+
+
+def pedigree_layout(tree: FamilyTree, person_id: str, generations: int) -> dict:
+    """
+    Ancestor chart laid out by Ahnentafel slot: generation g is column g and ancestor
+    number n sits at row (n - 2^g + 0.5) / 2^g, so the chart never needs a layout search.
+
+    :return: {"nodes": [[xref, name, years, x, y], ...], "edges": [[from, to], ...]}
+             with x in generations and y in [0, 1].
+    """
+    nodes: list[list] = []
+    edges: list[list[int]] = []
+    level = [(1, person_id, -1)]  # (sosa, person_id, child node index)
+    for generation in range(generations + 1):
+        width = 1 << generation
+        next_level = []
+        for sosa, pid, child in level:
+            i = len(nodes)
+            y = (sosa - width + 0.5) / width
+            nodes.append(_label(tree.persons[pid]) + [generation, round(y, 4)])
+            if child >= 0:
+                edges.append([child, i])
+            family = next(
+                (
+                    tree.families[f]
+                    for f in tree.persons[pid].famc
+                    if f in tree.families
+                ),
+                None,
+            )
+            if family is None:
+                continue
+            for parent_id, parent_sosa in (
+                (family.husb, 2 * sosa),
+                (family.wife, 2 * sosa + 1),
+            ):
+                if parent_id and parent_id in tree.persons:
+                    next_level.append((parent_sosa, parent_id, i))
+        level = next_level
+        if not level:
+            break
+    return {"nodes": nodes, "edges": edges}
+
+
+def descendant_layout(tree: FamilyTree, person_id: str, generations: int) -> dict:
+    """
+    Descendant chart in linear time: leaves take consecutive slots in depth-first order
+    and every parent is centred over its first and last child. Charts are capped at
+    MAX_DESCENDANT_NODES, with "truncated" set when people were left out.
+
+    :return: {"nodes": [[xref, name, years, x, y], ...], "edges": [[from, to], ...],
+             "truncated": bool} with x in leaf slots and y in generations.
+    """
+    nodes: list[list] = [_label(tree.persons[person_id]) + [0, 0]]
+    children: list[list[int]] = [[]]
+    truncated = False
+
+    # Breadth-first collection so the cap drops the deepest generations first
+    frontier = [0]
+    ids = [person_id]
+    for depth in range(1, generations + 1):
+        next_frontier = []
+        for i in frontier:
+            for child_id in dict.fromkeys(children_of(tree, ids[i])):
+                if len(nodes) >= MAX_DESCENDANT_NODES:
+                    truncated = True
+                    break
+                j = len(nodes)
+                nodes.append(_label(tree.persons[child_id]) + [0, depth])
+                children.append([])
+                children[i].append(j)
+                ids.append(child_id)
+                next_frontier.append(j)
+        frontier = next_frontier
+        if not frontier:
+            break
+    if frontier and any(children_of(tree, ids[i]) for i in frontier):
+        truncated = True
+
+    # Iterative post-order placement
+    next_slot = 0
+    stack = [(0, False)]
+    while stack:
+        i, expanded = stack.pop()
+        if not children[i]:
+            nodes[i][3] = next_slot
+            next_slot += 1
+        elif expanded:
+            first, last = children[i][0], children[i][-1]
+            nodes[i][3] = (nodes[first][3] + nodes[last][3]) / 2
+        else:
+            stack.append((i, True))
+            stack.extend((c, False) for c in reversed(children[i]))
+
+    edges = [[i, c] for i, cs in enumerate(children) for c in cs]
+    return {"nodes": nodes, "edges": edges, "truncated": truncated}
+
+
+def chart_script(tree: FamilyTree, person_id: str, generations: int) -> str:
+    data = {
+        "id": person_id,
+        "ancestors": pedigree_layout(tree, person_id, generations),
+        "descendants": descendant_layout(tree, person_id, generations),
+    }
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return f"GedcomChart.render({payload});\n"
+
+
+def write_person_charts(
+    tree: FamilyTree, output_path: str, generations: int = CHART_GENERATIONS
+) -> int:
+    """
+    Write one small chart script per person under <output_path>/charts plus the shared
+    viewer. Content hashes from the previous run are kept in charts/manifest.json, and
+    charts whose layout did not change are not rewritten.
+
+    :return: the number of chart files written
+    """
+    charts_dir = os.path.join(output_path, "charts")
+    os.makedirs(charts_dir, exist_ok=True)
+    manifest_path = os.path.join(charts_dir, "manifest.json")
+
+    previous: dict[str, str] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    hashes: dict[str, str] = {}
+    written = 0
+    for person_id in tree.persons:
+        script = chart_script(tree, person_id, generations)
+        digest = hashlib.sha1(script.encode("utf-8")).hexdigest()
+        hashes[person_id] = digest
+        chart_file = os.path.join(charts_dir, f"{person_id}.js")
+        if previous.get(person_id) == digest and os.path.exists(chart_file):
+            continue
+        with open(chart_file, "w", encoding="utf-8") as f:
+            f.write(script)
+        written += 1
+
+    with open(os.path.join(charts_dir, "chart.html"), "w", encoding="utf-8") as f:
+        f.write(CHART_HTML)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, separators=(",", ":"))
+    return written
+
+
+CHART_HTML = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+<title>Family Charts</title>
+<style>
+body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+       background: #1a1b1e; color: #e4e5e7; margin: 0 auto; padding: 2rem; max-width: 1400px; }
+a { color: #4f6df5; text-decoration: none; }
+h2 { margin: 1.5rem 0 0.5rem 0; }
+svg { background: #2c2e33; border-radius: 8px; display: block; }
+.box { fill: #1a1b1e; stroke: #4f6df5; stroke-width: 1.5px; }
+.self .box { stroke: #48a565; stroke-width: 2.5px; }
+.link { fill: none; stroke: #404347; stroke-width: 1.5px; }
+text { fill: #e4e5e7; font-size: 12px; }
+.years { fill: #a1a3a7; font-size: 11px; }
+</style>
+</head>
+<body>
+<nav><a id="home" href="../index.html">← Home</a> <a id="person" href="#"></a></nav>
+<h2>Ancestors</h2>
+<div id="ancestors"></div>
+<h2>Descendants</h2>
+<div id="descendants"></div>
+<p id="note"></p>
+<script>
+var GedcomChart = (function () {
+  var NS = "http://www.w3.org/2000/svg";
+  var BOX_W = 190, BOX_H = 36;
+
+  function el(name, attrs, parent) {
+    var e = document.createElementNS(NS, name);
+    for (var k in attrs) { e.setAttribute(k, attrs[k]); }
+    if (parent) { parent.appendChild(e); }
+    return e;
+  }
+
+  function draw(container, chart, toPoint) {
+    if (chart.nodes.length <= 1) { container.textContent = "None recorded."; return; }
+    var pts = chart.nodes.map(toPoint);
+    var maxX = 0, maxY = 0;
+    pts.forEach(function (p) { maxX = Math.max(maxX, p[0]); maxY = Math.max(maxY, p[1]); });
+    var svg = el("svg", { width: maxX + BOX_W + 20, height: maxY + BOX_H + 20 }, container);
+    var g = el("g", { transform: "translate(10,10)" }, svg);
+    chart.edges.forEach(function (e) {
+      var a = pts[e[0]], b = pts[e[1]];
+      el("path", { "class": "link", d: "M" + (a[0] + BOX_W / 2) + "," + (a[1] + BOX_H / 2) +
+        "L" + (b[0] + BOX_W / 2) + "," + (b[1] + BOX_H / 2) }, g);
+    });
+    chart.nodes.forEach(function (n, i) {
+      var a = el("a", { href: "../persons/" + encodeURIComponent(n[0]) + ".html",
+                        "class": i === 0 ? "self" : "" }, g);
+      el("rect", { "class": "box", x: pts[i][0], y: pts[i][1], width: BOX_W, height: BOX_H, rx: 5 }, a);
+      var t = el("text", { x: pts[i][0] + 8, y: pts[i][1] + 15 }, a);
+      t.textContent = n[1].length > 26 ? n[1].slice(0, 25) + "…" : n[1];
+      var y = el("text", { "class": "years", x: pts[i][0] + 8, y: pts[i][1] + 29 }, a);
+      y.textContent = n[2];
+    });
+  }
+
+  return {
+    render: function (data) {
+      document.title = "Family Charts: " + data.ancestors.nodes[0][1];
+      var link = document.getElementById("person");
+      link.href = "../persons/" + encodeURIComponent(data.id) + ".html";
+      link.textContent = data.ancestors.nodes[0][1];
+      var rows = 1;
+      data.ancestors.nodes.forEach(function (n) { rows = Math.max(rows, Math.pow(2, n[3])); });
+      var height = Math.max(rows * (BOX_H + 8), BOX_H);
+      draw(document.getElementById("ancestors"), data.ancestors, function (n) {
+        return [n[3] * (BOX_W + 30), n[4] * height - BOX_H / 2 + BOX_H / 2];
+      });
+      draw(document.getElementById("descendants"), data.descendants, function (n) {
+        return [n[3] * (BOX_W + 12), n[4] * (BOX_H + 40)];
+      });
+      if (data.descendants.truncated) {
+        document.getElementById("note").textContent =
+          "Only the closest descendants are shown.";
+      }
+    }
+  };
+})();
+
+(function () {
+  var id = new URLSearchParams(window.location.search).get("id");
+  if (!id) { return; }
+  var s = document.createElement("script");
+  s.src = encodeURIComponent(id) + ".js";
+  document.body.appendChild(s);
+})();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,111 @@
+import os
+import math
+import json
+import shutil
+
+TILE_PX = 512  # tile size on screen, in pixels
+NODE_SPACING = 160  # world pixels between neighbouring siblings
+GENERATION_SPACING = 120  # world pixels between generations
+CELL_PX = 6  # at overview levels keep one node per CELL_PX x CELL_PX screen cell
+EDGE_SCALE = 1 / 4  # edges and every node are kept from this scale up
+LABEL_SCALE = 1 / 2  # names are kept from this scale up
+
+
+def tile_levels(width: float, height: float) -> int:
+    """Number of zoom levels so that level 0 shows the whole tree in about one tile."""
+    extent = max(width, height, TILE_PX)
+    return math.ceil(math.log2(extent / TILE_PX)) + 1
+
+
+def _dump(z: int, tx: int, ty: int, tile: dict) -> str:
+    payload = json.dumps(tile, separators=(",", ":"), ensure_ascii=False)
+    return f"GedcomTiles.addTile({z},{tx},{ty},{payload});\n"
+
+
+def write_tiles(graph: dict, xs: list[float], output_path: str) -> int:
+    """
+    Write the laid-out graph as spatial tiles under <output_path>/tiles, one directory
+    per zoom level. Level z is drawn at scale 2^(z - top), so the deepest level is at
+    full size. Coarse levels are thinned to one node per screen cell and drop edges and
+    names, which keeps every tile small no matter how large the tree is. An edge is in
+    every tile its bounding box crosses. Empty tiles are not written.
+
+    :param graph: output of build_graph
+    :param xs: horizontal position of each node in sibling units (tidy_layout)
+    :return: the number of tile files written
+    """
+    tiles_dir = os.path.join(output_path, "tiles")
+    if os.path.isdir(tiles_dir):
+        shutil.rmtree(tiles_dir)  # tiles from a previous, differently sized tree
+    os.makedirs(tiles_dir)
+
+    ids, names, generations = graph["ids"], graph["names"], graph["generations"]
+    px = [round(x * NODE_SPACING) for x in xs]
+    py = [g * GENERATION_SPACING for g in generations]
+    width = max(px, default=0) + NODE_SPACING
+    height = max(py, default=0) + GENERATION_SPACING
+    levels = tile_levels(width, height)
+    top = levels - 1
+
+    edges = graph["edges"]
+    parents = graph["parents"]
+
+    written = 0
+    for z in range(levels):
+        scale = 2.0 ** (z - top)
+        span = TILE_PX / scale  # world pixels covered by one tile
+        tiles: dict[tuple[int, int], dict] = {}
+
+        def tile_at(key: tuple[int, int]) -> dict:
+            if key not in tiles:
+                tiles[key] = {"n": [], "e": []}
+            return tiles[key]
+
+        def tile(x: float, y: float) -> dict:
+            return tile_at((int(x // span), int(y // span)))
+
+        if scale >= EDGE_SCALE:
+            labels = scale >= LABEL_SCALE
+            for i in range(len(ids)):
+                node = [px[i], py[i], ids[i], names[i]] if labels else [px[i], py[i]]
+                tile(px[i], py[i])["n"].append(node)
+            for k in range(0, len(edges), 2):
+                p, c = edges[k], edges[k + 1]
+                edge = [px[p], py[p], px[c], py[c], int(parents[c] != p)]
+                # The curve stays inside the box of its endpoints, every tile the box
+                # crosses holds it so it shows when both endpoints are off-screen
+                x0, x1 = sorted((int(px[p] // span), int(px[c] // span)))
+                y0, y1 = sorted((int(py[p] // span), int(py[c] // span)))
+                for tx in range(x0, x1 + 1):
+                    for ty in range(y0, y1 + 1):
+                        tile_at((tx, ty))["e"].append(edge)
+        else:
+            cell = CELL_PX / scale
+            occupied: set[tuple[int, int]] = set()
+            for i in range(len(ids)):
+                key = (int(px[i] // cell), int(py[i] // cell))
+                if key not in occupied:
+                    occupied.add(key)
+                    tile(px[i], py[i])["n"].append([px[i], py[i]])
+
+        level_dir = os.path.join(tiles_dir, str(z))
+        os.makedirs(level_dir)
+        for (tx, ty), data in tiles.items():
+            with open(
+                os.path.join(level_dir, f"{tx}_{ty}.js"), "w", encoding="utf-8"
+            ) as f:
+                f.write(_dump(z, tx, ty, data))
+            written += 1
+
+    index = {
+        "tile": TILE_PX,
+        "levels": levels,
+        "width": width,
+        "height": height,
+        "nodes": len(ids),
+        "labelScale": LABEL_SCALE,
+        "nodeSpacing": NODE_SPACING,
+    }
+    with open(os.path.join(tiles_dir, "index.js"), "w", encoding="utf-8") as f:
+        f.write(f"GedcomTiles.setIndex({json.dumps(index)});\n")
+    return written
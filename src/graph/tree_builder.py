@@ -1,176 +1,441 @@
 import os
-import json
+from collections import deque
 from gedcom.tree import FamilyTree, Person
+from gedcom.numbering import Numbering
+from gedcom.relations import parents_of, children_of
+from graph.tiles import write_tiles
 
 
-def build_hierarchy(family_tree: FamilyTree) -> dict:
-    root_persons = [p for p in family_tree.persons.values() if len(p.famc) == 0]
-    if not root_persons:
-        root_persons = list(family_tree.persons.values())
-
-    def person_to_node(p: Person) -> dict:
-        children_nodes = []
-        for fam_id in p.fams:
-            if fam_id in family_tree.families:
-                fam = family_tree.families[fam_id]
-                for c_id in fam.children:
-                    if c_id in family_tree.persons:
-                        c = family_tree.persons[c_id]
-                        children_nodes.append(person_to_node(c))
-        children_nodes.sort(key=lambda x: x.get("name", ""))
-        display_name = p.name if p.name else p.xref_id
-        return {
-            "name": f"{display_name} ({p.xref_id})",
-            "xref_id": p.xref_id,
-            "children": children_nodes,
-        }
+def build_graph(family_tree: FamilyTree, numbering: Numbering | None = None) -> dict:
+    """
+    Flatten the family tree into node and edge arrays, emitting every person once.
 
-    if len(root_persons) > 1:
-        root_data = {
-            "name": "Family Roots",
-            "xref_id": "ROOTS",
-            "children": [person_to_node(r) for r in root_persons],
-        }
-    else:
-        root_data = person_to_node(root_persons[0])
+    People are ordered topologically (parents before children) in one pass. Each person
+    is laid out under their deepest parent, which keeps married-in spouses without
+    parents from pulling a child up a generation and gives a spanning forest to lay out.
+    Every other parent/child link stays in "edges", so intermarriage shows up as extra
+    links instead of duplicated subtrees.
+
+    :return: {"ids", "names", "parents", "generations", "edges"} where parents[i] is the
+             index of person i's layout parent (-1 for roots), generations[i] is their
+             depth in that forest and edges is a flat [parent, child, ...] list of every
+             parent/child link. Names start with the person's Sosa and d'Aboville
+             numbers from numbering, if given.
+    """
+    persons = family_tree.persons
+
+    def display(p: Person) -> str:
+        return f"{p.name if p.name else p.xref_id} ({p.xref_id})"
+
+    def label(p: Person) -> str:
+        if numbering is None:
+            return display(p)
+        numbers = []
+        if p.xref_id in numbering.sosa:
+            numbers.append(f"Sosa {numbering.sosa[p.xref_id]}")
+        if p.xref_id in numbering.daboville:
+            numbers.append(numbering.daboville[p.xref_id])
+        # First, so they survive the label being cut short at low zoom
+        return " · ".join([*numbers, display(p)])
+
+    parents = {
+        pid: list(dict.fromkeys(parents_of(family_tree, pid))) for pid in persons
+    }
+    remaining = {pid: len(parents[pid]) for pid in persons}
+    ready = deque(
+        sorted(
+            (pid for pid, n in remaining.items() if n == 0),
+            key=lambda pid: display(persons[pid]),
+        )
+    )
+
+    index: dict[str, int] = {}
+    order: list[str] = []
+    layout_parent: list[int] = []
+    depth: list[int] = []
+
+    def visit(person_id: str) -> None:
+        # Parents still unplaced here are only possible inside a famc cycle
+        placed = [index[p] for p in parents[person_id] if p in index]
+        parent = max(placed, key=lambda i: depth[i], default=-1)
+        index[person_id] = len(order)
+        order.append(person_id)
+        layout_parent.append(parent)
+        depth.append(depth[parent] + 1 if parent >= 0 else 0)
+        for child_id in dict.fromkeys(children_of(family_tree, person_id)):
+            remaining[child_id] -= 1
+            if remaining[child_id] == 0:
+                ready.append(child_id)
+
+    for person_id in persons:
+        while ready:
+            ready_id = ready.popleft()
+            if ready_id not in index:
+                visit(ready_id)
+        if person_id not in index:
+            visit(person_id)  # break a famc cycle at the first unplaced person
+
+    edges: list[int] = []
+    for i, person_id in enumerate(order):
+        for child_id in dict.fromkeys(children_of(family_tree, person_id)):
+            edges.append(i)
+            edges.append(index[child_id])
+
+    return {
+        "ids": order,
+        "names": [label(persons[pid]) for pid in order],
+        "parents": layout_parent,
+        "generations": depth,
+        "edges": edges,
+    }
+
+
+def tidy_layout(graph: dict) -> list[float]:
+    """
+    Linear-time tidy tree layout (Buchheim, Jünger and Leipert's improvement of
+    Walker's algorithm, as used by d3.tree) of the layout forest from build_graph.
+    The roots hang under one synthetic root, and both walks are iterative so depth is
+    not limited by the recursion limit.
 
-    return root_data
+    :return: x position of each node in sibling units, with the leftmost node at 0.
+             Siblings are 1 apart and cousins at least 2.
+    """
+    n = len(graph["ids"])
+    root, top = n, n + 1
+    parent = [p if p >= 0 else root for p in graph["parents"]] + [top, -1]
+    children: list[list[int]] = [[] for _ in range(n + 2)]
+    for v in range(n):
+        children[parent[v]].append(v)
+    children[top].append(root)
+
+    number = [0] * (n + 2)  # position among siblings
+    for kids in children:
+        for i, c in enumerate(kids):
+            number[c] = i
+    prelim = [0.0] * (n + 2)
+    mod = [0.0] * (n + 2)
+    change = [0.0] * (n + 2)
+    shift = [0.0] * (n + 2)
+    thread = [-1] * (n + 2)
+    ancestor = list(range(n + 2))
+    default_ancestor = [-1] * (n + 2)
+
+    def separation(a: int, b: int) -> float:
+        return 1.0 if parent[a] == parent[b] else 2.0
+
+    def next_left(v: int) -> int:
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v: int) -> int:
+        return children[v][-1] if children[v] else thread[v]
+
+    def move_subtree(wm: int, wp: int, amount: float) -> None:
+        step = amount / (number[wp] - number[wm])
+        change[wp] -= step
+        shift[wp] += amount
+        change[wm] += step
+        prelim[wp] += amount
+        mod[wp] += amount
+
+    def execute_shifts(v: int) -> None:
+        total = acc = 0.0
+        for w in reversed(children[v]):
+            prelim[w] += total
+            mod[w] += total
+            acc += change[w]
+            total += shift[w] + acc
+
+    def apportion(v: int, w: int, default: int) -> int:
+        # Push v's subtree right until its left contour clears everything to its left
+        if w < 0:
+            return default
+        vip = vop = v
+        vim = w
+        vom = children[parent[v]][0]
+        sip, sop, sim, som = mod[vip], mod[vop], mod[vim], mod[vom]
+        vim, vip = next_right(vim), next_left(vip)
+        while vim >= 0 and vip >= 0:
+            vom = next_left(vom)
+            vop = next_right(vop)
+            ancestor[vop] = v
+            amount = prelim[vim] + sim - prelim[vip] - sip + separation(vim, vip)
+            if amount > 0:
+                left = ancestor[vim] if parent[ancestor[vim]] == parent[v] else default
+                move_subtree(left, v, amount)
+                sip += amount
+                sop += amount
+            sim += mod[vim]
+            sip += mod[vip]
+            som += mod[vom]
+            sop += mod[vop]
+            vim, vip = next_right(vim), next_left(vip)
+        if vim >= 0 and next_right(vop) < 0:
+            thread[vop] = vim
+            mod[vop] += sim - sop
+        if vip >= 0 and next_left(vom) < 0:
+            thread[vom] = vip
+            mod[vom] += sip - som
+            default = v
+        return default
+
+    # Pre-order with the rightmost child first, reversed this is a left-to-right post-order
+    order: list[int] = []
+    stack = [root]
+    while stack:
+        v = stack.pop()
+        order.append(v)
+        stack.extend(children[v])
+
+    for v in reversed(order):
+        kids = children[v]
+        siblings = children[parent[v]]
+        w = siblings[number[v] - 1] if number[v] else -1
+        if kids:
+            execute_shifts(v)
+            midpoint = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + separation(v, w)
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        elif w >= 0:
+            prelim[v] = prelim[w] + separation(v, w)
+        p = parent[v]
+        default_ancestor[p] = apportion(
+            v, w, default_ancestor[p] if default_ancestor[p] >= 0 else siblings[0]
+        )
+
+    x = [0.0] * (n + 2)
+    mod[top] = -prelim[root]
+    for v in order:
+        x[v] = prelim[v] + mod[parent[v]]
+        mod[v] += mod[parent[v]]
+
+    left = min(x[:n], default=0.0)
+    return [xi - left for xi in x[:n]]
 
 
 def generate_hierarchical_tree(
-    family_tree: FamilyTree, output_path: str, filename: str = "family_tree_static.html"
+    family_tree: FamilyTree,
+    output_path: str,
+    filename: str = "family_tree_static.html",
+    numbering: Numbering | None = None,
 ):
+    """
+    Lay the whole tree out in Python and write it as zoomable tiles with a canvas viewer
+    that only loads the visible tiles, so it stays usable for any tree size and works
+    offline.
+    """
     os.makedirs(output_path, exist_ok=True)
     html_path = os.path.join(output_path, filename)
 
-    data = build_hierarchy(family_tree)
-    data_json = json.dumps(data)
+    data = build_graph(family_tree, numbering)
+    xs = tidy_layout(data)
+    tiles = write_tiles(data, xs, output_path)
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(VIEWER_HTML)
 
-    # Note: No 'f' prefix in the triple-quoted string now.
-    # Use {{ and }} for literal braces in JS code.
-    html_template = """
-<!DOCTYPE html>
+    print(f"Generated: {html_path} ({tiles} tiles)")
+
+
+VIEWER_HTML = r"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
 <title>Family Tree</title>
 <style>
-body {{
-    font-family: sans-serif;
-    margin: 0;
-    padding: 0;
-    overflow: auto;
-}}
-.node rect {{
-    fill: #fff;
-    stroke: steelblue;
-    stroke-width: 1.5px;
-}}
-.node text {{
-    font: 12px sans-serif;
-    fill: red; /* red and bold from previous request */
-    font-weight: bold;
-    pointer-events: none;
-}}
-.link {{
-    fill: none;
-    stroke: #ccc;
-    stroke-width: 1.5px;
-}}
+html, body { margin: 0; height: 100%; overflow: hidden; font-family: sans-serif; }
+canvas { display: block; cursor: grab; }
+#status { position: fixed; left: 10px; bottom: 10px; background: rgba(255,255,255,0.85);
+          padding: 4px 8px; border-radius: 4px; font-size: 12px; }
 </style>
 </head>
 <body>
-<h1 style="text-align:center;">Family Tree</h1>
-<div id="tree-container" style="width:100%; height:auto; overflow:auto;"></div>
-
-<script src="https://d3js.org/d3.v7.min.js"></script>
+<canvas id="view"></canvas>
+<div id="status">Loading…</div>
 <script>
-var data = {data_json};
-
-var svg = d3.select("#tree-container").append("svg");
-var g = svg.append("g");
-
-// Create a tree layout with spacing
-var treemap = d3.tree()
-    .nodeSize([200, 100]) 
-    .separation((a, b) => (a.parent == b.parent ? 1.5 : 2));
-
-var root = d3.hierarchy(data, d => d.children);
-root = treemap(root);
-
-// Create links
-g.selectAll(".link")
-    .data(root.links())
-    .enter().append("path")
-    .attr("class", "link")
-    .attr("d", d => {{
-        return "M" + d.source.x + "," + d.source.y
-             + "C" + d.source.x + "," + (d.source.y + d.target.y)/2
-             + " " + d.target.x + "," + (d.source.y + d.target.y)/2
-             + " " + d.target.x + "," + d.target.y;
-    }});
-
-// Create nodes
-var node = g.selectAll(".node")
-    .data(root.descendants())
-    .enter().append("g")
-    .attr("class", "node")
-    .attr("transform", d => "translate(" + d.x + "," + d.y + ")");
-
-// Calculate rect width based on text length
-node.each(function(d) {{
-    d.textLength = d.data.name.length * 7;
-}});
-
-node.append("rect")
-    .attr("width", d => d.textLength)
-    .attr("height", 20)
-    .attr("x", d => -d.textLength/2)
-    .attr("y", -10)
-    .attr("rx", 5)
-    .attr("ry", 5);
-
-node.append("text")
-    .attr("dy", ".35em")
-    .attr("text-anchor", "middle")
-    .text(d => d.data.name);
-
-// Add click event
-node.on("click", (event, d) => {{
-    if (d.data.xref_id && d.data.xref_id !== "ROOTS") {{
-        var url = "persons/" + d.data.xref_id + ".html";
-        window.open(url, "_blank");
-    }}
-}});
-
-// Adjust SVG to fit all nodes
-var minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
-root.descendants().forEach(d => {{
-  if (d.x < minX) minX = d.x;
-  if (d.x > maxX) maxX = d.x;
-  if (d.y < minY) minY = d.y;
-  if (d.y > maxY) maxY = d.y;
-}});
-
-var padding = 50;
-var fullWidth = (maxX - minX) + padding * 2;
-var fullHeight = (maxY - minY) + padding * 2;
-
-svg
-    .attr("width", fullWidth)
-    .attr("height", fullHeight);
-
-g.attr("transform", "translate(" + (padding - minX) + "," + (padding - minY) + ")");
+var GedcomTiles = (function () {
+  var canvas = document.getElementById("view");
+  var ctx = canvas.getContext("2d");
+  var status = document.getElementById("status");
+  var index = null;
+  var tiles = {};  // "z/x/y" -> tile data, or false while loading / when missing
+  var view = { scale: 1, x: 0, y: 0 };
+  var BOX_W = 150, BOX_H = 22;
+
+  function key(z, x, y) { return z + "/" + x + "/" + y; }
+
+  function level() {
+    var top = index.levels - 1;
+    var z = top + Math.ceil(Math.log2(view.scale) - 1e-9);
+    return Math.max(0, Math.min(top, z));
+  }
+
+  function request(z, x, y) {
+    var k = key(z, x, y);
+    if (k in tiles) { return; }
+    tiles[k] = false;
+    var s = document.createElement("script");
+    s.src = "tiles/" + z + "/" + x + "_" + y + ".js";
+    s.onload = s.onerror = function () { s.remove(); };
+    document.body.appendChild(s);
+  }
+
+  function visibleTiles(z) {
+    var span = index.tile / Math.pow(2, z - (index.levels - 1));
+    var x0 = Math.max(0, Math.floor(-view.x / view.scale / span));
+    var y0 = Math.max(0, Math.floor(-view.y / view.scale / span));
+    var x1 = Math.min(Math.floor(index.width / span), Math.floor((canvas.width - view.x) / view.scale / span));
+    var y1 = Math.min(Math.floor(index.height / span), Math.floor((canvas.height - view.y) / view.scale / span));
+    var out = [];
+    for (var x = x0; x <= x1; x++) { for (var y = y0; y <= y1; y++) { out.push([x, y]); } }
+    return out;
+  }
+
+  function sx(x) { return x * view.scale + view.x; }
+  function sy(y) { return y * view.scale + view.y; }
+
+  function draw() {
+    if (!index) { return; }
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.fillStyle = "#fff";
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    var z = level();
+    var visible = visibleTiles(z);
+    var loaded = [];
+    visible.forEach(function (t) {
+      var tile = tiles[key(z, t[0], t[1])];
+      if (tile) { loaded.push(tile); } else { request(z, t[0], t[1]); }
+    });
+
+    var labels = view.scale >= index.labelScale;
+    var half = labels ? BOX_H / 2 * view.scale : 0;
+    ctx.lineWidth = 1;
+    // Long edges are in every tile they cross, each is drawn once
+    var drawn = {};
+    loaded.forEach(function (tile) {
+      tile.e.forEach(function (e) {
+        var id = e.join(",");
+        if (drawn[id]) { return; }
+        drawn[id] = true;
+        ctx.strokeStyle = e[4] ? "#9ab" : "#bbb";
+        ctx.setLineDash(e[4] ? [4, 3] : []);
+        var x1 = sx(e[0]), y1 = sy(e[1]) + half, x2 = sx(e[2]), y2 = sy(e[3]) - half;
+        var ym = (y1 + y2) / 2;
+        ctx.beginPath();
+        ctx.moveTo(x1, y1);
+        ctx.bezierCurveTo(x1, ym, x2, ym, x2, y2);
+        ctx.stroke();
+      });
+    });
+    ctx.setLineDash([]);
+
+    ctx.font = Math.round(12 * Math.min(1, view.scale * 1.5)) + "px sans-serif";
+    ctx.textAlign = "center";
+    ctx.textBaseline = "middle";
+    loaded.forEach(function (tile) {
+      tile.n.forEach(function (n) {
+        var x = sx(n[0]), y = sy(n[1]);
+        if (labels && n.length > 2) {
+          var w = BOX_W * view.scale, h = BOX_H * view.scale;
+          ctx.fillStyle = "#fff";
+          ctx.strokeStyle = "steelblue";
+          ctx.fillRect(x - w / 2, y - h / 2, w, h);
+          ctx.strokeRect(x - w / 2, y - h / 2, w, h);
+          ctx.fillStyle = "#b22";
+          var name = n[3].length > 24 ? n[3].slice(0, 23) + "…" : n[3];
+          ctx.fillText(name, x, y);
+        } else {
+          ctx.fillStyle = "steelblue";
+          ctx.fillRect(x - 1.5, y - 1.5, 3, 3);
+        }
+      });
+    });
+    status.textContent = index.nodes + " people · zoom level " + z + " of " + (index.levels - 1)
+      + " · drag to pan, scroll to zoom" + (labels ? ", click a name to open it" : "");
+  }
+
+  var pending = false;
+  function redraw() {
+    if (pending) { return; }
+    pending = true;
+    requestAnimationFrame(function () { pending = false; draw(); });
+  }
+
+  function resize() {
+    canvas.width = window.innerWidth;
+    canvas.height = window.innerHeight;
+    redraw();
+  }
+
+  function zoomAt(px, py, factor) {
+    var scale = Math.max(1e-6, Math.min(2, view.scale * factor));
+    view.x = px - (px - view.x) * scale / view.scale;
+    view.y = py - (py - view.y) * scale / view.scale;
+    view.scale = scale;
+    redraw();
+  }
+
+  canvas.addEventListener("wheel", function (ev) {
+    ev.preventDefault();
+    zoomAt(ev.offsetX, ev.offsetY, Math.exp(-ev.deltaY * 0.002));
+  }, { passive: false });
+
+  var drag = null;
+  canvas.addEventListener("mousedown", function (ev) {
+    drag = { x: ev.clientX, y: ev.clientY, moved: false };
+  });
+  window.addEventListener("mousemove", function (ev) {
+    if (!drag) { return; }
+    view.x += ev.clientX - drag.x;
+    view.y += ev.clientY - drag.y;
+    drag.moved = drag.moved || Math.abs(ev.clientX - drag.x) + Math.abs(ev.clientY - drag.y) > 2;
+    drag.x = ev.clientX;
+    drag.y = ev.clientY;
+    redraw();
+  });
+  window.addEventListener("mouseup", function (ev) {
+    var click = drag && !drag.moved;
+    drag = null;
+    if (click && view.scale >= index.labelScale) { open(ev.offsetX, ev.offsetY); }
+  });
+
+  function open(px, py) {
+    var z = level();
+    var wx = (px - view.x) / view.scale, wy = (py - view.y) / view.scale;
+    visibleTiles(z).forEach(function (t) {
+      var tile = tiles[key(z, t[0], t[1])];
+      if (!tile) { return; }
+      tile.n.forEach(function (n) {
+        if (n.length > 2 && Math.abs(n[0] - wx) <= BOX_W / 2 && Math.abs(n[1] - wy) <= BOX_H / 2) {
+          window.open("../persons/" + encodeURIComponent(n[2]) + ".html", "_blank");
+        }
+      });
+    });
+  }
+
+  window.addEventListener("resize", resize);
+
+  return {
+    setIndex: function (data) {
+      index = data;
+      canvas.width = window.innerWidth;
+      canvas.height = window.innerHeight;
+      view.scale = Math.min(1, canvas.width / data.width, canvas.height / data.height) * 0.95;
+      view.x = (canvas.width - data.width * view.scale) / 2 + data.nodeSpacing / 2 * view.scale;
+      view.y = 20;
+      redraw();
+    },
+    addTile: function (z, x, y, data) {
+      tiles[key(z, x, y)] = data;
+      redraw();
+    }
+  };
+})();
 </script>
+<script src="tiles/index.js"></script>
 </body>
 </html>
 """
-
-    # Use format instead of f-string for data insertion
-    html_content = html_template.format(data_json=data_json)
-
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    print(f"Generated: {html_path}")
@@ -0,0 +1,260 @@
+import time
+import sqlite3
+import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+import httpx
+from ollama import Client, ResponseError
+
+from gedcom.tree import FamilyTree
+from llm.llama import (
+    MODEL,
+    SYSTEM_PROMPT,
+    CONTEXT_TOKENS,
+    build_prompt,
+    estimate_tokens,
+)
+from llm.stats import CallStats, LLMStats
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def bio_key(prompt: str, model: str) -> str:
+    """Cache key of a biography, it changes whenever the person's facts, prompt or model do."""
+    return hashlib.sha256(
+        f"{model}\0{SYSTEM_PROMPT}\0{prompt}".encode("utf-8")
+    ).hexdigest()
+
+
+class BioStore:
+    """
+    Generated biographies in SQLite, keyed by bio_key. Every result is committed as soon
+    as it arrives, so an interrupted run keeps everything finished so far and the next
+    run only requests the rest.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS bios ("
+            "key TEXT PRIMARY KEY, person_id TEXT, model TEXT, bio TEXT, created REAL)"
+        )
+        self.db.commit()
+
+    def get(self, key: str) -> str | None:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT bio FROM bios WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, person_id: str, model: str, bio: str) -> None:
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO bios VALUES (?, ?, ?, ?, ?)",
+                (key, person_id, model, bio, time.time()),
+            )
+            self.db.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM bios").fetchone()[0]
+
+
+class Progress:
+    """Prints completed/total, rate and ETA at most every `interval` seconds."""
+
+    def __init__(self, total: int, interval: float = 5.0) -> None:
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.start = self.last = time.time()
+
+    def update(self, failed: bool = False) -> None:
+        self.done += 1
+        self.failed += failed
+        now = time.time()
+        if now - self.last >= self.interval or self.done == self.total:
+            self.last = now
+            print(self.line(now))
+
+    def line(self, now: float | None = None) -> str:
+        elapsed = (now or time.time()) - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        minutes, seconds = divmod(int(eta), 60)
+        return (
+            f"Bios: {self.done}/{self.total} ({100 * self.done / self.total:.1f}%), "
+            f"{self.failed} failed, {rate:.2f}/s, ETA {minutes}m{seconds:02d}s"
+        )
+
+
+def lookup_bios(
+    tree: FamilyTree,
+    store: BioStore,
+    person_ids: list[str] | None = None,
+    model: str = MODEL,
+    context_tokens: int = CONTEXT_TOKENS,
+) -> tuple[dict[str, str], dict[str, tuple[str, str]]]:
+    """
+    Read stored biographies without contacting the model.
+
+    :return: ({person_id: biography}, {person_id: (key, prompt)} of people without one)
+    """
+    person_ids = list(tree.persons) if person_ids is None else person_ids
+    bios: dict[str, str] = {}
+    missing: dict[str, tuple[str, str]] = {}
+    for person_id in person_ids:
+        prompt = build_prompt(tree.persons[person_id], tree, context_tokens)
+        key = bio_key(prompt, model)
+        stored = store.get(key)
+        if stored is not None:
+            bios[person_id] = stored
+        else:
+            missing[person_id] = (key, prompt)
+    return bios, missing
+
+
+def stream_generate(client: Client, model: str, prompt: str) -> tuple[str, CallStats]:
+    """Stream one response, timing the first token and the whole call."""
+    stats = CallStats(len(prompt))
+    parts: list[str] = []
+    start = time.perf_counter()
+    for chunk in client.generate(
+        model=model, prompt=prompt, system=SYSTEM_PROMPT, stream=True
+    ):
+        if chunk.response:
+            if stats.ttft is None:
+                stats.ttft = time.perf_counter() - start
+            parts.append(chunk.response)
+            stats.output_tokens += 1  # one token per chunk until the final counts
+        if chunk.done:
+            stats.prompt_tokens = chunk.prompt_eval_count
+            if chunk.eval_count:
+                stats.output_tokens = chunk.eval_count
+            if chunk.eval_duration:
+                stats.eval_seconds = chunk.eval_duration / 1e9
+    stats.latency = time.perf_counter() - start
+    return "".join(parts), stats
+
+
+def prompt_report(prompts: list[str], context_tokens: int) -> str:
+    sizes = [estimate_tokens(p) for p in prompts]
+    return (
+        f"Prompts: ~{sum(sizes) / len(sizes):.0f} tokens on average, ~{max(sizes)} max "
+        f"(facts budget {context_tokens}), plus a ~{estimate_tokens(SYSTEM_PROMPT)} "
+        "token system prompt shared by every request"
+    )
+
+
+def generate_with_retry(
+    client: Client,
+    model: str,
+    prompt: str,
+    retries: int = 4,
+    backoff: float = 1.0,
+) -> tuple[str, CallStats]:
+    """
+    Generate one response, retrying overloaded or unreachable servers with exponential
+    backoff and jitter. A missing model is pulled once. A stream that breaks off is
+    retried from the start.
+    """
+    pulled = False
+    attempt = 0
+    while True:
+        try:
+            text, stats = stream_generate(client, model, prompt)
+            stats.attempts = attempt + 1
+            return text, stats
+        except ResponseError as e:
+            if e.status_code == 404 and not pulled:
+                client.pull(model)
+                pulled = True
+                continue
+            if e.status_code not in RETRYABLE_STATUS or attempt >= retries:
+                raise
+        except (httpx.TransportError, ConnectionError):
+            if attempt >= retries:
+                raise
+        time.sleep(backoff * (2**attempt) * (0.5 + random.random()))
+        attempt += 1
+
+
+def generate_bios(
+    tree: FamilyTree,
+    store: BioStore,
+    person_ids: list[str] | None = None,
+    model: str = MODEL,
+    host: str | None = None,
+    concurrency: int = 4,
+    retries: int = 4,
+    backoff: float = 1.0,
+    progress_interval: float = 5.0,
+    stats: LLMStats | None = None,
+    context_tokens: int = CONTEXT_TOKENS,
+    pending: dict[str, tuple[str, str]] | None = None,
+) -> dict[str, str]:
+    """
+    Biography stage: stored biographies are reused and the rest are requested
+    `concurrency` at a time, each written to the store as soon as it completes. Ollama
+    only runs requests in parallel up to its OLLAMA_NUM_PARALLEL setting, the rest wait
+    in its queue.
+
+    People whose biography still fails after the retries are left out and reported.
+    Latency, time to first token, tokens/s and prompt size of every call are added to
+    `stats` and summarised at the end.
+
+    :param pending: {person_id: (key, prompt)} to generate, as returned by lookup_bios(),
+                    when the caller already looked the people up. Only these are
+                    requested and returned.
+    :return: {person_id: biography}
+    """
+    if pending is None:
+        bios, pending = lookup_bios(tree, store, person_ids, model, context_tokens)
+    else:
+        bios = {}
+    print(f"Biographies: {len(bios)} stored, {len(pending)} to generate")
+    if not pending:
+        return bios
+    print(prompt_report([prompt for _, prompt in pending.values()], context_tokens))
+
+    client = Client(host=host)
+    stats = stats if stats is not None else LLMStats()
+    progress = Progress(len(pending), progress_interval)
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {
+            pool.submit(
+                generate_with_retry, client, model, prompt, retries, backoff
+            ): person_id
+            for person_id, (_, prompt) in pending.items()
+        }
+        for future in as_completed(futures):
+            person_id = futures[future]
+            try:
+                bio, call = future.result()
+            except Exception as e:
+                print(f"Failed to generate bio for {person_id}: {e}")
+                stats.record_failure()
+                progress.update(failed=True)
+                continue
+            stats.record(call)
+            bios[person_id] = bio
+            store.put(pending[person_id][0], person_id, model, bio)
+            progress.update()
+    finally:
+        # On Ctrl-C drop the queued requests, finished bios are already stored
+        pool.shutdown(wait=False, cancel_futures=True)
+        print(stats.report())
+    return bios
@@ -1,169 +1,195 @@
-from ollama import generate
-from ollama import GenerateResponse, ResponseError, pull
+from ollama import Client, GenerateResponse, ResponseError
 
 from gedcom.tree import FamilyTree
 from gedcom.fact import GedcomTag, Fact
 from gedcom.family import Family
 from gedcom.person import Person
-import re
-from datetime import datetime
-
-
-def gather_context(person: Person, tree: FamilyTree) -> str:
-    """Gather comprehensive context about a person for biography generation."""
-    context = []
-
-    # Basic information
-    context.append(f"Subject: {person.name or 'Unknown'}")
-    context.append(f"Sex: {person.sex.name if person.sex else 'Unknown'}")
-    context.append(f"Birth: {person.birthday or 'Unknown'}")
-    context.append(f"Death: {person.death or 'Living'}")
-
-    # Extract birth year for fact sorting
-    def extract_year_from_string(date_str: str) -> int | None:
-        match = re.search(r"(\d{4})", str(date_str))
-        if match:
-            return int(match.group(1))
-        return None
-
-    birth_year = (
-        extract_year_from_string(str(person.birthday)) if person.birthday else None
-    )
-    death_year = (
-        extract_year_from_string(str(person.death))
-        if person.death
-        else datetime.now().year
-    )
-
-    # Sort facts into life periods
-    early_life_facts = []
-    mid_life_facts = []
-    late_life_facts = []
-    other_facts = []
-
-    if birth_year is not None:
-        early_end = birth_year + 18
-        mid_end = birth_year + 65
-        late_end = death_year
-
-        for fact in person.facts:
-            if fact.tag in [
-                GedcomTag.SEX,
-                GedcomTag.NAME,
-                GedcomTag.BIRT,
-                GedcomTag.DEAT,
-            ]:
+from gedcom.timeline import timeline_of
+
+CONTEXT_TOKENS = 600  # default prompt budget for the facts about one person
+
+# Lower tiers are kept first when the budget runs out
+TIER_IDENTITY, TIER_CLOSE_FAMILY, TIER_KEY_EVENT, TIER_CHILD, TIER_EVENT = range(5)
+TIER_SIBLING, TIER_UNDATED = 5, 6
+
+KEY_EVENTS = {
+    GedcomTag.TITL,
+    GedcomTag.OCCU,
+    GedcomTag.CHR,
+    GedcomTag.BAPM,
+    GedcomTag.BURI,
+    GedcomTag.EDUC,
+    GedcomTag.EMIG,
+    GedcomTag.IMMI,
+}
+SKIPPED_FACTS = {
+    GedcomTag.SEX,
+    GedcomTag.NAME,
+    GedcomTag.BIRT,
+    GedcomTag.DEAT,
+    GedcomTag.FAMS,
+    GedcomTag.FAMC,
+    GedcomTag.OBJE,
+    GedcomTag.RIN,
+    GedcomTag.REFN,
+    GedcomTag.SOUR,
+}
+LIST_SECTIONS = ("Siblings", "Children")  # written as one comma separated line
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def describe_fact(fact: Fact) -> str:
+    """One line for an event: its value followed by its date and place."""
+    details = [fact.value] if fact.value else []
+    for sub in fact.sub_facts:
+        if sub.tag in (GedcomTag.DATE, GedcomTag.PLAC) and sub.value.strip():
+            details.append(sub.value.strip())
+    return ", ".join(details)
+
+
+def _event(person: Person, tag: GedcomTag, fallback: str) -> str:
+    fact = next((f for f in person.facts if f.tag == tag), None)
+    described = describe_fact(fact) if fact else ""
+    return described or fallback
+
+
+def gather_context(
+    person: Person, tree: FamilyTree, budget: int = CONTEXT_TOKENS
+) -> str:
+    """
+    Gather context about a person for biography generation within a token budget.
+
+    Every candidate line gets a tier (identity, then parents and spouses, key events,
+    children, other dated events, siblings, undated events) and lines are kept in tier
+    order until the budget is spent. Kept lines are then written back in their usual
+    order, duplicate lines are dropped, and lists say how many names were left out.
+    """
+
+    def name(xref: str) -> str:
+        return tree.persons[xref].name or "Unknown"
+
+    # (tier, section, text); sections are written in first-seen order
+    candidates: list[tuple[int, str, str]] = [
+        (TIER_IDENTITY, "", f"Subject: {person.name or 'Unknown'}"),
+        (TIER_IDENTITY, "", f"Sex: {person.sex.name if person.sex else 'Unknown'}"),
+        (
+            TIER_IDENTITY,
+            "",
+            f"Birth: {_event(person, GedcomTag.BIRT, person.birthday or 'Unknown')}",
+        ),
+        (
+            TIER_IDENTITY,
+            "",
+            f"Death: {_event(person, GedcomTag.DEAT, str(person.death or 'Living'))}",
+        ),
+    ]
+
+    stage_sections = {
+        "early": "Early Life Events",
+        "mid": "Mid Life Events",
+        "late": "Late Life Events",
+        "other": "Other Life Events",
+    }
+    for section in stage_sections.values():
+        candidates.append((TIER_IDENTITY, section, ""))  # fixes the section order
+    for stage, facts in timeline_of(person).stages():
+        for year, fact in facts:
+            if fact.tag in SKIPPED_FACTS:
                 continue
-
-            date_fact = next(
-                (sub for sub in fact.sub_facts if sub.tag == GedcomTag.DATE), None
+            text = describe_fact(fact)
+            if not text:
+                continue
+            tier = TIER_KEY_EVENT if fact.tag in KEY_EVENTS else TIER_EVENT
+            if year is None and fact.tag not in KEY_EVENTS:
+                tier = TIER_UNDATED
+            candidates.append(
+                (tier, stage_sections[stage], f"{fact.tag.value}: {text}")
             )
 
-            if date_fact:
-                fact_year = extract_year_from_string(date_fact.value)
-                if fact_year is not None:
-                    if fact_year <= early_end:
-                        early_life_facts.append(fact)
-                    elif fact_year <= mid_end:
-                        mid_life_facts.append(fact)
-                    elif late_end is not None and fact_year <= late_end:
-                        late_life_facts.append(fact)
-                    else:
-                        other_facts.append(fact)
-                else:
-                    other_facts.append(fact)
-            else:
-                other_facts.append(fact)
-
-    # Add chronological facts to context
-    if early_life_facts:
-        context.append("\nEarly Life Events:")
-        for fact in early_life_facts:
-            context.append(f"{fact.tag.value}: {fact.value}")
-
-    if mid_life_facts:
-        context.append("\nMid Life Events:")
-        for fact in mid_life_facts:
-            context.append(f"{fact.tag.value}: {fact.value}")
-
-    if late_life_facts:
-        context.append("\nLate Life Events:")
-        for fact in late_life_facts:
-            context.append(f"{fact.tag.value}: {fact.value}")
-
-    if other_facts:
-        context.append("\nOther Life Events:")
-        for fact in other_facts:
-            context.append(f"{fact.tag.value}: {fact.value}")
-
-    # Childhood family
-    if person.famc:
-        for family_id in person.famc:
-            family = tree.families[family_id]
-            context.append("\nChildhood Family:")
-            if family.husb and family.husb in tree.persons:
-                father = tree.persons[family.husb]
-                context.append(f"Father: {father.name or 'Unknown'}")
-            if family.wife and family.wife in tree.persons:
-                mother = tree.persons[family.wife]
-                context.append(f"Mother: {mother.name or 'Unknown'}")
-            siblings = [
-                tree.persons[child]
-                for child in family.children
-                if child != person.xref_id and child in tree.persons
-            ]
-            if siblings:
-                context.append("Siblings:")
-                for sibling in siblings:
-                    context.append(f"- {sibling.name or 'Unknown'}")
-
-    # Adult families
-    if person.fams:
-        for family_id in person.fams:
-            family = tree.families[family_id]
-            context.append("\nFamily as Adult:")
-            if (
-                family.husb
-                and family.husb != person.xref_id
-                and family.husb in tree.persons
-            ):
-                spouse = tree.persons[family.husb]
-                context.append(f"Husband: {spouse.name or 'Unknown'}")
-            if (
-                family.wife
-                and family.wife != person.xref_id
-                and family.wife in tree.persons
-            ):
-                spouse = tree.persons[family.wife]
-                context.append(f"Wife: {spouse.name or 'Unknown'}")
-            children = [
-                tree.persons[child]
-                for child in family.children
-                if child in tree.persons
-            ]
-            if children:
-                context.append("Children:")
-                for child in children:
-                    context.append(f"- {child.name or 'Unknown'}")
-
-            # Marriage facts
-            for fact in family.facts:
-                if fact.tag == GedcomTag.MARR:
-                    context.append("Marriage Details:")
-                    for sub_fact in fact.sub_facts:
-                        if sub_fact.tag == GedcomTag.DATE:
-                            context.append(f"Marriage Date: {sub_fact.value}")
-                        elif sub_fact.tag == GedcomTag.PLAC:
-                            context.append(f"Marriage Place: {sub_fact.value}")
+    for family_id in person.famc:
+        family = tree.families.get(family_id)
+        if family is None:
+            continue
+        if family.husb in tree.persons:
+            candidates.append(
+                (TIER_CLOSE_FAMILY, "Childhood Family", f"Father: {name(family.husb)}")
+            )
+        if family.wife in tree.persons:
+            candidates.append(
+                (TIER_CLOSE_FAMILY, "Childhood Family", f"Mother: {name(family.wife)}")
+            )
+        for child in family.children:
+            if child != person.xref_id and child in tree.persons:
+                candidates.append((TIER_SIBLING, "Siblings", name(child)))
+
+    for family_id in person.fams:
+        family = tree.families.get(family_id)
+        if family is None:
+            continue
+        section = f"Family as Adult ({family_id})"
+        for spouse_id, role in ((family.husb, "Husband"), (family.wife, "Wife")):
+            if spouse_id and spouse_id != person.xref_id and spouse_id in tree.persons:
+                candidates.append(
+                    (TIER_CLOSE_FAMILY, section, f"{role}: {name(spouse_id)}")
+                )
+        for fact in family.facts:
+            if fact.tag == GedcomTag.MARR and describe_fact(fact):
+                candidates.append(
+                    (TIER_CLOSE_FAMILY, section, f"Marriage: {describe_fact(fact)}")
+                )
+        for child in family.children:
+            if child in tree.persons:
+                candidates.append((TIER_CHILD, f"Children ({family_id})", name(child)))
+
+    # Greedy selection by tier, stable within a tier. Repeated lines are dropped, repeated
+    # names in a list are kept (two children can share a name)
+    kept: set[int] = set()
+    seen: set[tuple[str, str]] = set()
+    omitted: dict[str, int] = {}
+    used = 0
+    for i in sorted(range(len(candidates)), key=lambda i: candidates[i][0]):
+        _, section, text = candidates[i]
+        if not text or (section, text) in seen:
+            continue
+        cost = estimate_tokens(text) + 1
+        if used + cost > budget:
+            omitted[section] = omitted.get(section, 0) + 1
+            continue
+        kept.add(i)
+        used += cost
+        if not section.startswith(LIST_SECTIONS):
+            seen.add((section, text))
+
+    sections: dict[str, list[str]] = {}
+    for i, (_, section, text) in enumerate(candidates):
+        sections.setdefault(section, [])
+        if i in kept:
+            sections[section].append(text)
 
+    context = []
+    for section, lines in sections.items():
+        if section.startswith(LIST_SECTIONS):
+            label = section.split(" (")[0]
+            if lines:
+                more = f" and {omitted[section]} more" if section in omitted else ""
+                context.append(f"{label}: {', '.join(lines)}{more}")
+            elif section in omitted:
+                context.append(f"{label}: {omitted[section]} not listed")
+        elif lines:
+            if section:
+                heading = section.split(" (")[0]
+                context.append(f"\n{heading}:")
+            context.extend(lines)
     return "\n".join(context)
 
 
-def generate_bio(person: Person, tree: FamilyTree):
-    context: str = gather_context(person, tree)
-    print(f"Generating Bio for: {person.name}")
+MODEL = "llama3.1:8b"
 
-    system_prompt = """You are a professional genealogist and biographer. Your task is to write a 
+SYSTEM_PROMPT = """You are a professional genealogist and biographer. Your task is to write a 
 comprehensive but concise biography based on genealogical records. Follow these guidelines:
 
 1. Write in a formal, professional tone
@@ -178,21 +204,40 @@ comprehensive but concise biography based on genealogical records. Follow these
 10. Start with birth and early life, then cover adult life and accomplishments
 11. End with information about death if applicable
 12. Use transitional phrases to connect different life events
+"""
 
-Here are the facts about the subject:
 
-"""
+def build_prompt(person: Person, tree: FamilyTree, budget: int = CONTEXT_TOKENS) -> str:
+    """
+    The per-person part of the request. SYSTEM_PROMPT is sent separately as the system
+    message, identical for every person, so the server can reuse its cached prefix.
+    """
+    context: str = gather_context(person, tree, budget)
+    return (
+        f"Here are the facts about the subject:\n\n{context}"
+        "\n\nPlease write a biography based on these facts:"
+    )
 
-    model = "llama3.1:8b"
 
+def generate_bio(
+    person: Person,
+    tree: FamilyTree,
+    client: Client | None = None,
+    model: str = MODEL,
+) -> str:
+    """Generate one biography with a single blocking request, see llm.bios for batches."""
+    print(f"Generating Bio for: {person.name}")
+    client = client or Client()
+    prompt = build_prompt(person, tree)
     try:
-        response: GenerateResponse = generate(
-            model=model,
-            prompt=f"{system_prompt}{context}\n\nPlease write a biography based on these facts:",
+        response: GenerateResponse = client.generate(
+            model=model, prompt=prompt, system=SYSTEM_PROMPT
         )
     except ResponseError as e:
         print("Error:", e.error)
-        if e.status_code == 404:
-            pull(model)
+        if e.status_code != 404:
+            raise
+        client.pull(model)
+        response = client.generate(model=model, prompt=prompt, system=SYSTEM_PROMPT)
 
-    return response.response
+    return response.response or ""
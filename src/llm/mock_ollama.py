@@ -0,0 +1,153 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """
+    Minimal stand-in for the Ollama HTTP API, for tests and load runs without a model.
+    /api/generate answers with a canned biography after `delay` seconds, streamed one
+    word every `token_delay` seconds when the client asks for a stream. The first
+    `failures` requests get a 503 so client retries can be exercised.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        delay: float = 0.0,
+        failures: int = 0,
+        token_delay: float = 0.0,
+    ) -> None:
+        super().__init__(address, MockOllamaHandler)
+        self.delay = delay
+        self.token_delay = token_delay
+        self.failures = failures
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.prompts: list[str] = []
+        self.systems: list[str] = []
+        self.lock = Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    server: MockOllamaServer
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, request: dict, text: str) -> dict:
+        return {
+            "model": request.get("model", ""),
+            "created_at": "2024-01-01T00:00:00Z",
+            "response": text,
+            "done": False,
+        }
+
+    def _write_chunk(self, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, request: dict, prompt: str, text: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        start = time.perf_counter()
+        for i, word in enumerate(words):
+            time.sleep(self.server.token_delay)
+            self._write_chunk(self._chunk(request, word if i == 0 else f" {word}"))
+        self._write_chunk(
+            {
+                **self._chunk(request, ""),
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": len(prompt) // 4,
+                "eval_count": len(words),
+                "eval_duration": int((time.perf_counter() - start) * 1e9),
+            }
+        )
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        if self.path == "/api/pull":
+            self._send_json(200, {"status": "success"})
+            return
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        with server.lock:
+            server.requests += 1
+            fail = server.requests <= server.failures
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            server.prompts.append(request.get("prompt", ""))
+            server.systems.append(request.get("system", ""))
+        try:
+            time.sleep(server.delay)
+            if fail:
+                self._send_json(503, {"error": "server busy"})
+                return
+            prompt = request.get("prompt", "")
+            subject = next(
+                (
+                    line[len("Subject: ") :]
+                    for line in prompt.splitlines()
+                    if line.startswith("Subject: ")
+                ),
+                "Unknown",
+            )
+            text = f"{subject} is the subject of this biography."
+            if request.get("stream", True):
+                self._stream(request, prompt, text)
+            else:
+                self._send_json(200, {**self._chunk(request, text), "done": True})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Ollama server")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    mock = MockOllamaServer(("127.0.0.1", args.port), delay=args.delay)
+    print(f"Mock Ollama listening on {mock.url}")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server_close()
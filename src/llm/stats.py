@@ -0,0 +1,100 @@
+import json
+from threading import Lock
+
+
+class CallStats:
+    """
+    Timings of one streamed generation. Token counts come from Ollama's final chunk;
+    generation speed uses its eval_duration when present and wall time otherwise.
+    """
+
+    def __init__(self, prompt_chars: int) -> None:
+        self.prompt_chars = prompt_chars
+        self.prompt_tokens: int | None = None
+        self.output_tokens = 0
+        self.latency = 0.0  # request sent to last chunk, seconds
+        self.ttft: float | None = None  # request sent to first token, seconds
+        self.eval_seconds: float | None = None
+        self.attempts = 1
+
+    @property
+    def tokens_per_second(self) -> float:
+        seconds = self.eval_seconds
+        if not seconds:
+            seconds = self.latency - (self.ttft or 0.0)
+        return self.output_tokens / seconds if seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"CallStats(latency={self.latency:.2f}s, ttft={self.ttft}, "
+            f"tokens={self.output_tokens}, tok/s={self.tokens_per_second:.1f}, "
+            f"prompt={self.prompt_chars} chars/{self.prompt_tokens} tokens)"
+        )
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LLMStats:
+    """Thread-safe aggregate of CallStats for a run."""
+
+    def __init__(self) -> None:
+        self.calls: list[CallStats] = []
+        self.failures = 0
+        self.lock = Lock()
+
+    def record(self, call: CallStats) -> None:
+        with self.lock:
+            self.calls.append(call)
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+
+    def summary(self) -> dict:
+        with self.lock:
+            calls = list(self.calls)
+        latency = [c.latency for c in calls]
+        ttft = [c.ttft for c in calls if c.ttft is not None]
+        speed = [c.tokens_per_second for c in calls if c.output_tokens]
+        prompt_tokens = [c.prompt_tokens for c in calls if c.prompt_tokens is not None]
+        output_tokens = sum(c.output_tokens for c in calls)
+        return {
+            "calls": len(calls),
+            "failures": self.failures,
+            "retries": sum(c.attempts - 1 for c in calls),
+            "latency_p50": _percentile(latency, 0.5),
+            "latency_p95": _percentile(latency, 0.95),
+            "ttft_p50": _percentile(ttft, 0.5),
+            "ttft_p95": _percentile(ttft, 0.95),
+            "tokens_per_second_mean": sum(speed) / len(speed) if speed else 0.0,
+            "output_tokens": output_tokens,
+            "prompt_chars_mean": (
+                sum(c.prompt_chars for c in calls) / len(calls) if calls else 0.0
+            ),
+            "prompt_tokens_mean": (
+                sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0.0
+            ),
+            "prompt_tokens_max": max(prompt_tokens, default=0),
+        }
+
+    def report(self) -> str:
+        s = self.summary()
+        return (
+            f"LLM calls: {s['calls']} ({s['failures']} failed, {s['retries']} retries)\n"
+            f"  latency p50 {s['latency_p50']:.2f}s, p95 {s['latency_p95']:.2f}s\n"
+            f"  time to first token p50 {s['ttft_p50']:.2f}s, p95 {s['ttft_p95']:.2f}s\n"
+            f"  {s['tokens_per_second_mean']:.1f} tokens/s per call, "
+            f"{s['output_tokens']} tokens generated\n"
+            f"  prompt {s['prompt_chars_mean']:.0f} chars, "
+            f"{s['prompt_tokens_mean']:.0f} tokens on average "
+            f"({s['prompt_tokens_max']} max)"
+        )
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,100 @@
+from gedcom.tree import FamilyTree
+from gedcom.person import Person
+from gedcom.fact import GedcomTag
+from gedcom.relations import ancestors, descendants
+from llm.llama import MODEL, CONTEXT_TOKENS
+from llm.bios import BioStore, lookup_bios
+
+# Record bookkeeping rather than something to write about
+STRUCTURAL_FACTS = {
+    GedcomTag.NAME,
+    GedcomTag.SEX,
+    GedcomTag.FAMC,
+    GedcomTag.FAMS,
+    GedcomTag.RIN,
+    GedcomTag.REFN,
+    GedcomTag.OBJE,
+}
+
+
+def fact_count(person: Person) -> int:
+    return sum(
+        1
+        for fact in person.facts
+        if fact.tag not in STRUCTURAL_FACTS and not fact.tag.name.startswith("_")
+    )
+
+
+def within_generations(
+    tree: FamilyTree, roots: list[str], generations: int | None
+) -> set[str]:
+    """The roots with their ancestors and descendants up to `generations` away."""
+    found: set[str] = set()
+    for root in roots:
+        if root not in tree.persons:
+            print(f"Root {root} not found, skipping it")
+            continue
+        found.add(root)
+        found.update(ancestors(tree, root, generations))
+        found.update(descendants(tree, root, generations))
+    return found
+
+
+def select_bio_targets(
+    tree: FamilyTree,
+    store: BioStore | None = None,
+    ids: list[str] | None = None,
+    roots: list[str] | None = None,
+    generations: int | None = None,
+    min_facts: int | None = None,
+    missing_only: bool = False,
+    limit: int | None = None,
+    part: tuple[int, int] | None = None,
+    model: str = MODEL,
+    context_tokens: int = CONTEXT_TOKENS,
+    missing: dict[str, tuple[str, str]] | None = None,
+) -> list[str]:
+    """
+    Pick the people to generate biographies for. Every given criterion must match:
+
+    - ids: only these people
+    - roots / generations: people within `generations` of a root (ancestors and
+      descendants, unbounded when generations is None)
+    - min_facts: people with at least this many facts besides name, sex and links
+    - missing_only: people without a stored bio for their current facts
+    - part: (k, n) keeps the k-th of n equal slices (1-based) so a long run can be
+      spread over several sessions or machines
+    - limit: keeps the first `limit` of the rest, with missing_only this continues
+      where the previous run stopped
+
+    `missing` is the second result of an earlier lookup_bios() over at least the
+    candidates, so missing_only does not build their prompts again.
+
+    :return: person IDs in tree order
+    """
+    targets = [pid for pid in (ids or tree.persons) if pid in tree.persons]
+    if roots:
+        near = within_generations(tree, roots, generations)
+        targets = [pid for pid in targets if pid in near]
+    if min_facts is not None:
+        targets = [pid for pid in targets if fact_count(tree.persons[pid]) >= min_facts]
+    if missing_only and missing is None and store is not None:
+        _, missing = lookup_bios(tree, store, targets, model, context_tokens)
+    if missing_only and missing is not None:
+        targets = [pid for pid in targets if pid in missing]
+    if part is not None:
+        k, n = part
+        size = -(-len(targets) // n)
+        targets = targets[(k - 1) * size : k * size]
+    if limit is not None:
+        targets = targets[:limit]
+    return targets
+
+
+def parse_part(text: str) -> tuple[int, int]:
+    """Parse a "k/n" slice, e.g. "2/5" for the second of five parts."""
+    k, _, n = text.partition("/")
+    part = int(k), int(n)
+    if not 1 <= part[0] <= part[1]:
+        raise ValueError(f"Slice must look like k/n with 1 <= k <= n, got {text}")
+    return part
@@ -1,31 +1,32 @@
 import argparse
 import time
 from pathlib import Path
-import pickle
 
 from gedcom.tree import FamilyTree
+from gedcom.cache import write_to_cache, load_from_cache
 from graph.tree_builder import generate_hierarchical_tree
-from gedcom.parse import parse
-from wiki.build import generate_wiki_pages
-
-
-def write_to_cache(ft: FamilyTree, output_folder: Path):
-    cache_file = output_folder / "cache.pkl"
-    with open(cache_file, "wb") as f:
-        pickle.dump(ft, f)
-
-
-def load_from_cache(output_folder: Path) -> FamilyTree | None:
-    cache_file = output_folder / "cache.pkl"
-    if cache_file.exists():
-        with open(cache_file, "rb") as f:
-            return pickle.load(f)
-    return None
+from gedcom.parse import parse_facts
+from gedcom.write import WRITE_CHARSETS, write_gedcom
+from gedcom.numbering import Numbering, compute_numbering
+from gedcom.subset import extract_subset, select_branch
+from gedcom.privacy import PRIVACY_MODES, privatize
+from wiki.build import add_wiki_stages
+from wiki.serve import serve_wiki
+from llm.bios import BioStore
+from llm.targets import parse_part
+from pipeline.scheduler import Pipeline, StopPipeline
+from pipeline.memory import (
+    MemoryReport,
+    structure_report,
+    format_structure_report,
+    write_memory_report,
+)
+from pipeline.trace import TRACER, PROFILE_MODES, StageProfiler, span
 
 
 def main(
-    ged_path: str = "royal92.ged",
-    output_path: str = "out/",
+    ged_path: str | Path = "royal92.ged",
+    output_path: str | Path = "out/",
     graph: bool = False,
     verbose: bool = False,
     use_cache: bool = False,
@@ -33,53 +34,181 @@ def main(
     validate: bool = True,
     force: bool = False,
     use_llm: bool = False,
+    serve: bool = False,
+    port: int = 8000,
+    cache_mb: int = 64,
+    home_person: str | None = None,
+    roots: list[str] | None = None,
+    chart_generations: int = 4,
+    llm_model: str | None = None,
+    llm_host: str | None = None,
+    llm_concurrency: int = 4,
+    llm_context_tokens: int | None = None,
+    bio_targets: dict | None = None,
+    workers: int = 4,
+    trace: bool = False,
+    profile: list[str] | None = None,
+    profile_mode: str = "cprofile",
+    mem_report: bool = False,
+    export_ged: str | None = None,
+    export_charset: str = "UTF-8",
+    branch: list[str] | None = None,
+    branch_up: int | None = None,
+    branch_down: int | None = None,
+    privacy: str = "redact",
 ) -> None:
 
-    start = last = time.time()
+    start = time.time()
+    TRACER.reset()
 
     # Convert paths to Path objects
     ged_path = Path(ged_path)
     output_path = Path(output_path)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    # Parse GEDCOM file
-    ft: FamilyTree | None = None
-    if not use_cache or force:
-        ft = parse(ged_path)
-        print(f"Time to parse Gedcom: {time.time() - last:.2f}")
-        last = time.time()
-    if use_cache and not ft:
-        ft = load_from_cache(output_path)
-        print(f"Time to load from cache: {time.time() - last:.2f}")
-        last = time.time()
-
-    if not ft:
-        print("No Family Tree Detected Or Critical Error Occured")
-        return
+    # The build runs as a graph of stages, each starting once its dependencies are done
+    profiler = None
+    if profile:
+        profiler = StageProfiler(profile, str(output_path / "profile"), profile_mode)
+    memory = None
+    if mem_report:
+        # tracemalloc peaks are process-wide, so measured stages run one at a time
+        memory = MemoryReport()
+        memory.start()
+        workers = 1
+    pipeline = Pipeline(workers, profiler=profiler, memory=memory)
+    parsing = not use_cache or force
+    if parsing:
+        pipeline.add("parse", lambda r: parse_facts(str(ged_path)))
+
+    def link(results: dict) -> FamilyTree:
+        ft: FamilyTree | None = None
+        if results.get("parse"):
+            ft = FamilyTree(results["parse"])
+        if use_cache and not parsing:
+            ft = load_from_cache(output_path)
+        if not ft:
+            raise StopPipeline("No Family Tree Detected Or Critical Error Occured")
+        return ft
+
+    # The tree stage keeps the full tree, which is what the cache stores. Everything
+    # that is published reads the "published" result instead
+    pipeline.add("tree", link, ["parse"] if parsing else [])
+
+    def publish(results: dict) -> FamilyTree:
+        ft = results["tree"]
+        if branch:
+            ft = extract_subset(ft, select_branch(ft, branch, branch_up, branch_down))
+            if not ft.persons:
+                raise StopPipeline("None of the --branch roots are in the tree")
+            print(
+                f"Branch of {len(ft.persons)} persons, {len(ft.families)} families "
+                f"and {len(ft.sources)} sources"
+            )
+        if privacy != "off":
+            with span("tree:privacy"):
+                ft, living = privatize(ft, privacy)
+            action = "redacted" if privacy == "redact" else "left out"
+            print(f"{len(living)} people who may be living are {action}")
+        return ft
+
+    pipeline.add("published", publish, ["tree"])
+
+    # Generation, Ahnentafel and d'Aboville numbers, used by the templates and graph.
+    # They are a result of their own rather than part of the tree the cache stores
+    roots = roots or ([home_person] if home_person else [])
+
+    def number(results: dict) -> Numbering | None:
+        return compute_numbering(results["published"], roots) if roots else None
+
+    pipeline.add("numbering", number, ["published"])
+    ready = ("published", "numbering")
 
     if graph:
-        graph_path = output_path / "graph"
-        generate_hierarchical_tree(ft, graph_path)
-        print(f"Time to generate graph tree: {time.time() - last:.2f}")
-        last = time.time()
+        pipeline.add(
+            "graph",
+            lambda r: generate_hierarchical_tree(
+                r["published"], str(output_path / "graph"), numbering=r["numbering"]
+            ),
+            ready,
+        )
 
-    if verbose:
+    def write_verbose(results: dict) -> None:
         verbose_file = output_path / "verbose.txt"
         with open(verbose_file, "w", encoding="utf-8", errors="ignore") as f:
-            for person_id, person in ft.persons.items():
+            for person_id, person in results["published"].persons.items():
                 f.write(person.__repr__() + "\n")
-        print(f"Time to write log file: {time.time() - last:.2f}")
-        last = time.time()
+
+    if verbose:
+        pipeline.add("verbose", write_verbose, ready)
+
+    if export_ged:
+        pipeline.add(
+            "export",
+            lambda r: write_gedcom(r["published"], export_ged, export_charset),
+            ready,
+        )
 
     if write_cache:
-        write_to_cache(ft, output_path)
-        print(f"Time to write to cache: {time.time() - last:.2f}")
-        last = time.time()
+        pipeline.add(
+            "cache", lambda r: write_to_cache(r["tree"], output_path), ["tree"]
+        )
 
-    # Generate wiki pages for family tree
-    generate_wiki_pages(ft, output_path, validate, use_llm)
-    print(f"Time to generate wiki pages: {time.time() - last:.2f}")
-    last = time.time()
+    # Model and prompt budget also decide which stored bios match the current tree
+    bio_options: dict[str, str | int] = {}
+    if llm_model:
+        bio_options["model"] = llm_model
+    if llm_context_tokens:
+        bio_options["context_tokens"] = llm_context_tokens
+
+    if not serve:
+        llm_options = {"host": llm_host, "concurrency": llm_concurrency, **bio_options}
+        add_wiki_stages(
+            pipeline,
+            str(output_path),
+            validate,
+            use_llm,
+            home_person,
+            chart_generations,
+            llm_options,
+            bio_targets,
+            ready,
+            "published",
+        )
+
+    results = pipeline.run()
+    if results is None:
+        return
+    print(pipeline.report())
+    print(TRACER.counter_report())
+    if memory is not None:
+        structures = structure_report(
+            results["tree"], TRACER.counters["bytes_written"], results["numbering"]
+        )
+        memory.stop()
+        print(memory.report())
+        print(format_structure_report(structures))
+        write_memory_report(str(output_path / "mem_report.json"), memory, structures)
+    if trace:
+        TRACER.write_json(str(output_path / "trace.json"))
+        TRACER.write_chrome_trace(str(output_path / "trace.chrome.json"))
+        print(f"Wrote trace.json and trace.chrome.json to {output_path}")
+
+    if serve:
+        # Render pages on request instead of writing the whole wiki to disk
+        # Bios come from a previous --use_llm build, the model is never called here
+        store_path = output_path / "bios.sqlite"
+        serve_wiki(
+            results["published"],
+            port=port,
+            cache_mb=cache_mb,
+            home_person=home_person,
+            chart_generations=chart_generations,
+            bio_store=BioStore(str(store_path)) if store_path.exists() else None,
+            bio_options=bio_options,
+            numbering=results["numbering"],
+        )
+        return
 
     print(f"Total Time: {time.time() - start:.2f} Seconds")
 
@@ -126,6 +255,137 @@ if __name__ == "__main__":
         action="store_true",
         help="Generate LLM biographies for persons",
     )
+    parser.add_argument(
+        "--llm_model", type=str, help="Ollama model for --use_llm (llama3.1:8b)"
+    )
+    parser.add_argument("--llm_host", type=str, help="Ollama server URL for --use_llm")
+    parser.add_argument(
+        "--llm_concurrency",
+        type=int,
+        help="Biographies requested at once by --use_llm (default 4)",
+    )
+    parser.add_argument(
+        "--llm_context_tokens",
+        type=int,
+        help="Approximate token budget for the facts in each bio prompt (default 600)",
+    )
+    parser.add_argument(
+        "--llm_ids", type=str, nargs="+", help="Only generate bios for these IDs"
+    )
+    parser.add_argument(
+        "--llm_generations",
+        type=int,
+        help="Only generate bios within this many generations of --roots",
+    )
+    parser.add_argument(
+        "--llm_min_facts",
+        type=int,
+        help="Only generate bios for people with at least this many facts",
+    )
+    parser.add_argument(
+        "--llm_missing",
+        action="store_true",
+        help="Only count people without a stored bio towards --llm_limit/--llm_slice",
+    )
+    parser.add_argument(
+        "--llm_limit", type=int, help="Generate at most this many bios in this run"
+    )
+    parser.add_argument(
+        "--llm_slice",
+        type=parse_part,
+        help="Only generate the k-th of n equal slices of the targets, e.g. 2/5",
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the wiki over HTTP, rendering pages on request",
+    )
+    parser.add_argument("--port", type=int, help="Port for --serve")
+    parser.add_argument(
+        "--cache_mb", type=int, help="Size of the rendered page cache for --serve"
+    )
+
+    parser.add_argument(
+        "--home_person",
+        type=str,
+        help="Person ID (e.g. @I52@) whose relationship to everyone is shown",
+    )
+
+    parser.add_argument(
+        "--roots",
+        type=str,
+        nargs="+",
+        help="Person IDs to number generations, Sosa and d'Aboville from "
+        "(defaults to --home_person)",
+    )
+
+    parser.add_argument(
+        "--chart_generations",
+        type=int,
+        help="Generations shown in each person's ancestor and descendant charts "
+        "(default 4, 0 disables the charts)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Build stages run at the same time as threads, e.g. the cache and "
+        "validation report are written while pages render. Only stages that wait on "
+        "disk or the model overlap (default 4, 1 runs them in order)",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write stage spans and counters to trace.json and trace.chrome.json",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="+",
+        help="Profile these stages, e.g. --profile parse persons",
+    )
+    parser.add_argument(
+        "--profile_mode",
+        choices=PROFILE_MODES,
+        help="cprofile (default) traces every call, sample is a low-overhead sampler",
+    )
+    parser.add_argument(
+        "--mem_report",
+        "--mem-report",
+        action="store_true",
+        help="Measure memory per stage with tracemalloc and break down what the tree "
+        "retains, written to mem_report.json (runs stages one at a time)",
+    )
+    parser.add_argument(
+        "--export_ged",
+        type=str,
+        help="Also write the tree back out as a GEDCOM 5.5.1 file at this path",
+    )
+    parser.add_argument(
+        "--export_charset",
+        choices=list(WRITE_CHARSETS),
+        help="Character set of --export_ged (default UTF-8)",
+    )
+    parser.add_argument(
+        "--branch",
+        type=str,
+        nargs="+",
+        help="Only keep these person IDs with their ancestors, descendants and "
+        "spouses, for a wiki or --export_ged of one branch",
+    )
+    parser.add_argument(
+        "--branch_up", type=int, help="Generations of ancestors kept by --branch"
+    )
+    parser.add_argument(
+        "--branch_down", type=int, help="Generations of descendants kept by --branch"
+    )
+    parser.add_argument(
+        "--privacy",
+        choices=PRIVACY_MODES,
+        help="People who may be living are shown as 'Living' without facts (redact, "
+        "default), left out of the wiki and export (omit) or published as is (off)",
+    )
 
     args = parser.parse_args()
     main_kwargs = {}
@@ -147,5 +407,66 @@ if __name__ == "__main__":
         main_kwargs["force"] = args.force
     if args.use_llm:
         main_kwargs["use_llm"] = args.use_llm
+    if args.llm_model:
+        main_kwargs["llm_model"] = args.llm_model
+    if args.llm_host:
+        main_kwargs["llm_host"] = args.llm_host
+    if args.llm_concurrency:
+        main_kwargs["llm_concurrency"] = args.llm_concurrency
+    if args.llm_context_tokens:
+        main_kwargs["llm_context_tokens"] = args.llm_context_tokens
+    bio_targets = {}
+    if args.llm_ids:
+        bio_targets["ids"] = args.llm_ids
+    if args.llm_generations is not None:
+        if not (args.roots or args.home_person):
+            parser.error("--llm_generations needs --roots or --home_person")
+        bio_targets["generations"] = args.llm_generations
+        bio_targets["roots"] = args.roots or [args.home_person]
+    if args.llm_min_facts is not None:
+        bio_targets["min_facts"] = args.llm_min_facts
+    if args.llm_missing:
+        bio_targets["missing_only"] = True
+    if args.llm_limit is not None:
+        bio_targets["limit"] = args.llm_limit
+    if args.llm_slice:
+        bio_targets["part"] = args.llm_slice
+    if bio_targets:
+        main_kwargs["bio_targets"] = bio_targets
+    if args.serve:
+        main_kwargs["serve"] = args.serve
+    if args.port:
+        main_kwargs["port"] = args.port
+    if args.cache_mb:
+        main_kwargs["cache_mb"] = args.cache_mb
+    if args.home_person:
+        main_kwargs["home_person"] = args.home_person
+    if args.roots:
+        main_kwargs["roots"] = args.roots
+
+    if args.chart_generations is not None:
+        main_kwargs["chart_generations"] = args.chart_generations
+    if args.workers:
+        main_kwargs["workers"] = args.workers
+    if args.trace:
+        main_kwargs["trace"] = args.trace
+    if args.profile:
+        main_kwargs["profile"] = args.profile
+    if args.profile_mode:
+        main_kwargs["profile_mode"] = args.profile_mode
+    if args.mem_report:
+        main_kwargs["mem_report"] = args.mem_report
+    if args.export_ged:
+        main_kwargs["export_ged"] = args.export_ged
+    if args.export_charset:
+        main_kwargs["export_charset"] = args.export_charset
+    if args.branch:
+        main_kwargs["branch"] = args.branch
+    if args.branch_up is not None:
+        main_kwargs["branch_up"] = args.branch_up
+    if args.branch_down is not None:
+        main_kwargs["branch_down"] = args.branch_down
+    if args.privacy:
+        main_kwargs["privacy"] = args.privacy
 
     main(**main_kwargs)
@@ -0,0 +1,203 @@
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from enum import Enum
+from types import FunctionType, ModuleType
+from typing import Any, Iterable, Iterator
+
+from gedcom.tree import FamilyTree
+from gedcom.numbering import Numbering
+
+MB = 1 << 20
+
+# Shared or immortal objects that no single tree owns
+_SKIPPED = (type, ModuleType, FunctionType, Enum, bool, type(None))
+
+
+def _rss_bytes() -> int | None:
+    """Current resident set size, on Linux."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryReport:
+    """
+    Per-stage memory use for --mem_report. tracemalloc gives each stage's peak of
+    Python allocations above what existed when it started, and what it left allocated
+    when it finished; RSS is read from the OS after each stage. tracemalloc's peak is
+    process-wide, so stages must run one at a time (workers=1) for the numbers to be
+    attributable.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, dict[str, float | None]] = {}
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            rss = _rss_bytes()
+            self.stages[stage] = {
+                "peak_mb": (peak - before) / MB,
+                "retained_mb": (current - before) / MB,
+                "rss_mb": rss / MB if rss is not None else None,
+                "max_rss_mb": _max_rss_bytes() / MB,
+            }
+
+    def report(self) -> str:
+        width = max((len(name) for name in self.stages), default=5)
+        lines = [
+            f"Memory by stage (MB): {'stage':<{width}}  {'peak':>8}  {'retained':>8}  "
+            f"{'rss':>8}  {'max rss':>8}"
+        ]
+        pad = " " * len("Memory by stage (MB): ")
+        for name, s in self.stages.items():
+            rss = f"{s['rss_mb']:8.1f}" if s["rss_mb"] is not None else f"{'-':>8}"
+            lines.append(
+                f"{pad}{name:<{width}}  {s['peak_mb']:8.1f}  {s['retained_mb']:8.1f}  "
+                f"{rss}  {s['max_rss_mb']:8.1f}"
+            )
+        return "\n".join(lines)
+
+
+class _Sizer:
+    """
+    Deep sizes from sys.getsizeof, shared across calls so every object is counted once,
+    by the first structure that reaches it.
+    """
+
+    def __init__(self) -> None:
+        self.seen: set[int] = set()
+        self.by_type: Counter[str] = Counter()
+        self.count_by_type: Counter[str] = Counter()
+
+    def size(self, roots: Iterable[Any]) -> int:
+        total = 0
+        stack = list(roots)
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, _SKIPPED) or id(obj) in self.seen:
+                continue
+            self.seen.add(id(obj))
+            size = sys.getsizeof(obj)
+            name = type(obj).__name__
+            self.by_type[name] += size
+            self.count_by_type[name] += 1
+            total += size
+
+            if isinstance(obj, (str, bytes, int, float)):
+                continue
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            else:
+                if hasattr(obj, "__dict__"):
+                    stack.append(obj.__dict__)
+                for slot in getattr(type(obj), "__slots__", ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+        return total
+
+
+def _image_bytes(image: Any) -> int:
+    """Decoded pixel data of a PIL image, which getsizeof does not see."""
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+
+def structure_report(
+    tree: FamilyTree, page_bytes: int = 0, numbering: Numbering | None = None
+) -> dict:
+    """
+    Retained size of the tree by structure, in bytes. Each object is counted under the
+    first structure below that holds it: a fact in Person.facts is not counted again in
+    the person's timeline.
+    """
+    sizer = _Sizer()
+    persons = list(tree.persons.values())
+    sections: dict[str, int] = {}
+    sections["Person.facts"] = sizer.size(p.facts for p in persons)
+    sections["Person.images"] = sum(
+        _image_bytes(image) for p in persons for image in p.images
+    ) + sizer.size(p.images for p in persons)
+    sections["Person.timeline"] = sizer.size(
+        getattr(p, "timeline", None) for p in persons
+    )
+    sections["Person famc/fams lists"] = sizer.size(
+        lst for p in persons for lst in (p.famc, p.fams)
+    )
+    sections["Person objects (rest)"] = sizer.size([tree.persons])
+    sections["Family.children lists"] = sizer.size(
+        f.children for f in tree.families.values()
+    )
+    sections["Family objects (rest)"] = sizer.size([tree.families])
+    sections["Sources"] = sizer.size([tree.sources])
+    sections["Header and other records"] = sizer.size(
+        [tree.header, tree.trailer, tree.data]
+    )
+    sections["Numbering"] = sizer.size([numbering])
+
+    return {
+        "sections": sections,
+        "total": sum(sections.values()),
+        "facts": {
+            "count": sizer.count_by_type["Fact"],
+            "bytes": sizer.by_type["Fact"],
+        },
+        "by_type": dict(sizer.by_type.most_common(10)),
+        "page_bytes_rendered": page_bytes,
+    }
+
+
+def format_structure_report(report: dict) -> str:
+    lines = [f"Retained tree memory: {report['total'] / MB:.1f} MB"]
+    for name, size in sorted(report["sections"].items(), key=lambda kv: -kv[1]):
+        share = 100 * size / report["total"] if report["total"] else 0.0
+        lines.append(f"  {name:<26} {size / MB:9.1f} MB  {share:5.1f}%")
+    facts = report["facts"]
+    lines.append(
+        f"  {facts['count']:,} Fact objects, {facts['bytes'] / MB:.1f} MB without "
+        f"their values and sub fact lists"
+    )
+    lines.append(
+        "  By type: "
+        + ", ".join(
+            f"{name} {size / MB:.1f} MB" for name, size in report["by_type"].items()
+        )
+    )
+    if report["page_bytes_rendered"]:
+        lines.append(
+            f"  Page strings: {report['page_bytes_rendered'] / MB:.1f} MB rendered, "
+            "each written out and released as it is rendered"
+        )
+    return "\n".join(lines)
+
+
+def write_memory_report(path: str, stages: MemoryReport, structures: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stages": stages.stages, "structures": structures}, f, indent=2)
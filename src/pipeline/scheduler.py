@@ -0,0 +1,207 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from pipeline.memory import MemoryReport
+
+from pipeline.trace import TRACER, StageProfiler, Tracer
+
+
+class StopPipeline(Exception):
+    """Raised by a stage to end the build cleanly, the message is printed."""
+
+
+class Stage:
+    """
+    One step of a build. `run` receives the results of all finished stages by name and
+    its return value becomes this stage's result.
+    """
+
+    def __init__(
+        self, name: str, run: Callable[[dict[str, Any]], Any], deps: tuple[str, ...]
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.deps = deps
+        self.start: float | None = None  # seconds since the pipeline started
+        self.end: float | None = None
+        self.cpu: float | None = None  # CPU seconds of the thread that ran it
+
+    @property
+    def duration(self) -> float:
+        """Wall time from start to end, which includes waiting for the GIL."""
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    @property
+    def cost(self) -> float:
+        """CPU time, what the stage would take running alone minus any I/O waits."""
+        return self.cpu or 0.0
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name}, deps={list(self.deps)}, {self.cost:.2f}s CPU)"
+
+
+class Pipeline:
+    """
+    Runs stages as a dependency graph: a stage starts as soon as everything it depends
+    on has finished, so independent stages (writing the cache, the validation report,
+    the graph) overlap with page rendering. With workers=1 stages run one at a time in
+    the order they were added. Each stage is recorded as a "stage:<name>" span on the
+    tracer, stages picked by the profiler are profiled while they run and the memory
+    report, when given, measures every stage.
+
+    Stages are threads of one interpreter, so CPU-bound stages take turns holding the
+    GIL and only stages that wait on disk, the network or the model really overlap.
+    Their wall times stretch with every other stage running, so stages are timed and
+    the critical path is found by the CPU time of the thread that ran them.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        tracer: Tracer = TRACER,
+        profiler: StageProfiler | None = None,
+        memory: "MemoryReport | None" = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.tracer = tracer
+        self.profiler = profiler
+        self.memory = memory
+        self.stages: dict[str, Stage] = {}
+        self.results: dict[str, Any] = {}
+        self.wall = 0.0
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[dict[str, Any]], Any],
+        deps: tuple[str, ...] | list[str] = (),
+    ) -> None:
+        if name in self.stages:
+            raise ValueError(f"Stage {name} added twice")
+        self.stages[name] = Stage(name, run, tuple(deps))
+
+    def _check(self) -> None:
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages and dep not in self.results:
+                    raise ValueError(f"Stage {stage.name} depends on unknown {dep}")
+        # Kahn's algorithm, anything left over is part of a cycle
+        indegree = {
+            name: sum(dep in self.stages for dep in stage.deps)
+            for name, stage in self.stages.items()
+        }
+        ready = [name for name, count in indegree.items() if count == 0]
+        seen = 0
+        while ready:
+            done = ready.pop()
+            seen += 1
+            for name, stage in self.stages.items():
+                if done in stage.deps:
+                    indegree[name] -= 1
+                    if indegree[name] == 0:
+                        ready.append(name)
+        if seen != len(self.stages):
+            cycle = sorted(name for name, count in indegree.items() if count > 0)
+            raise ValueError(f"Stages depend on each other in a cycle: {cycle}")
+
+    def run(self, results: dict[str, Any] | None = None) -> dict[str, Any] | None:
+        """
+        Run every stage. `results` seeds values that stages may depend on by name.
+
+        :return: the results by stage name, or None when a stage stopped the build
+        """
+        self.results = dict(results or {})
+        self._check()
+        pending = dict(self.stages)
+        running: dict[Future, Stage] = {}
+        start = time.perf_counter()
+        error: BaseException | None = None
+
+        def call(stage: Stage) -> Any:
+            stage.start = time.perf_counter() - start
+            cpu_start = time.thread_time()
+            profile = (
+                self.profiler.profile(stage.name) if self.profiler else nullcontext()
+            )
+            memory = self.memory.profile(stage.name) if self.memory else nullcontext()
+            try:
+                with self.tracer.span(f"stage:{stage.name}"), memory, profile:
+                    return stage.run(self.results)
+            finally:
+                stage.end = time.perf_counter() - start
+                stage.cpu = time.thread_time() - cpu_start
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                if error is None:
+                    for name, stage in list(pending.items()):
+                        if len(running) >= self.workers:
+                            break
+                        if all(dep in self.results for dep in stage.deps):
+                            del pending[name]
+                            running[pool.submit(call, stage)] = stage
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        self.results[stage.name] = future.result()
+                    except BaseException as e:
+                        # Let the stages already running finish, start nothing new
+                        error = error or e
+        self.wall = time.perf_counter() - start
+
+        if isinstance(error, StopPipeline):
+            print(error)
+            return None
+        if error is not None:
+            raise error
+        return self.results
+
+    def critical_path(self) -> list[Stage]:
+        """The chain of dependent stages with the largest total CPU time."""
+        finish: dict[str, tuple[float, str | None]] = {}
+
+        def longest(name: str) -> float:
+            if name not in finish:
+                stage = self.stages[name]
+                best, via = 0.0, None
+                for dep in stage.deps:
+                    if dep in self.stages and longest(dep) > best:
+                        best, via = longest(dep), dep
+                finish[name] = (best + stage.cost, via)
+            return finish[name][0]
+
+        if not self.stages:
+            return []
+        name: str | None = max(self.stages, key=longest)
+        path = []
+        while name is not None:
+            path.append(self.stages[name])
+            name = finish[name][1]
+        return path[::-1]
+
+    def report(self) -> str:
+        path = self.critical_path()
+        on_path = {stage.name for stage in path}
+        total = sum(stage.cost for stage in path)
+        work = sum(stage.cost for stage in self.stages.values())
+        width = max((len(name) for name in self.stages), default=0)
+        lines = [
+            f"Stages: {self.wall:.2f}s wall, {work:.2f}s CPU, critical path "
+            f"{total:.2f}s CPU ({' > '.join(s.name for s in path)})"
+        ]
+        for stage in sorted(self.stages.values(), key=lambda s: s.start or 0.0):
+            if stage.start is None:
+                continue
+            mark = "*" if stage.name in on_path else " "
+            lines.append(
+                f"  {mark} {stage.name:<{width}}  {stage.start:6.2f}s  +{stage.cost:.2f}s CPU"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,229 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Tracer:
+    """
+    Named spans and counters for a build. A span costs two clock reads and a list
+    append, so spans belong around stages and batches, never around single records;
+    counters are bumped once per batch with the batch size.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.origin = time.perf_counter_ns()
+            # (name, start ns, duration ns, thread id, args)
+            self.spans: list[tuple[str, int, int, int, dict]] = []
+            self.counters: Counter[str] = Counter()
+            self.threads: dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            thread = threading.current_thread()
+            with self.lock:
+                self.threads[thread.ident or 0] = thread.name
+                self.spans.append(
+                    (name, start - self.origin, end - start, thread.ident or 0, args)
+                )
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += n
+
+    def totals(self) -> dict[str, float]:
+        """Seconds spent in each span name, summed over all its spans."""
+        totals: dict[str, float] = {}
+        with self.lock:
+            for name, _, duration, _, _ in self.spans:
+                totals[name] = totals.get(name, 0.0) + duration / 1e9
+        return dict(totals)
+
+    def counter_report(self) -> str:
+        with self.lock:
+            items = sorted(self.counters.items())
+        return "Counters: " + ", ".join(f"{name} {value:,}" for name, value in items)
+
+    def write_json(self, path: str) -> None:
+        with self.lock:
+            spans = [
+                {
+                    "name": name,
+                    "start": start / 1e9,
+                    "duration": duration / 1e9,
+                    "thread": self.threads.get(tid, str(tid)),
+                    **({"args": args} if args else {}),
+                }
+                for name, start, duration, tid, args in self.spans
+            ]
+            counters = dict(self.counters)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans, "counters": counters}, f, indent=2)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Trace Event Format, open it in chrome://tracing or https://ui.perfetto.dev."""
+        pid = os.getpid()
+        with self.lock:
+            events: list[dict] = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self.threads.items()
+            ]
+            end = 0
+            for name, start, duration, tid, args in self.spans:
+                events.append(
+                    {
+                        "name": name,
+                        "cat": name.split(":")[0],
+                        "ph": "X",
+                        "ts": start / 1e3,
+                        "dur": duration / 1e3,
+                        "pid": pid,
+                        "tid": tid,
+                        "args": args,
+                    }
+                )
+                end = max(end, start + duration)
+            for name, value in self.counters.items():
+                events.append(
+                    {
+                        "name": name,
+                        "ph": "C",
+                        "ts": end / 1e3,
+                        "pid": pid,
+                        "args": {name: value},
+                    }
+                )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# The tracer the build reports to
+TRACER = Tracer()
+
+
+def span(name: str, **args):
+    return TRACER.span(name, **args)
+
+
+def count(name: str, n: int = 1) -> None:
+    TRACER.count(name, n)
+
+
+PROFILE_MODES = ("cprofile", "sample")
+
+
+class StageProfiler:
+    """
+    Profiles chosen pipeline stages. "cprofile" writes <stage>.prof (for pstats or
+    snakeviz) and prints the top functions by cumulative time. "sample" looks at the
+    stage's thread every `interval` seconds and writes <stage>.folded, one collapsed
+    stack per line as read by flamegraph.pl and speedscope, at far lower overhead.
+    """
+
+    def __init__(
+        self,
+        stages: list[str],
+        output_dir: str,
+        mode: str = "cprofile",
+        interval: float = 0.005,
+        top: int = 15,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {PROFILE_MODES}, got {mode}")
+        self.stages = set(stages)
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        if stage not in self.stages:
+            yield
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.mode == "cprofile":
+            with self._cprofile(stage):
+                yield
+        else:
+            with self._sample(stage):
+                yield
+
+    @contextmanager
+    def _cprofile(self, stage: str) -> Iterator[None]:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(self.output_dir, f"{stage}.prof"))
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(
+                self.top
+            )
+            print(f"Profile of stage {stage}:\n{out.getvalue()}")
+
+    @contextmanager
+    def _sample(self, stage: str) -> Iterator[None]:
+        target = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        done = threading.Event()
+
+        def sample() -> None:
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                        f"{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if names:
+                    stacks[";".join(reversed(names))] += 1
+
+        sampler = threading.Thread(target=sample, name=f"sample-{stage}", daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            path = os.path.join(self.output_dir, f"{stage}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, samples in stacks.most_common():
+                    f.write(f"{stack} {samples}\n")
+            leaves: Counter[str] = Counter()
+            for stack, samples in stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += samples
+            total = sum(leaves.values()) or 1
+            lines = [
+                f"  {100 * samples / total:5.1f}%  {name}"
+                for name, samples in leaves.most_common(self.top)
+            ]
+            print(f"Samples of stage {stage} ({total} taken):\n" + "\n".join(lines))
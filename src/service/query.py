@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from gedcom.tree import FamilyTree
+from gedcom.person import Person
+from gedcom.relations import (
+    ancestors,
+    descendants,
+    parents_of,
+    children_of,
+    spouses_of,
+    relationship_path,
+)
+from gedcom.relationship import RelationshipCalculator
+from wiki.search_index import tokenize
+
+FUZZY_CUTOFF = 0.75  # minimum similarity for a misspelled name token to match
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class QueryIndex:
+    """
+    In-memory indexes over a FamilyTree for interactive queries: a name token inverted
+    index for exact and prefix matches, and a trigram index over the token vocabulary so
+    misspelled names are scored against a handful of candidates rather than every name.
+    """
+
+    def __init__(self, tree: FamilyTree) -> None:
+        self.tree = tree
+        self.postings: dict[str, list[str]] = defaultdict(list)
+        self.trigrams: dict[str, list[str]] = defaultdict(list)
+
+        for person_id, person in tree.persons.items():
+            if person.name:
+                for token in set(tokenize(person.name)):
+                    self.postings[token].append(person_id)
+
+        for token in self.postings:
+            for gram in _trigrams(token):
+                self.trigrams[gram].append(token)
+
+        self.vocabulary = sorted(self.postings)
+        self.relationships = RelationshipCalculator(tree)
+
+    def resolve_id(self, person_id: str) -> str | None:
+        """Accept IDs with or without the GEDCOM @...@ wrapping."""
+        if person_id in self.tree.persons:
+            return person_id
+        wrapped = f"@{person_id.strip('@')}@"
+        if wrapped in self.tree.persons:
+            return wrapped
+        return None
+
+    def summary(self, person_id: str) -> dict:
+        person: Person = self.tree.persons[person_id]
+        return {
+            "id": person_id,
+            "name": person.name,
+            "sex": person.sex.value if person.sex else None,
+            "birth": person.birthday,
+            "death": person.death if isinstance(person.death, str) else None,
+        }
+
+    def person(self, person_id: str) -> dict | None:
+        resolved = self.resolve_id(person_id)
+        if resolved is None:
+            return None
+        person = self.tree.persons[resolved]
+        out = self.summary(resolved)
+        out["parents"] = [self.summary(p) for p in parents_of(self.tree, resolved)]
+        out["spouses"] = [self.summary(p) for p in spouses_of(self.tree, resolved)]
+        out["children"] = [self.summary(p) for p in children_of(self.tree, resolved)]
+        out["famc"] = person.famc
+        out["fams"] = person.fams
+        out["facts"] = [
+            {"tag": f.tag.value, "value": f.value} for f in person.facts if f.value
+        ]
+        return out
+
+    def _matching_tokens(self, query_token: str) -> dict[str, float]:
+        """Vocabulary tokens matching query_token with a score in (0, 1]."""
+        matches: dict[str, float] = {}
+        if query_token in self.postings:
+            matches[query_token] = 1.0
+
+        # Prefix matches through the sorted vocabulary
+        i = bisect_left(self.vocabulary, query_token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(query_token):
+            token = self.vocabulary[i]
+            matches.setdefault(token, 0.9)
+            i += 1
+
+        if matches:
+            return matches
+
+        # Fuzzy matches: candidates share the most trigrams with the query
+        counts: dict[str, int] = defaultdict(int)
+        for gram in _trigrams(query_token):
+            for token in self.trigrams.get(gram, ()):
+                counts[token] += 1
+        candidates = sorted(counts, key=counts.__getitem__, reverse=True)[:50]
+        for token in candidates:
+            ratio = SequenceMatcher(None, query_token, token).ratio()
+            if ratio >= FUZZY_CUTOFF:
+                matches[token] = ratio * 0.8
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Rank people by how well their name tokens match every query token."""
+        scores: dict[str, float] | None = None
+        for query_token in tokenize(query):
+            token_scores: dict[str, float] = {}
+            for token, score in self._matching_tokens(query_token).items():
+                for person_id in self.postings[token]:
+                    if score > token_scores.get(person_id, 0.0):
+                        token_scores[person_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    pid: scores[pid] + s
+                    for pid, s in token_scores.items()
+                    if pid in scores
+                }
+            if not scores:
+                return []
+
+        if not scores:
+            return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [dict(self.summary(pid), score=round(s, 3)) for pid, s in ranked]
+
+    def ancestors(self, person_id: str, depth: int | None = None) -> list[dict] | None:
+        resolved = self.resolve_id(person_id)
+        if resolved is None:
+            return None
+        found = ancestors(self.tree, resolved, depth)
+        return [dict(self.summary(pid), generation=g) for pid, g in found.items()]
+
+    def descendants(
+        self, person_id: str, depth: int | None = None
+    ) -> list[dict] | None:
+        resolved = self.resolve_id(person_id)
+        if resolved is None:
+            return None
+        found = descendants(self.tree, resolved, depth)
+        return [dict(self.summary(pid), generation=g) for pid, g in found.items()]
+
+    def relationship(
+        self, from_id: str, to_id: str, depth: int | None = None
+    ) -> dict | None:
+        source = self.resolve_id(from_id)
+        target = self.resolve_id(to_id)
+        if source is None or target is None:
+            return None
+        path = relationship_path(self.tree, source, target)
+        named = self.relationships.relationship(source, target, depth)
+        return {
+            "from": source,
+            "to": target,
+            "relationship": named.description if named else None,
+            "common_ancestors": named.common_ancestors if named else [],
+            "path": (
+                [dict(self.summary(pid), edge=edge) for edge, pid in path]
+                if path is not None
+                else None
+            ),
+        }
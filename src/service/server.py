@@ -0,0 +1,142 @@
+import argparse
+import json
+import sys
+import os
+import time
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from gedcom.tree import FamilyTree
+from gedcom.cache import load_from_cache
+from gedcom.parse import parse
+from service.lru import LRUCache
+from pipeline.trace import count
+from service.query import QueryIndex
+
+
+class QueryService:
+    """Routes query paths to a QueryIndex and caches the encoded JSON responses."""
+
+    def __init__(self, tree: FamilyTree, cache_entries: int = 4096) -> None:
+        self.index = QueryIndex(tree)
+        self.cache: LRUCache[tuple[int, bytes]] = LRUCache(max_entries=cache_entries)
+
+    def handle(self, target: str) -> tuple[int, bytes]:
+        cached = self.cache.get(target)
+        if cached is not None:
+            count("service.cache.hits")
+            return cached
+        count("service.cache.misses")
+
+        status, payload = self.route(target)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        if status == 200:
+            self.cache.put(target, (status, body), len(body))
+        return status, body
+
+    def route(self, target: str) -> tuple[int, object]:
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        depth = int(query["depth"]) if "depth" in query else None
+
+        result: object = None
+        if parts == ["search"]:
+            result = self.index.search(query.get("q", ""), int(query.get("limit", 20)))
+        elif len(parts) == 2 and parts[0] == "person":
+            result = self.index.person(parts[1])
+        elif len(parts) == 2 and parts[0] == "ancestors":
+            result = self.index.ancestors(parts[1], depth)
+        elif len(parts) == 2 and parts[0] == "descendants":
+            result = self.index.descendants(parts[1], depth)
+        elif parts == ["relationship"] and "from" in query and "to" in query:
+            result = self.index.relationship(query["from"], query["to"], depth)
+        elif parts == ["stats"]:
+            return 200, {
+                "persons": len(self.index.tree.persons),
+                "families": len(self.index.tree.families),
+                "cache": self.cache.stats(),
+            }
+        else:
+            return 404, {"error": f"Unknown endpoint: {url.path}"}
+
+        if result is None:
+            return 404, {"error": "Person not found"}
+        return 200, result
+
+
+def make_handler(service: QueryService) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self) -> None:
+            try:
+                status, body = service.handle(self.path)
+            except ValueError as e:
+                status, body = 400, json.dumps({"error": str(e)}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            pass  # per-request logging would dominate latency under load
+
+    return Handler
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 drops connections under load
+    service: QueryService
+
+
+def make_server(
+    tree: FamilyTree,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    cache_entries: int = 4096,
+) -> QueryHTTPServer:
+    service = QueryService(tree, cache_entries)
+    server = QueryHTTPServer((host, port), make_handler(service))
+    server.service = service
+    return server
+
+
+def load_tree(output_path: str, ged_path: str | None = None) -> FamilyTree | None:
+    """Load the tree from the cache snapshot, parsing the GEDCOM only as a fallback."""
+    tree = load_from_cache(Path(output_path))
+    if tree is None and ged_path:
+        tree = parse(ged_path)
+    return tree
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON query service over a tree")
+    parser.add_argument(
+        "--output_path", type=str, default="out/", help="Folder holding cache.pkl"
+    )
+    parser.add_argument(
+        "--ged_path", type=str, help="GEDCOM file to parse if there is no cache"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--cache_entries", type=int, default=4096, help="Size of the response LRU"
+    )
+    args = parser.parse_args()
+
+    start = time.time()
+    tree = load_tree(args.output_path, args.ged_path)
+    if tree is None:
+        print("No cache found, run main.py first or pass --ged_path")
+        sys.exit(1)
+    server = make_server(tree, args.host, args.port, args.cache_entries)
+    print(f"Time to load tree and build indexes: {time.time() - start:.2f}")
+    print(f"Serving {tree} on http://{args.host}:{args.port}")
+    server.serve_forever()
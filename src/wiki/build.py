@@ -1,69 +1,257 @@
 import os
-from wiki.templates.index_page import render_index_page
+from typing import Any
+
+from wiki.templates.index_page import render_index_page, sort_persons
 from wiki.templates.family_page import render_family_page
 from wiki.templates.person_page import render_person_page
 from wiki.templates.source_page import render_source_page
 from wiki.templates.report_page import render_report_page
 from gedcom.tree import FamilyTree
+from gedcom.person import Person
+from gedcom.numbering import Numbering
 from gedcom.data_validation import generate_validation_html
+from gedcom.relationship import RelationshipCalculator
+from wiki.search_index import write_search_index
+from graph.charts import write_person_charts, CHART_GENERATIONS
+from llm.bios import BioStore, generate_bios, lookup_bios
+from llm.stats import LLMStats
+from llm.targets import select_bio_targets
+from pipeline.scheduler import Pipeline
+from pipeline.trace import count
 
 
-def generate_wiki_pages(
+def write_page(path: str, html: str) -> None:
+    data = html.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    count("pages")
+    count("bytes_written", len(data))
+
+
+def write_index(family_tree: FamilyTree, output_path: str) -> None:
+    """The index page and the search index, over the same sorted person list."""
+    sorted_persons = sort_persons(family_tree)
+    index_html = render_index_page(family_tree, sorted_persons)
+    write_page(os.path.join(output_path, "index.html"), index_html)
+    write_search_index(output_path, sorted_persons)
+
+
+def write_family_pages(family_tree: FamilyTree, output_path: str) -> None:
+    families_dir = os.path.join(output_path, "families")
+    os.makedirs(families_dir, exist_ok=True)
+    for fam_id, family in family_tree.families.items():
+        family_html = render_family_page(family_tree, family)
+        write_page(os.path.join(families_dir, f"{fam_id}.html"), family_html)
+
+
+def write_source_pages(family_tree: FamilyTree, output_path: str) -> None:
+    sources_dir = os.path.join(output_path, "sources")
+    os.makedirs(sources_dir, exist_ok=True)
+    for source_id, source in family_tree.sources.items():
+        source_html = render_source_page(family_tree, source)
+        write_page(os.path.join(sources_dir, f"{source_id}.html"), source_html)
+
+
+def write_person_images(family_tree: FamilyTree, output_path: str) -> int:
+    """Save the images downloaded while parsing as the assets the person pages link to."""
+    assets_dir = os.path.join(output_path, "assets")
+    written = 0
+    for person_id, person in family_tree.persons.items():
+        for i, image in enumerate(person.images):
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGB")
+            os.makedirs(assets_dir, exist_ok=True)
+            image.save(os.path.join(assets_dir, f"{person_id}_{i}.png"))
+            written += 1
+    return written
+
+
+def home_relationships(
+    family_tree: FamilyTree, home_person: str | None
+) -> tuple[Person | None, dict[str, str]]:
+    """Relationships to the home person, computed for everyone in one pass."""
+    home = family_tree.persons.get(home_person) if home_person else None
+    if home is not None:
+        return home, RelationshipCalculator(family_tree).relationships_to(home.xref_id)
+    if home_person:
+        print(f"Home person {home_person} not found, skipping relationships")
+    return None, {}
+
+
+def load_bios(
     family_tree: FamilyTree,
     output_path: str,
-    validate: bool = True,
     use_llm: bool = False,
-) -> None:
+    llm_options: dict | None = None,
+    bio_targets: dict | None = None,
+) -> dict[str, str]:
     """
-    Generate static HTML pages from the FamilyTree data structure.
-
-    :param family_tree: A FamilyTree object as parsed from the GEDCOM file.
-    :param output_path: The directory where the HTML pages will be generated.
+    Biographies are generated as their own stage and saved in the bio store, pages only
+    read from the store so rendering never waits on the model.
     """
+    bios: dict[str, str] = {}
+    llm_options = llm_options or {}
+    store_path = os.path.join(output_path, "bios.sqlite")
+    if use_llm or os.path.exists(store_path):
+        store = BioStore(store_path)
+        lookup_options = {
+            k: v for k, v in llm_options.items() if k in ("model", "context_tokens")
+        }
+        # Prompts are built once here, target selection and generation reuse them
+        bios, missing = lookup_bios(family_tree, store, **lookup_options)
+        count("bios.stored", len(bios))
+        if use_llm:
+            targets = select_bio_targets(
+                family_tree,
+                store,
+                **lookup_options,
+                **(bio_targets or {}),
+                missing=missing,
+            )
+            print(f"Bio targets: {len(targets)} of {len(family_tree.persons)} people")
+            stats = LLMStats()
+            pending = {pid: missing[pid] for pid in targets if pid in missing}
+            generated = generate_bios(
+                family_tree, store, targets, stats=stats, pending=pending, **llm_options
+            )
+            count("bios.generated", len(set(generated) - set(bios)))
+            bios.update(generated)
+            stats.write_json(os.path.join(output_path, "llm_stats.json"))
+        store.close()
+    return bios
 
-    # Ensure output directory exists
-    os.makedirs(output_path, exist_ok=True)
-    families_dir = os.path.join(output_path, "families")
+
+def write_person_pages(
+    family_tree: FamilyTree,
+    output_path: str,
+    bios: dict[str, str],
+    home: Person | None,
+    relationships: dict[str, str],
+    charts: bool,
+    numbering: Numbering | None = None,
+) -> None:
     persons_dir = os.path.join(output_path, "persons")
-    sources_dir = os.path.join(output_path, "sources")
-    os.makedirs(families_dir, exist_ok=True)
     os.makedirs(persons_dir, exist_ok=True)
-    os.makedirs(sources_dir, exist_ok=True)
+    for person_id, person in family_tree.persons.items():
+        person_html = render_person_page(
+            family_tree,
+            person,
+            bios.get(person_id),
+            home,
+            relationships.get(person_id),
+            charts,
+            numbering,
+        )
+        write_page(os.path.join(persons_dir, f"{person_id}.html"), person_html)
 
-    # Generate index page
-    index_html = render_index_page(family_tree)
-    with open(os.path.join(output_path, "index.html"), "w", encoding="utf-8") as f:
-        f.write(index_html)
 
-    # Generate family pages
-    for fam_id, family in family_tree.families.items():
-        family_html = render_family_page(family_tree, family)
-        with open(
-            os.path.join(families_dir, f"{fam_id}.html"), "w", encoding="utf-8"
-        ) as f:
-            f.write(family_html)
+def write_validation_report(family_tree: FamilyTree, output_path: str) -> None:
+    validation_html = generate_validation_html(family_tree)
+    report_html = render_report_page(validation_html, family_tree)
+    write_page(os.path.join(output_path, "validation.html"), report_html)
 
-    # Generate person pages
-    for person_id, person in family_tree.persons.items():
-        person_html = render_person_page(family_tree, person, use_llm)
-        with open(
-            os.path.join(persons_dir, f"{person_id}.html"), "w", encoding="utf-8"
-        ) as f:
-            f.write(person_html)
 
-    # Generate source pages
-    for source_id, source in family_tree.sources.items():
-        source_html = render_source_page(family_tree, source)
-        with open(
-            os.path.join(sources_dir, f"{source_id}.html"), "w", encoding="utf-8"
-        ) as f:
-            f.write(source_html)
+def add_wiki_stages(
+    pipeline: Pipeline,
+    output_path: str,
+    validate: bool = True,
+    use_llm: bool = False,
+    home_person: str | None = None,
+    chart_generations: int = CHART_GENERATIONS,
+    llm_options: dict | None = None,
+    bio_targets: dict | None = None,
+    ready: tuple[str, ...] = ("tree",),
+    tree_result: str = "tree",
+) -> None:
+    """
+    Add the wiki build to a pipeline. Stages read the tree from the `tree_result`
+    result and start once every stage in `ready` has finished. Person pages wait for the bios,
+    charts and relationships, and show the "numbering" result if there is one; everything
+    else only needs the tree.
+    """
+    os.makedirs(output_path, exist_ok=True)
 
-    # Generate data validation page
+    def tree(results: dict[str, Any]) -> FamilyTree:
+        return results[tree_result]
+
+    def charts(results: dict[str, Any]) -> bool:
+        if chart_generations <= 0:
+            return False
+        # Unchanged charts are not rewritten
+        written = write_person_charts(tree(results), output_path, chart_generations)
+        print(f"Wrote {written} of {len(tree(results).persons)} person charts")
+        count("charts.written", written)
+        return True
+
+    def persons(results: dict[str, Any]) -> None:
+        home, relationships = results["relationships"]
+        write_person_pages(
+            tree(results),
+            output_path,
+            results["bios"],
+            home,
+            relationships,
+            results["charts"],
+            results.get("numbering"),
+        )
+
+    pipeline.add("index", lambda r: write_index(tree(r), output_path), ready)
+    pipeline.add("families", lambda r: write_family_pages(tree(r), output_path), ready)
+    pipeline.add("sources", lambda r: write_source_pages(tree(r), output_path), ready)
+    pipeline.add("images", lambda r: write_person_images(tree(r), output_path), ready)
+    pipeline.add(
+        "relationships", lambda r: home_relationships(tree(r), home_person), ready
+    )
+    pipeline.add("charts", charts, ready)
+    pipeline.add(
+        "bios",
+        lambda r: load_bios(tree(r), output_path, use_llm, llm_options, bio_targets),
+        ready,
+    )
+    pipeline.add(
+        "persons", persons, ("images", "relationships", "charts", "bios", *ready)
+    )
     if validate:
-        validation_html = generate_validation_html(family_tree)
-        report_html = render_report_page(validation_html, family_tree)
-        with open(
-            os.path.join(output_path, "validation.html"), "w", encoding="utf-8"
-        ) as f:
-            f.write(report_html)
+        pipeline.add(
+            "validate", lambda r: write_validation_report(tree(r), output_path), ready
+        )
+
+
+def generate_wiki_pages(
+    family_tree: FamilyTree,
+    output_path: str,
+    validate: bool = True,
+    use_llm: bool = False,
+    home_person: str | None = None,
+    chart_generations: int = CHART_GENERATIONS,
+    llm_options: dict | None = None,
+    bio_targets: dict | None = None,
+    workers: int = 1,
+) -> None:
+    """
+    Generate static HTML pages from the FamilyTree data structure.
+
+    :param family_tree: A FamilyTree object as parsed from the GEDCOM file.
+    :param output_path: The directory where the HTML pages will be generated.
+    :param home_person: Optional xref_id; every person page then shows how that person
+                        is related to them.
+    :param chart_generations: Depth of the per-person ancestor and descendant charts,
+                              0 disables them.
+    :param llm_options: Keyword arguments for generate_bios (model, host, concurrency,
+                        retries) when use_llm is set.
+    :param bio_targets: Keyword arguments for select_bio_targets, choosing who gets a
+                        new bio. Stored bios are shown for everyone.
+    :param workers: Stages run at the same time, see add_wiki_stages.
+    """
+    pipeline = Pipeline(workers)
+    add_wiki_stages(
+        pipeline,
+        output_path,
+        validate,
+        use_llm,
+        home_person,
+        chart_generations,
+        llm_options,
+        bio_targets,
+    )
+    pipeline.run({"tree": family_tree})
@@ -0,0 +1,296 @@
+import os
+import re
+import json
+import unicodedata
+from collections import defaultdict
+
+from gedcom.person import Person
+from gedcom.fact import GedcomTag
+from gedcom.timeline import extract_year
+
+SHARD_PREFIX_LEN = 2  # every token lands in a shard keyed by at least this many chars
+MAX_PREFIX_LEN = 6  # stop splitting shards past this prefix length
+MAX_SHARD_POSTINGS = 20000  # split a shard once it references this many people
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so 'Zoë' and 'zoe' share a token."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_SPLIT.split(normalize(text)) if t]
+
+
+def _year(date_str: str | None) -> str:
+    year = extract_year(date_str)
+    return str(year) if year is not None else ""
+
+
+def _places(person: Person) -> list[str]:
+    places = []
+    for fact in person.facts:
+        if fact.tag in (GedcomTag.BIRT, GedcomTag.DEAT):
+            for sub in fact.sub_facts:
+                if sub.tag == GedcomTag.PLAC and sub.value:
+                    places.append(sub.value.strip())
+    return places
+
+
+def build_records(
+    sorted_persons: list[tuple[str, Person]],
+) -> tuple[list[list[str]], dict[str, list[int]]]:
+    """
+    Build the display records and the token -> record postings for every person.
+
+    :param sorted_persons: The person list exactly as ordered on the index page, so
+                           search results come back in the same order.
+    :return: (records, postings) where each record is [xref, name, years, place].
+    """
+    records: list[list[str]] = []
+    postings: dict[str, list[int]] = defaultdict(list)
+
+    for i, (person_id, person) in enumerate(sorted_persons):
+        birth_year = _year(person.birthday)
+        death_year = _year(person.death if isinstance(person.death, str) else None)
+        places = _places(person)
+        years = f"{birth_year}-{death_year}" if birth_year or death_year else ""
+        records.append(
+            [person_id, person.name or person_id, years, places[0] if places else ""]
+        )
+
+        tokens = set(tokenize(person_id))
+        if person.name:
+            tokens.update(tokenize(person.name))
+        for place in places:
+            tokens.update(tokenize(place))
+        for year in (birth_year, death_year):
+            if year:
+                tokens.add(year)
+
+        for token in tokens:
+            postings[token].append(i)
+
+    return records, postings
+
+
+def shard_tokens(postings: dict[str, list[int]]) -> dict[str, list[str]]:
+    """
+    Group tokens into shards keyed by a token prefix. A shard that references too many
+    people is split on a longer prefix, so the trie only grows where the data is dense.
+    """
+    shards: dict[str, list[str]] = {}
+    pending: list[tuple[str, list[str]]] = []
+
+    grouped: dict[str, list[str]] = defaultdict(list)
+    for token in postings:
+        grouped[token[:SHARD_PREFIX_LEN]].append(token)
+    pending.extend(grouped.items())
+
+    while pending:
+        key, tokens = pending.pop()
+        size = sum(len(postings[t]) for t in tokens)
+        if size <= MAX_SHARD_POSTINGS or len(key) >= MAX_PREFIX_LEN:
+            shards[key] = tokens
+            continue
+
+        split: dict[str, list[str]] = defaultdict(list)
+        for token in tokens:
+            # Tokens no longer than the key stay in the parent shard
+            split[token[: len(key) + 1] if len(token) > len(key) else key].append(token)
+        if len(split) == 1 and key in split:
+            shards[key] = tokens
+            continue
+        for sub_key, sub_tokens in split.items():
+            if sub_key == key:
+                shards[key] = sub_tokens
+            else:
+                pending.append((sub_key, sub_tokens))
+
+    return shards
+
+
+def _js_payload(call: str, *args) -> str:
+    body = ",".join(
+        json.dumps(a, separators=(",", ":"), ensure_ascii=False) for a in args
+    )
+    return f"{call}({body});\n"
+
+
+def render_shard(
+    key: str,
+    tokens: list[str],
+    records: list[list[str]],
+    postings: dict[str, list[int]],
+) -> str:
+    """
+    Render one shard with only the records it references, indexed locally. "o" holds
+    each local record's position in the whole index, so the client can put matches
+    from several tokens and shards back in index order.
+    """
+    local: dict[int, int] = {}
+    local_records: list[list[str]] = []
+    order: list[int] = []
+    shard_postings: dict[str, list[int]] = {}
+    for token in sorted(tokens):
+        ids = []
+        for record_id in postings[token]:
+            if record_id not in local:
+                local[record_id] = len(local_records)
+                local_records.append(records[record_id])
+                order.append(record_id)
+            ids.append(local[record_id])
+        shard_postings[token] = ids
+
+    return _js_payload(
+        "GedcomSearch.addShard",
+        key,
+        {"t": shard_postings, "r": local_records, "o": order},
+    )
+
+
+def render_manifest(shards: dict[str, list[str]]) -> str:
+    return (
+        "var GedcomSearch = window.GedcomSearch || {};\n"
+        "GedcomSearch._manifest = "
+        + json.dumps({"shards": sorted(shards)}, separators=(",", ":"))
+        + ";\n"
+    )
+
+
+def write_search_index(
+    output_path: str, sorted_persons: list[tuple[str, Person]]
+) -> None:
+    """
+    Write the sharded client-side search index under <output_path>/search.
+
+    Shards are JavaScript files rather than JSON so the wiki keeps working when opened
+    straight from disk (file:// pages cannot fetch() JSON).
+    """
+    search_dir = os.path.join(output_path, "search")
+    os.makedirs(search_dir, exist_ok=True)
+
+    records, postings = build_records(sorted_persons)
+    shards = shard_tokens(postings)
+
+    for key, tokens in shards.items():
+        with open(
+            os.path.join(search_dir, f"shard_{key}.js"), "w", encoding="utf-8"
+        ) as f:
+            f.write(render_shard(key, tokens, records, postings))
+
+    with open(os.path.join(search_dir, "manifest.js"), "w", encoding="utf-8") as f:
+        f.write(render_manifest(shards))
+
+    with open(os.path.join(search_dir, "search.js"), "w", encoding="utf-8") as f:
+        f.write(SEARCH_JS)
+
+
+SEARCH_JS = r"""(function () {
+  var S = window.GedcomSearch = window.GedcomSearch || {};
+  var shards = {};
+  var waiting = {};
+  var keys = [];
+  var MAX_RESULTS = 50;
+
+  S.setManifest = function (m) { keys = m.shards; };
+  S.addShard = function (key, data) {
+    shards[key] = data;
+    (waiting[key] || []).forEach(function (cb) { cb(); });
+    delete waiting[key];
+  };
+  if (S._manifest) { S.setManifest(S._manifest); }
+
+  function normalize(text) {
+    return text.normalize("NFKD").replace(/[\u0300-\u036f]/g, "").toLowerCase();
+  }
+  function tokenize(text) {
+    return normalize(text).split(/[^a-z0-9]+/).filter(function (t) { return t; });
+  }
+
+  // A shard covers a token if its key is a prefix of the token, or (for short
+  // queries) the token is a prefix of the key.
+  function shardsFor(token) {
+    return keys.filter(function (k) {
+      return token.indexOf(k) === 0 || k.indexOf(token) === 0;
+    });
+  }
+
+  function loadShard(key, cb) {
+    if (shards[key]) { cb(); return; }
+    if (waiting[key]) { waiting[key].push(cb); return; }
+    waiting[key] = [cb];
+    var s = document.createElement("script");
+    s.src = "search/shard_" + key + ".js";
+    document.head.appendChild(s);
+  }
+
+  function search(query, done) {
+    var tokens = tokenize(query);
+    if (!tokens.length || tokens[0].length < 2) { done([]); return; }
+    var first = tokens[0];
+    var needed = shardsFor(first);
+    var pending = needed.length;
+    if (!pending) { done([]); return; }
+    needed.forEach(function (key) {
+      loadShard(key, function () {
+        if (--pending === 0) { done(collect(first, tokens.slice(1), needed)); }
+      });
+    });
+  }
+
+  function collect(first, rest, needed) {
+    var seen = {};
+    var out = [];
+    needed.forEach(function (key) {
+      var shard = shards[key];
+      Object.keys(shard.t).forEach(function (token) {
+        if (token.indexOf(first) !== 0) { return; }
+        shard.t[token].forEach(function (i) {
+          var r = shard.r[i];
+          if (seen[r[0]]) { return; }
+          var text = normalize(r.join(" "));
+          for (var j = 0; j < rest.length; j++) {
+            if (text.indexOf(rest[j]) === -1) { return; }
+          }
+          seen[r[0]] = true;
+          out.push([shard.o[i], r]);
+        });
+      });
+    });
+    out.sort(function (a, b) { return a[0] - b[0]; });
+    return out.slice(0, MAX_RESULTS).map(function (m) { return m[1]; });
+  }
+
+  S.search = search;
+
+  function render(results) {
+    var list = document.getElementById("search-results");
+    list.innerHTML = "";
+    results.forEach(function (r) {
+      var li = document.createElement("li");
+      var a = document.createElement("a");
+      a.href = "persons/" + r[0] + ".html";
+      a.textContent = r[1];
+      li.appendChild(a);
+      var extra = [r[2], r[3]].filter(function (x) { return x; }).join(", ");
+      if (extra) { li.appendChild(document.createTextNode(" (" + extra + ")")); }
+      list.appendChild(li);
+    });
+  }
+
+  var box = document.getElementById("search-box");
+  if (box) {
+    var latest = 0;
+    box.addEventListener("input", function () {
+      var ticket = ++latest;
+      search(box.value, function (results) {
+        if (ticket === latest) { render(results); }
+      });
+    });
+  }
+})();
+"""
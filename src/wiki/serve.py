@@ -0,0 +1,236 @@
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import urlsplit, unquote
+
+from gedcom.tree import FamilyTree
+from gedcom.numbering import Numbering
+from gedcom.data_validation import generate_validation_html
+from gedcom.relationship import RelationshipCalculator
+from service.lru import LRUCache
+from pipeline.trace import count
+from llm.bios import BioStore, lookup_bios
+from graph.charts import CHART_HTML, CHART_GENERATIONS, chart_script
+from wiki.templates.index_page import render_index_page, sort_persons
+from wiki.templates.family_page import render_family_page
+from wiki.templates.person_page import render_person_page
+from wiki.templates.source_page import render_source_page
+from wiki.templates.report_page import render_report_page
+from wiki.search_index import (
+    SEARCH_JS,
+    build_records,
+    shard_tokens,
+    render_shard,
+    render_manifest,
+)
+
+
+class WikiRenderer:
+    """
+    Renders wiki pages on request with the same render_* functions as the static build.
+    Rendered pages are kept in an LRU bounded by their encoded size, so memory stays
+    bounded by the cache no matter how large the tree is.
+    """
+
+    def __init__(
+        self,
+        family_tree: FamilyTree,
+        cache_bytes: int = 64 << 20,
+        home_person: str | None = None,
+        chart_generations: int = CHART_GENERATIONS,
+        bio_store: BioStore | None = None,
+        bio_options: dict | None = None,
+        numbering: Numbering | None = None,
+    ) -> None:
+        self.family_tree = family_tree
+        self.numbering = numbering
+        self.chart_generations = chart_generations
+        self.bio_store = bio_store
+        self.bio_options = bio_options or {}  # model and context_tokens of the bios
+        self.home = family_tree.persons.get(home_person) if home_person else None
+        self.relationships: dict[str, str] = (
+            RelationshipCalculator(family_tree).relationships_to(self.home.xref_id)
+            if self.home is not None
+            else {}
+        )
+        self.pages: LRUCache[tuple[bytes, str, str]] = LRUCache(
+            max_entries=1 << 30, max_bytes=cache_bytes
+        )
+        self._search: tuple | None = None
+        self._search_lock = Lock()
+
+    def _search_index(self) -> tuple:
+        """The search postings are only built when a client first asks for them."""
+        with self._search_lock:
+            if self._search is None:
+                records, postings = build_records(sort_persons(self.family_tree))
+                self._search = (records, postings, shard_tokens(postings))
+            return self._search
+
+    def render(self, path: str) -> tuple[str, str] | None:
+        """
+        :return: (content_type, body) for a wiki path, or None if there is no such page.
+        """
+        ft = self.family_tree
+        parts = [p for p in path.split("/") if p]
+        html = "text/html; charset=utf-8"
+
+        if parts in ([], ["index.html"]):
+            return html, render_index_page(ft)
+        if parts == ["validation.html"]:
+            return html, render_report_page(generate_validation_html(ft), ft)
+        if len(parts) != 2:
+            return None
+
+        folder, filename = parts
+        if folder == "search":
+            return self._render_search(filename)
+        if folder == "charts" and self.chart_generations > 0:
+            return self._render_chart(filename)
+        if not filename.endswith(".html"):
+            return None
+        xref_id = filename[: -len(".html")]
+
+        if folder == "persons" and xref_id in ft.persons:
+            return html, render_person_page(
+                ft,
+                ft.persons[xref_id],
+                self._bio(xref_id),
+                self.home,
+                self.relationships.get(xref_id),
+                self.chart_generations > 0,
+                self.numbering,
+            )
+        if folder == "families" and xref_id in ft.families:
+            return html, render_family_page(ft, ft.families[xref_id])
+        if folder == "sources" and xref_id in ft.sources:
+            return html, render_source_page(ft, ft.sources[xref_id])
+        return None
+
+    def _bio(self, xref_id: str) -> str | None:
+        """Stored biography of a person, the model is never called while serving."""
+        if self.bio_store is None:
+            return None
+        bios, _ = lookup_bios(
+            self.family_tree, self.bio_store, [xref_id], **self.bio_options
+        )
+        return bios.get(xref_id)
+
+    def _render_search(self, filename: str) -> tuple[str, str] | None:
+        js = "application/javascript; charset=utf-8"
+        if filename == "search.js":
+            return js, SEARCH_JS
+        records, postings, shards = self._search_index()
+        if filename == "manifest.js":
+            return js, render_manifest(shards)
+        key = filename[len("shard_") : -len(".js")]
+        if filename.startswith("shard_") and key in shards:
+            return js, render_shard(key, shards[key], records, postings)
+        return None
+
+    def _render_chart(self, filename: str) -> tuple[str, str] | None:
+        if filename == "chart.html":
+            return "text/html; charset=utf-8", CHART_HTML
+        xref_id = filename[: -len(".js")]
+        if filename.endswith(".js") and xref_id in self.family_tree.persons:
+            return "application/javascript; charset=utf-8", chart_script(
+                self.family_tree, xref_id, self.chart_generations
+            )
+        return None
+
+    def get(self, path: str) -> tuple[bytes, str, str] | None:
+        """:return: (body, content_type, etag) for path, rendering it on a cache miss."""
+        cached = self.pages.get(path)
+        if cached is not None:
+            count("wiki.cache.hits")
+            return cached
+        count("wiki.cache.misses")
+
+        rendered = self.render(path)
+        if rendered is None:
+            return None
+        content_type, text = rendered
+        body = text.encode("utf-8")
+        page = (body, content_type, f'"{hashlib.sha1(body).hexdigest()}"')
+        self.pages.put(path, page, len(body))
+        return page
+
+
+def make_handler(renderer: WikiRenderer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            self._respond(send_body=True)
+
+        def do_HEAD(self) -> None:
+            self._respond(send_body=False)
+
+        def _respond(self, send_body: bool) -> None:
+            page = renderer.get(unquote(urlsplit(self.path).path))
+            if page is None:
+                body = b"Not Found"
+                self.send_response(404)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+                return
+
+            body, content_type, etag = page
+            if etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+
+class WikiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def serve_wiki(
+    family_tree: FamilyTree,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    cache_mb: int = 64,
+    home_person: str | None = None,
+    chart_generations: int = CHART_GENERATIONS,
+    bio_store: BioStore | None = None,
+    bio_options: dict | None = None,
+    numbering: Numbering | None = None,
+) -> None:
+    renderer = WikiRenderer(
+        family_tree,
+        cache_mb << 20,
+        home_person,
+        chart_generations,
+        bio_store,
+        bio_options,
+        numbering,
+    )
+    server = WikiHTTPServer((host, port), make_handler(renderer))
+    print(f"Serving the wiki at: http://{host}:{port}/index.html")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -4,6 +4,7 @@ from gedcom.tree import FamilyTree
 from gedcom.family import Family
 from gedcom.person import Person
 from gedcom.fact import Fact, GedcomTag
+from gedcom.timeline import is_bookkeeping
 from wiki.templates.base_html import html_page
 import html as html_package
 from markupsafe import Markup
@@ -269,7 +270,7 @@ def render_family_page(family_tree: FamilyTree, family: Family) -> str:
         facts_section = '<h2>Family Facts</h2><div class="panel"><ul class="facts">'
         for fact in family.facts:
             if (
-                fact.tag.name.startswith("_")
+                is_bookkeeping(fact)
                 or fact.tag == GedcomTag.OBJE
                 or fact.tag == GedcomTag.RIN
                 or fact.tag == GedcomTag.FAMC
@@ -1,6 +1,7 @@
 import os
 from wiki.templates.base_html import html_page
 from gedcom.tree import FamilyTree
+from gedcom.person import Person
 
 
 def _path_to_url(path: str) -> str:
@@ -8,7 +9,21 @@ def _path_to_url(path: str) -> str:
     return path.replace(os.sep, "/")
 
 
-def render_index_page(family_tree: FamilyTree) -> str:
+def sort_persons(family_tree: FamilyTree) -> list[tuple[str, Person]]:
+    """Sort people by last word in their name if available, falling back to their ID."""
+    return sorted(
+        family_tree.persons.items(),
+        key=lambda item: (
+            item[1].name.split()[-1]
+            if item[1].name and item[1].name.split()
+            else item[0]
+        ),
+    )
+
+
+def render_index_page(
+    family_tree: FamilyTree, sorted_persons: list[tuple[str, Person]] | None = None
+) -> str:
     """Render the main index page with header information and lists of families, people, and sources."""
     header_info = "<h2>Family Tree Information</h2>"
 
@@ -49,15 +64,8 @@ def render_index_page(family_tree: FamilyTree) -> str:
         '<div id="people" style="display:block;">'
         "<ul>"
     )
-    # Sort people by last word in their name if available
-    sorted_persons = sorted(
-        family_tree.persons.items(),
-        key=lambda item: (
-            item[1].name.split()[-1]
-            if item[1].name and item[1].name.split()
-            else item[0]
-        ),
-    )
+    if sorted_persons is None:
+        sorted_persons = sort_persons(family_tree)
     for person_id, person in sorted_persons:
         name_display = person.name if person.name else person_id
         href = _path_to_url(os.path.join("persons", f"{person_id}.html"))
@@ -81,8 +89,20 @@ def render_index_page(family_tree: FamilyTree) -> str:
 
     validation_report_link = "<h2>Data Validation Report</h2><p><a href='validation.html'>View Validation Report</a></p>"
 
+    search_section = (
+        "<h2>Search</h2>"
+        '<div class="panel">'
+        '<input id="search-box" type="search" placeholder="Name, year, place or ID" '
+        'autocomplete="off" style="width:100%; padding:0.5rem; font-size:1rem;" />'
+        '<ul id="search-results" class="facts"></ul>'
+        "</div>"
+        '<script src="search/manifest.js"></script>'
+        '<script src="search/search.js"></script>'
+    )
+
     content = (
         f"<h1>Family Tree Index</h1>"
+        f"{search_section}"
         f"{header_info}"
         f"{family_list}"
         f"{person_list}"
@@ -1,22 +1,13 @@
 import os
-import re
 from gedcom.tree import FamilyTree
 from gedcom.person import Person
+from gedcom.numbering import Numbering
 from gedcom.fact import GedcomTag, Fact
+from gedcom.timeline import timeline_of
 from .base_html import html_page
-from datetime import datetime
 from markupsafe import Markup
 import html as html_package
-from llm.llama import generate_bio
-
-
-def extract_year_from_string(date_str: str) -> int | None:
-    match = re.search(r"(\d{4})", date_str)
-    if match:
-        return int(match.group(1))
-    return None
-
-
+from urllib.parse import quote
 from collections import deque
 
 
@@ -89,6 +80,8 @@ def render_fact_li_bfs(root_fact: Fact, family_tree: FamilyTree) -> str:
         else:
             value_text = html_package.unescape(fact.value)
 
+        # CONT lines in the value are line breaks
+        value_text = value_text.replace("\n", "<br>")
         html = f"<li>{fact.tag.value}: {value_text}"
 
         children = adjacency_map.get(fact_id, [])
@@ -106,7 +99,13 @@ def render_fact_li_bfs(root_fact: Fact, family_tree: FamilyTree) -> str:
 
 
 def render_person_page(
-    family_tree: FamilyTree, person: Person, use_llm: bool = False
+    family_tree: FamilyTree,
+    person: Person,
+    bio: str | None = None,
+    home_person: Person | None = None,
+    relationship: str | None = None,
+    charts: bool = False,
+    numbering: Numbering | None = None,
 ) -> str:
     out_dir = os.path.abspath(
         os.path.join(os.path.dirname(__file__), "..", "..", "..", "out")
@@ -129,10 +128,9 @@ def render_person_page(
     birth = person.birthday if person.birthday else "Unknown"
     death = person.death if person.death else "Present"
 
-    birth_year = extract_year_from_string(str(birth))
-    death_year = extract_year_from_string(str(death))
-    if death == "Alive" or death_year is None:
-        death_year = datetime.now().year
+    timeline = timeline_of(person)
+    birth_year = timeline.birth_year
+    death_year = timeline.death_year
 
     fams = person.fams
     famc = person.famc
@@ -159,57 +157,48 @@ def render_person_page(
     else:
         families_section += "<p>No associated families found.</p>"
 
+    relationship_row = ""
+    if home_person is not None and home_person is not person:
+        home_name = home_person.name if home_person.name else home_person.xref_id
+        href = _path_to_url(
+            os.path.join("..", "persons", f"{home_person.xref_id}.html")
+        )
+        relationship_row = (
+            f"<tr><th>Relationship</th><td>"
+            f"{relationship.capitalize() if relationship else 'No known relation'}"
+            f' to <a href="{href}">{home_name}</a></td></tr>'
+        )
+
+    numbering_rows = ""
+    if numbering is not None:
+        if person.xref_id in numbering.generation:
+            numbering_rows += f"<tr><th>Generation</th><td>{numbering.generation[person.xref_id]:+d}</td></tr>"
+        if person.xref_id in numbering.sosa:
+            numbering_rows += f"<tr><th>Ahnentafel (Sosa)</th><td>{numbering.sosa[person.xref_id]}</td></tr>"
+        if person.xref_id in numbering.daboville:
+            numbering_rows += f"<tr><th>d'Aboville</th><td>{numbering.daboville[person.xref_id]}</td></tr>"
+
+    charts_row = ""
+    if charts:
+        href = f"../charts/chart.html?id={quote(person.xref_id)}"
+        charts_row = f'<tr><th>Charts</th><td><a href="{href}">Ancestors and descendants</a></td></tr>'
+
     basic_info = f"""
     <table>
         <tr><th>Name</th><td>{name}</td></tr>
         <tr><th>Sex</th><td>{sex}</td></tr>
         <tr><th>Birth</th><td>{birth}</td></tr>
         <tr><th>Death</th><td>{death}</td></tr>
+        {relationship_row}
+        {numbering_rows}
+        {charts_row}
     </table>
     """
 
-    early_life_facts = []
-    mid_life_facts = []
-    late_life_facts = []
-    other_facts = []
-
-    if birth_year is not None:
-        early_end = birth_year + 18
-        mid_end = birth_year + 65
-        late_end = death_year
-    else:
-        early_end = None
-        mid_end = None
-        late_end = None
-
-    for fact in person.facts:
-        if (
-            fact.tag.name.startswith("_")
-            or fact.tag == GedcomTag.OBJE
-            or fact.tag == GedcomTag.RIN
-            or fact.tag == GedcomTag.FAMC
-            or fact.tag == GedcomTag.FAMS
-        ):
-            continue
-        date_fact = None
-        for sub in fact.sub_facts:
-            if sub.tag == GedcomTag.DATE:
-                date_fact = sub
-        if date_fact:
-            fact_year = extract_year_from_string(date_fact.value)
-            if fact_year is not None and birth_year is not None:
-                if early_end and fact_year <= early_end:
-                    early_life_facts.append(fact)
-                elif mid_end and fact_year <= mid_end:
-                    mid_life_facts.append(fact)
-                elif late_end and fact_year <= late_end:
-                    late_life_facts.append(fact)
-                else:
-                    other_facts.append(fact)
-            else:
-                other_facts.append(fact)
-        else:
-            other_facts.append(fact)
+    early_life_facts = [fact for _, fact in timeline.early]
+    mid_life_facts = [fact for _, fact in timeline.mid]
+    late_life_facts = [fact for _, fact in timeline.late]
+    other_facts = [fact for _, fact in timeline.other]
 
     facts_section = ""
     if early_life_facts or mid_life_facts or late_life_facts or other_facts:
@@ -266,8 +255,7 @@ def render_person_page(
         gallery_section += "</div>"
 
     bio_section = ""
-    if use_llm:
-        bio = generate_bio(person, family_tree)
+    if bio:
         bio_section = f"<h2>Biography</h2><p>{bio}</p>"
 
     content = f"""
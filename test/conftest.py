@@ -0,0 +1,67 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from typing import Sequence
+
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+
+Families = Sequence[tuple[str, str | None, str | None, list[str]]]
+
+
+def tree_facts(
+    families: Families = (),
+    persons: Sequence[str] = (),
+    names: dict[str, str] | None = None,
+    sub_facts: dict[str, list[Fact]] | None = None,
+    family_facts: dict[str, list[Fact]] | None = None,
+    sexes: bool = False,
+    links: bool = False,
+) -> list[Fact]:
+    """
+    INDI and FAM records for a test tree.
+
+    :param families: (family ID, husband, wife, children), husband and wife may be None
+    :param persons: People to add besides the family members, who follow in ID order
+    :param names: NAME of each person, people without one have no NAME
+    :param sub_facts: More level 1 facts of each person, after their NAME
+    :param family_facts: More level 1 facts of each family, after its members
+    :param sexes: Give everyone a SEX, M for IDs sorting before "@M" and F after
+    :param links: Add the FAMS and FAMC links the families imply to the persons
+    """
+    members = {
+        p for _, husb, wife, children in families for p in (husb, wife, *children)
+    }
+    ids = list(persons) + sorted(p for p in members if p and p not in persons)
+    indis = {}
+    for xref in ids:
+        indi = Fact(0, GedcomTag.INDI, xref)
+        if names and xref in names:
+            indi.sub_facts.append(Fact(1, GedcomTag.NAME, names[xref]))
+        if sexes:
+            indi.sub_facts.append(Fact(1, GedcomTag.SEX, "M" if xref < "@M" else "F"))
+        indi.sub_facts.extend((sub_facts or {}).get(xref, []))
+        indis[xref] = indi
+
+    facts = list(indis.values())
+    for fam, husb, wife, children in families:
+        fam_fact = Fact(0, GedcomTag.FAM, fam)
+        for tag, xref in ((GedcomTag.HUSB, husb), (GedcomTag.WIFE, wife)):
+            if xref:
+                fam_fact.sub_facts.append(Fact(1, tag, xref))
+                if links:
+                    indis[xref].sub_facts.append(Fact(1, GedcomTag.FAMS, fam))
+        for child in children:
+            fam_fact.sub_facts.append(Fact(1, GedcomTag.CHIL, child))
+            if links:
+                indis[child].sub_facts.append(Fact(1, GedcomTag.FAMC, fam))
+        fam_fact.sub_facts.extend((family_facts or {}).get(fam, []))
+        facts.append(fam_fact)
+    return facts
+
+
+def make_tree(families: Families = (), **kwargs) -> FamilyTree:
+    """A FamilyTree of tree_facts(families, **kwargs)."""
+    return FamilyTree(tree_facts(families, **kwargs))
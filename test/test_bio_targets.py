@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from llm.bios import BioStore, bio_key
+from llm.llama import MODEL, build_prompt
+from llm.targets import select_bio_targets, parse_part
+
+
+def make_tree() -> FamilyTree:
+    # Four generations in one line: @G0@ -> @G1@ -> @G2@ -> @G3@, plus an unrelated @X@
+    ids = ["@G0@", "@G1@", "@G2@", "@G3@", "@X@"]
+    families = [(f"@F{i}@", ids[i], None, [ids[i + 1]]) for i in range(3)]
+    jobs = {
+        xref: [Fact(1, GedcomTag.OCCU, f"Job {j}") for j in range(i)]
+        for i, xref in enumerate(ids)
+    }
+    names = {xref: f"Name{i} /Doe/" for i, xref in enumerate(ids)}
+    return FamilyTree(tree_facts(families, ids, names=names, sub_facts=jobs))
+
+
+def test_criteria_are_combined(tmp_path):
+    tree = make_tree()
+    assert select_bio_targets(tree, roots=["@G1@"], generations=1) == [
+        "@G0@",
+        "@G1@",
+        "@G2@",
+    ]
+    assert select_bio_targets(tree, min_facts=3) == ["@G3@", "@X@"]
+    assert select_bio_targets(tree, ids=["@X@", "@G0@"], min_facts=1) == ["@X@"]
+
+    store = BioStore(str(tmp_path / "bios.sqlite"))
+    prompt = build_prompt(tree.persons["@G0@"], tree)
+    store.put(bio_key(prompt, MODEL), "@G0@", MODEL, "A bio.")
+    assert select_bio_targets(tree, store, missing_only=True, limit=2) == [
+        "@G1@",
+        "@G2@",
+    ]
+
+
+def test_slices_cover_targets_once():
+    tree = make_tree()
+    parts = [select_bio_targets(tree, part=(k, 3)) for k in range(1, 4)]
+    assert [pid for part in parts for pid in part] == list(tree.persons)
+    assert parse_part("2/5") == (2, 5)
+    with pytest.raises(ValueError):
+        parse_part("6/5")
+
+
+if __name__ == "__main__":
+    pytest.main()
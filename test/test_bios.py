@@ -0,0 +1,122 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from llm.bios import BioStore, generate_bios
+from llm.mock_ollama import MockOllamaServer
+from llm.stats import LLMStats
+from llm.llama import SYSTEM_PROMPT
+from llm import bios as bios_module
+from wiki.build import load_bios
+
+
+def make_tree(count: int) -> FamilyTree:
+    ids = [f"@I{i}@" for i in range(count)]
+    names = {xref: f"Person{i} /Doe/" for i, xref in enumerate(ids)}
+    return FamilyTree(tree_facts(persons=ids, names=names))
+
+
+@pytest.fixture
+def mock_ollama():
+    servers = []
+
+    def start(**kwargs) -> MockOllamaServer:
+        server = MockOllamaServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_bios_are_concurrent_retried_and_cached(tmp_path, mock_ollama):
+    server = mock_ollama(delay=0.05, failures=2)
+    tree = make_tree(8)
+    store = BioStore(str(tmp_path / "bios.sqlite"))
+
+    bios = generate_bios(
+        tree, store, host=server.url, concurrency=4, retries=3, backoff=0.01
+    )
+    assert len(bios) == 8
+    assert bios["@I3@"] == "Person3 Doe is the subject of this biography."
+    assert server.requests == 10  # two 503s were retried
+    assert server.max_active > 1
+
+    # A re-run only asks for people whose prompt changed
+    tree.persons["@I5@"].birthday = "1 JAN 1900"
+    again = generate_bios(
+        tree, BioStore(str(tmp_path / "bios.sqlite")), host=server.url, backoff=0.01
+    )
+    assert len(again) == 8
+    assert server.requests == 11
+    assert "Birth: 1 JAN 1900" in server.prompts[-1]
+    assert server.systems[-1] == SYSTEM_PROMPT
+
+
+def test_interrupted_run_resumes(tmp_path, mock_ollama):
+    # Every request fails until the server has seen 6, so the first run finishes some
+    server = mock_ollama(failures=6)
+    tree = make_tree(10)
+    path = str(tmp_path / "bios.sqlite")
+
+    first = generate_bios(
+        tree, BioStore(path), host=server.url, concurrency=1, retries=0
+    )
+    assert len(first) == 4
+    assert len(BioStore(path)) == 4
+
+    second = generate_bios(tree, BioStore(path), host=server.url, retries=0)
+    assert len(second) == 10
+    assert server.requests == 16
+
+
+def test_streaming_records_call_stats(tmp_path, mock_ollama):
+    server = mock_ollama(token_delay=0.01)
+    stats = LLMStats()
+    bios = generate_bios(
+        make_tree(3),
+        BioStore(str(tmp_path / "bios.sqlite")),
+        host=server.url,
+        stats=stats,
+    )
+    assert bios["@I0@"] == "Person0 Doe is the subject of this biography."
+
+    summary = stats.summary()
+    assert summary["calls"] == 3
+    assert summary["output_tokens"] == 3 * 8  # one token per word
+    assert 0 < summary["ttft_p50"] < summary["latency_p50"]
+    assert summary["tokens_per_second_mean"] > 0
+    assert summary["prompt_tokens_mean"] == pytest.approx(
+        summary["prompt_chars_mean"] / 4, abs=1
+    )
+    assert "time to first token" in stats.report()
+
+
+def test_build_looks_prompts_up_once(tmp_path, mock_ollama, monkeypatch):
+    server = mock_ollama()
+    tree = make_tree(6)
+    built = []
+    build_prompt = bios_module.build_prompt
+
+    def counting_build_prompt(person, *args):
+        built.append(person.xref_id)
+        return build_prompt(person, *args)
+
+    monkeypatch.setattr(bios_module, "build_prompt", counting_build_prompt)
+    options = {"host": server.url, "backoff": 0.01}
+    targets = {"missing_only": True, "limit": 4}
+    bios = load_bios(tree, str(tmp_path), True, options, targets)
+    assert len(bios) == 4 and server.requests == 4
+    assert sorted(built) == sorted(tree.persons)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import make_tree
+from graph.charts import pedigree_layout, descendant_layout, write_person_charts
+
+TREE = [
+    ("@F1@", "@G1@", "@G2@", ["@P1@", "@P2@"]),
+    ("@F2@", "@P1@", "@S1@", ["@C1@", "@C2@"]),
+    ("@F3@", "@S2@", "@P2@", ["@C3@"]),
+]
+
+
+def test_pedigree_uses_ahnentafel_slots():
+    chart = pedigree_layout(make_tree(TREE), "@C1@", 2)
+    by_id = {n[0]: n for n in chart["nodes"]}
+
+    assert by_id["@C1@"][3:] == [0, 0.5]
+    assert by_id["@P1@"][3:] == [1, 0.25]
+    assert by_id["@S1@"][3:] == [1, 0.75]
+    assert by_id["@G2@"][3:] == [2, 0.375]
+    assert len(chart["edges"]) == len(chart["nodes"]) - 1
+
+    assert len(pedigree_layout(make_tree(TREE), "@C1@", 1)["nodes"]) == 3
+
+
+def test_descendants_are_centred_over_children():
+    chart = descendant_layout(make_tree(TREE), "@G1@", 2)
+    by_id = {n[0]: n for n in chart["nodes"]}
+
+    assert [by_id[c][3] for c in ("@C1@", "@C2@", "@C3@")] == [0, 1, 2]
+    assert by_id["@P1@"][3:] == [0.5, 1]
+    assert by_id["@G1@"][3:] == [1.25, 0]
+    assert not chart["truncated"]
+    assert descendant_layout(make_tree(TREE), "@G1@", 1)["truncated"]
+
+
+def test_unchanged_charts_are_not_rewritten(tmp_path):
+    tree = make_tree(TREE)
+    assert write_person_charts(tree, str(tmp_path), 2) == len(tree.persons)
+    assert write_person_charts(tree, str(tmp_path), 2) == 0
+
+    with open(tmp_path / "charts" / "@C1@.js", encoding="utf-8") as f:
+        script = f.read()
+    assert script.startswith("GedcomChart.render(")
+    data = json.loads(script[len("GedcomChart.render(") : -len(");\n")])
+    assert data["id"] == "@C1@"
+    assert (tmp_path / "charts" / "chart.html").exists()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,141 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import hashlib
+import pytest
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from gedcom.data_validation import validate_family_tree
+from gedcom.duplicates import (
+    MAX_BLOCK,
+    MAX_UNCONFIRMED_SCORE,
+    find_duplicates,
+    soundex,
+)
+
+
+def person(
+    xref: str,
+    name: str,
+    sex: str = "M",
+    birth: str | None = None,
+    place: str | None = None,
+) -> Fact:
+    indi = Fact(0, GedcomTag.INDI, xref)
+    indi.sub_facts.append(Fact(1, GedcomTag.NAME, name))
+    indi.sub_facts.append(Fact(1, GedcomTag.SEX, sex))
+    if birth:
+        birt = Fact(1, GedcomTag.BIRT, "")
+        birt.sub_facts.append(Fact(2, GedcomTag.DATE, birth))
+        if place:
+            birt.sub_facts.append(Fact(2, GedcomTag.PLAC, place))
+        indi.sub_facts.append(birt)
+    return indi
+
+
+def family(xref: str, husb: str, wife: str, children: list[str]) -> Fact:
+    fam = Fact(0, GedcomTag.FAM, xref)
+    fam.sub_facts.append(Fact(1, GedcomTag.HUSB, husb))
+    fam.sub_facts.append(Fact(1, GedcomTag.WIFE, wife))
+    fam.sub_facts.extend(Fact(1, GedcomTag.CHIL, child) for child in children)
+    return fam
+
+
+def link(facts: list[Fact]) -> list[Fact]:
+    """Add the FAMC/FAMS links the families imply to the persons."""
+    persons = {f.value: f for f in facts if f.tag == GedcomTag.INDI}
+    for fam in (f for f in facts if f.tag == GedcomTag.FAM):
+        for sub in fam.sub_facts:
+            tag = GedcomTag.FAMC if sub.tag == GedcomTag.CHIL else GedcomTag.FAMS
+            persons[sub.value].sub_facts.append(Fact(1, tag, fam.value))
+    return facts
+
+
+def test_soundex():
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert soundex("Tymczak") == "T522"
+    assert soundex("Pfister") == "P236"
+    assert soundex("Lee") == "L000"
+    assert soundex("Müller") == soundex("Mueller") == "M460"
+    assert soundex("") == ""
+
+
+def test_find_duplicates():
+    tree = FamilyTree(
+        link(
+            [
+                person("@P1@", "Thomas /Smith/"),
+                person("@P2@", "Mary /Jones/", "F"),
+                person("@C1@", "John /Smith/", birth="3 MAR 1850", place="Bath"),
+                person("@C2@", "Jon /Smyth/", birth="3 MAR 1850", place="Bath"),
+                # Siblings with numbered placeholder names
+                person("@C3@", "Son_1 /Smith/", birth="1852"),
+                person("@C4@", "Son_2 /Smith/", birth="1852"),
+                # Same name and date but a woman, and a John born a generation later
+                person("@X1@", "John /Smith/", "F", birth="3 MAR 1850"),
+                person("@X2@", "John /Smith/", birth="3 MAR 1880", place="Bath"),
+                # Nothing to go on besides the name
+                person("@X3@", "John /Smith/"),
+                family("@F1@", "@P1@", "@P2@", ["@C1@", "@C2@", "@C3@", "@C4@"]),
+            ]
+        )
+    )
+    candidates = find_duplicates(tree)
+    assert [(a, b) for _, a, b, _ in candidates] == [("@C1@", "@C2@")]
+    score, _, _, reasons = candidates[0]
+    assert 0.9 < score < 1
+    assert reasons == ["birth: same date", "birth place: same place", "same parents"]
+
+    issues = validate_family_tree(tree)
+    assert issues["Duplicate Records"] == [
+        "@C1@ (John Smith) and @C2@ (Jon Smyth) may be the same person, 93% alike: "
+        "birth: same date, birth place: same place, same parents."
+    ]
+
+
+def test_same_parents_alone_are_not_enough():
+    # A child named after an older sibling, neither of them dated
+    facts = [
+        person("@P1@", "Thomas /Smith/"),
+        person("@P2@", "Mary /Jones/", "F"),
+        person("@C1@", "William /Smith/"),
+        person("@C2@", "William /Smith/"),
+        family("@F1@", "@P1@", "@P2@", ["@C1@", "@C2@"]),
+    ]
+    tree = FamilyTree(link(facts))
+    assert find_duplicates(tree) == []
+    [(score, _, _, reasons)] = find_duplicates(tree, min_score=0)
+    assert score == MAX_UNCONFIRMED_SCORE
+    assert reasons == ["same parents"]
+
+    # A birth place both agree on is enough
+    facts[2] = person("@C1@", "William /Smith/", birth="1850", place="Bath")
+    facts[3] = person("@C2@", "William /Smith/", birth="ABT 1850", place="Bath")
+    assert [(a, b) for _, a, b, _ in find_duplicates(FamilyTree(link(facts)))] == [
+        ("@C1@", "@C2@")
+    ]
+
+
+def test_large_blocks_are_windowed():
+    # More unlike names than MAX_BLOCK in one block, all born in 1900
+    facts = [
+        person(
+            f"@I{i}@",
+            f"{hashlib.sha1(bytes(i)).hexdigest()[:10]} /Smith/",
+            birth="1900",
+        )
+        for i in range(3 * MAX_BLOCK)
+    ]
+    name = facts[0].sub_facts[0].value
+    facts.append(person("@D1@", name, birth="1899"))  # a year apart, another decade
+    facts.append(person("@D2@", name.replace("Smith", "Jones"), birth="1900"))
+    facts.append(person("@D3@", name, birth="1920"))
+    candidates = find_duplicates(FamilyTree(facts))
+    assert [(a, b) for _, a, b, _ in candidates] == [("@D1@", "@I0@")]
+
+
+if __name__ == "__main__":
+    pytest.main()
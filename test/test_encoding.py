@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import codecs
+import pytest
+from gedcom.encoding import sniff_encoding
+from gedcom.fact import GedcomTag
+from gedcom.parse import parse_facts
+
+ANSEL_NAME = b"Ren\xe2e /\xa1\xe2od\xe2z/"
+
+
+def write_gedcom(tmp_path, data: bytes) -> str:
+    path = tmp_path / "test.ged"
+    path.write_bytes(data)
+    return str(path)
+
+
+def gedcom_text(char: str, name: str = "René /Łódź/") -> str:
+    return f"0 HEAD\n1 CHAR {char}\n0 @I1@ INDI\n1 NAME {name}\n0 TRLR\n"
+
+
+def person_name(path: str) -> str:
+    indi = next(f for f in parse_facts(path) if f.tag == GedcomTag.INDI)
+    return indi.sub_facts[0].value
+
+
+def test_ansel_codec():
+    assert ANSEL_NAME.decode("ansel") == "René /Łódź/"
+    assert "René /Łódź/".encode("ansel") == ANSEL_NAME
+    # A diacritic at the end of a chunk waits for its letter
+    decoder = codecs.getincrementaldecoder("ansel")()
+    text = "".join(
+        decoder.decode(ANSEL_NAME[i : i + 1]) for i in range(len(ANSEL_NAME))
+    )
+    assert text + decoder.decode(b"", final=True) == "René /Łódź/"
+
+
+def test_sniff_encoding(tmp_path):
+    cases = {
+        codecs.BOM_UTF8 + gedcom_text("ANSEL").encode(): "utf-8-sig",
+        gedcom_text("UNICODE").encode("utf-16"): "utf-16",
+        gedcom_text("UNICODE").encode("utf-16-be"): "utf-16-be",
+        gedcom_text("ANSEL", "x").encode(): "ansel",
+        gedcom_text("ANSI", "x").encode(): "cp1252",
+        b"0 HEAD\n0 TRLR\n": "utf-8",
+    }
+    for data, encoding in cases.items():
+        assert sniff_encoding(write_gedcom(tmp_path, data)) == encoding
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"0 HEAD\n1 CHAR ANSEL\n0 @I1@ INDI\n1 NAME " + ANSEL_NAME + b"\n0 TRLR\n",
+        codecs.BOM_UTF8 + gedcom_text("UTF-8").encode(),
+        gedcom_text("UNICODE").encode("utf-16"),
+        gedcom_text("UNICODE").encode("utf-16-le"),
+        gedcom_text("UTF-8").replace("\n", "\r\n").encode(),
+    ],
+)
+def test_parse_encodings(tmp_path, data):
+    assert person_name(write_gedcom(tmp_path, data)) == "René /Łódź/"
+
+
+def test_undecodable_bytes_are_reported(tmp_path, capsys):
+    path = write_gedcom(
+        tmp_path, gedcom_text("UTF-8", "Ren\udce9").encode("utf-8", "surrogateescape")
+    )
+    assert person_name(path) == "Ren\ufffd"
+    assert "Warning: 1 bytes" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,5 +1,7 @@
+import pickle
 import pytest
-from gedcom.fact import Fact, GedcomTag
+from gedcom.fact import CustomTag, Fact, GedcomTag, lookup_tag
+from gedcom.parse import extract_fact
 
 def test_fact_creation():
     parent_fact = Fact(0, GedcomTag.BIRT, "")
@@ -11,5 +13,28 @@ def test_fact_creation():
     assert parent_fact.sub_facts[0].tag == GedcomTag.DATE
     assert "1 JAN 2000" in str(parent_fact)
 
+def test_tag_lookup():
+    assert lookup_tag("BIRT") is GedcomTag.BIRT
+    assert lookup_tag(b"DATE") is GedcomTag.DATE
+    assert GedcomTag["NOT_A_TAG"] is GedcomTag.OTHER
+
+    custom = lookup_tag("_FSFTID")
+    assert isinstance(custom, CustomTag)
+    assert custom.name == custom.value == "_FSFTID"
+    assert lookup_tag("_FSFTID") is custom
+    assert lookup_tag(b"_FSFTID") is custom
+    assert pickle.loads(pickle.dumps(custom)) is custom
+
+
+def test_unknown_tags_keep_their_name():
+    fact = extract_fact("1 _FSFTID LZ6X-9QK")
+    assert fact.tag.name == "_FSFTID" and fact.value == "LZ6X-9QK"
+    fact = extract_fact("2 MILT Served in the navy")
+    assert "MILT: Served in the navy" in str(fact)
+
+    record = extract_fact("0 @I1@ INDI")
+    assert record.tag is GedcomTag.INDI and record.value == "@I1@"
+
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
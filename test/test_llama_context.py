@@ -0,0 +1,63 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from llm.llama import gather_context, build_prompt, estimate_tokens, SYSTEM_PROMPT
+
+
+def make_tree(children: int) -> FamilyTree:
+    ids = ["@F@", "@M@", "@W@"] + [f"@C{i}@" for i in range(children)]
+    title = Fact(1, GedcomTag.TITL, "Duke of Somewhere")
+    burial = Fact(1, GedcomTag.BURI, "")
+    burial.sub_facts.append(Fact(2, GedcomTag.PLAC, "Old Church"))
+    marriage = Fact(1, GedcomTag.MARR, "")
+    marriage.sub_facts.append(Fact(2, GedcomTag.DATE, "1 MAY 1800"))
+    facts = tree_facts(
+        [("@F1@", "@F@", "@W@", ids[3:])],
+        ids,
+        names={xref: f"Name{xref[1:-1]} /Doe/" for xref in ids},
+        sub_facts={"@F@": [title, burial, Fact(1, GedcomTag.REFN, "12")]},
+        family_facts={"@F1@": [marriage]},
+    )
+    return FamilyTree(facts)
+
+
+def test_context_lists_details_without_record_noise():
+    tree = make_tree(3)
+    context = gather_context(tree.persons["@F@"], tree)
+
+    assert "Title: Duke of Somewhere" in context
+    assert "Burial: Old Church" in context
+    assert "Marriage: 1 MAY 1800" in context
+    assert "Children: NameC0 Doe, NameC1 Doe, NameC2 Doe" in context
+    assert "@F1@" not in context
+    assert "Reference Number" not in context
+
+
+def test_context_keeps_to_budget_by_priority():
+    tree = make_tree(60)
+    person = tree.persons["@F@"]
+    full = gather_context(person, tree, budget=2000)
+    small = gather_context(person, tree, budget=120)
+
+    assert estimate_tokens(small) <= 120
+    assert estimate_tokens(small) < estimate_tokens(full)
+    assert "Wife: NameW Doe" in small
+    assert "Title: Duke of Somewhere" in small
+    assert "more" in small  # the children list says how many were left out
+
+
+def test_system_prompt_is_not_repeated_in_prompt():
+    tree = make_tree(1)
+    prompt = build_prompt(tree.persons["@F@"], tree)
+    assert SYSTEM_PROMPT not in prompt
+    assert prompt.startswith("Here are the facts about the subject:")
+
+
+if __name__ == "__main__":
+    pytest.main()
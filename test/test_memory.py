@@ -0,0 +1,58 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from pipeline.memory import MemoryReport, format_structure_report, structure_report
+from pipeline.scheduler import Pipeline
+from pipeline.trace import Tracer
+
+
+def make_tree(count: int) -> FamilyTree:
+    ids = [f"@I{i}@" for i in range(count)]
+    names = {xref: f"Person{i} /Doe/" for i, xref in enumerate(ids)}
+    notes = {
+        xref: [Fact(1, GedcomTag.NOTE, f"{i:04d}" + "x" * 996)]
+        for i, xref in enumerate(ids)
+    }
+    return FamilyTree(tree_facts(persons=ids, names=names, sub_facts=notes))
+
+
+def test_stages_are_measured():
+    memory = MemoryReport()
+    memory.start()
+    try:
+        pipeline = Pipeline(workers=1, tracer=Tracer(), memory=memory)
+        pipeline.add("allocate", lambda r: [bytes(1 << 20) for _ in range(4)])
+        pipeline.add("transient", lambda r: len(bytes(8 << 20)), ["allocate"])
+        pipeline.run()
+    finally:
+        memory.stop()
+
+    allocate, transient = memory.stages["allocate"], memory.stages["transient"]
+    assert allocate["retained_mb"] == pytest.approx(4, abs=0.5)
+    assert transient["peak_mb"] == pytest.approx(8, abs=0.5)
+    assert abs(transient["retained_mb"]) < 0.5
+    assert "transient" in memory.report()
+
+
+def test_structures_are_counted_once():
+    tree = make_tree(200)
+    report = structure_report(tree, page_bytes=1234)
+    sections = report["sections"]
+
+    # The 1000 character notes dominate and belong to Person.facts; the timeline
+    # refers to the same facts without counting them again
+    assert sections["Person.facts"] > 200 * 1000
+    assert sections["Person.timeline"] < sections["Person.facts"] / 2
+    assert report["facts"]["count"] == 400
+    assert report["total"] == sum(sections.values())
+    assert "Page strings" in format_structure_report(report)
+
+
+if __name__ == "__main__":
+    pytest.main()
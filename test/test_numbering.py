@@ -0,0 +1,57 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import make_tree
+from gedcom.numbering import compute_numbering
+from main import main
+
+ROYAL92 = os.path.join(os.path.dirname(__file__), "..", "royal92.ged")
+
+
+def test_numbering_with_pedigree_collapse():
+    # G1 + G2 have children P1 and P2, whose children C1 and C2 marry and have R
+    tree = make_tree(
+        [
+            ("@F1@", "@G1@", "@G2@", ["@P1@", "@P2@"]),
+            ("@F2@", "@P1@", "@S1@", ["@C1@"]),
+            ("@F3@", "@S2@", "@P2@", ["@C2@"]),
+            ("@F4@", "@C1@", "@C2@", ["@R@"]),
+        ]
+    )
+    numbering = compute_numbering(tree, ["@R@"])
+
+    assert numbering.sosa["@R@"] == 1
+    assert numbering.sosa["@C1@"] == 2
+    assert numbering.sosa["@C2@"] == 3
+    assert numbering.sosa["@P1@"] == 4
+    assert numbering.sosa["@P2@"] == 7
+    # G1 is both 8 (through C1) and 14 (through C2), the smallest number is kept
+    assert numbering.sosa["@G1@"] == 8
+    assert numbering.sosa["@G2@"] == 9
+
+    assert numbering.generation["@G1@"] == 3
+    assert numbering.generation["@S2@"] == 2
+
+    top = compute_numbering(tree, ["@G1@"])
+    assert top.daboville["@G1@"] == "1"
+    assert top.daboville["@P2@"] == "1.2"
+    assert top.daboville["@C2@"] == "1.2.1"
+    assert top.daboville["@R@"] == "1.1.1.1"
+    assert top.generation["@R@"] == -3
+
+
+def test_cached_tree_is_not_numbered(tmp_path):
+    options = {"validate": False, "chart_generations": 0, "privacy": "off"}
+    main(ROYAL92, str(tmp_path), roots=["@I1@"], **options)
+    person_page = tmp_path / "persons" / "@I1@.html"
+    assert "Ahnentafel (Sosa)" in person_page.read_text(encoding="utf-8")
+
+    main(ROYAL92, str(tmp_path), use_cache=True, **options)
+    assert "Ahnentafel (Sosa)" not in person_page.read_text(encoding="utf-8")
+
+
+if __name__ == "__main__":
+    pytest.main()
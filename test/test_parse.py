@@ -0,0 +1,101 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from gedcom.parse import parse_facts
+from gedcom.fact import GedcomTag
+
+ROYAL92 = os.path.join(os.path.dirname(__file__), "..", "royal92.ged")
+
+
+def write_gedcom(tmp_path, lines: list[str]) -> str:
+    path = tmp_path / "test.ged"
+    path.write_text("\n".join(["0 HEAD", *lines, "0 TRLR"]) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_conc_and_cont_assembly(tmp_path):
+    path = write_gedcom(
+        tmp_path,
+        [
+            "0 @I1@ INDI",
+            "1 NOTE Born in the par",
+            "2 CONC ish of St Mary, ",
+            "2 CONC buried there.",
+            "2 CONT Second line",
+            "2 CONT",
+            "2 CONT after an empty line",
+            "1 NAME John /Smith/",
+        ],
+    )
+    indi = parse_facts(path)[1]
+    note, name = indi.sub_facts
+    assert note.value == (
+        "Born in the parish of St Mary, buried there.\n"
+        "Second line\n\nafter an empty line"
+    )
+    assert name.value == "John /Smith/"
+
+
+def test_continuation_after_sub_fact(tmp_path):
+    path = write_gedcom(
+        tmp_path,
+        [
+            "0 @I1@ INDI",
+            "1 NOTE First part",
+            "2 SOUR @S1@",
+            "2 CONC , second part",
+            "1 BIRT",
+            "2 PLAC London,",
+            "England",
+        ],
+    )
+    indi = parse_facts(path)[1]
+    note, birth = indi.sub_facts
+    assert note.value == "First part, second part"
+    assert note.sub_facts[0].tag == GedcomTag.SOUR
+    assert note.sub_facts[0].value == "@S1@"
+    assert birth.sub_facts[0].value == "London, England"
+
+
+def test_long_notes(tmp_path):
+    pieces = [f"{i:05d} " for i in range(10_000)]
+    lines = ["0 @I1@ INDI", "1 NOTE start "]
+    lines += [
+        f"2 {'CONT' if i % 100 == 0 else 'CONC'} {p}" for i, p in enumerate(pieces)
+    ]
+    note = parse_facts(write_gedcom(tmp_path, lines))[1].sub_facts[0]
+    assert note.value.count("\n") == 100
+    assert note.value.replace("\n", "") == "start " + "".join(pieces)
+
+
+def test_trailing_breaks_and_spaces_are_kept(tmp_path):
+    path = write_gedcom(
+        tmp_path,
+        [
+            "0 @I1@ INDI",
+            "1 NOTE trailing break",
+            "2 CONT",
+            "1 NOTE trailing",
+            "2 CONC  spaces  ",
+        ],
+    )
+    first, second = parse_facts(path)[1].sub_facts
+    assert first.value == "trailing break\n"
+    assert second.value == "trailing spaces  "
+
+
+def test_royal92_address():
+    records = parse_facts(ROYAL92)
+    address = next(f for r in records for f in r.sub_facts if f.tag == GedcomTag.ADDR)
+    assert address.value.splitlines() == [
+        "149 Kimrose Lane",
+        "Broadview Heights, Ohio 44147-1258",
+        "Internet Email address:  ah189@cleveland.freenet.edu",
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main()
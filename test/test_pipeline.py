@@ -0,0 +1,116 @@
+import sys
+import os
+import subprocess
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from pipeline.scheduler import Pipeline, StopPipeline
+
+
+def test_stages_run_after_their_dependencies():
+    order = []
+    pipeline = Pipeline(workers=4)
+    pipeline.add("render", lambda r: order.append("render") or r["tree"] * 2, ["tree"])
+    pipeline.add("tree", lambda r: order.append("tree") or r["parse"] + 1, ["parse"])
+    pipeline.add("parse", lambda r: order.append("parse") or r["seed"])
+
+    results = pipeline.run({"seed": 1})
+    assert order == ["parse", "tree", "render"]
+    assert results["render"] == 4
+    assert pipeline.critical_path()[0].name == "parse"
+
+
+def test_independent_stages_overlap():
+    both = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline(workers=2)
+    pipeline.add("tree", lambda r: None)
+    pipeline.add("cache", lambda r: both.wait(), ["tree"])
+    pipeline.add("pages", lambda r: both.wait(), ["tree"])
+    pipeline.run()  # the barrier times out unless both stages run at once
+
+
+def busy(seconds: float) -> None:
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def test_critical_path_follows_the_slowest_chain():
+    pipeline = Pipeline(workers=3)
+    pipeline.add("tree", lambda r: busy(0.01))
+    pipeline.add("report", lambda r: busy(0.01), ["tree"])
+    pipeline.add("charts", lambda r: busy(0.1), ["tree"])
+    pipeline.add("persons", lambda r: busy(0.01), ["charts", "tree"])
+    pipeline.run()
+
+    assert [s.name for s in pipeline.critical_path()] == ["tree", "charts", "persons"]
+    assert "critical path" in pipeline.report()
+
+
+def test_stages_are_timed_by_cpu_not_contended_wall_time():
+    # Two CPU-bound stages share the GIL, so each one's wall time is about doubled
+    pipeline = Pipeline(workers=2)
+    pipeline.add("a", lambda r: busy(0.2))
+    pipeline.add("b", lambda r: busy(0.2))
+    pipeline.add("waits", lambda r: time.sleep(0.2))
+    pipeline.run()
+
+    for name in ("a", "b"):
+        assert 0.2 <= pipeline.stages[name].cost < 0.3
+    assert pipeline.stages["waits"].cost < 0.05
+    assert "+0.2" in pipeline.report()
+
+
+def test_bad_graphs_are_rejected():
+    pipeline = Pipeline()
+    pipeline.add("a", lambda r: None, ["b"])
+    pipeline.add("b", lambda r: None, ["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.run()
+
+    pipeline = Pipeline()
+    pipeline.add("a", lambda r: None, ["missing"])
+    with pytest.raises(ValueError, match="unknown"):
+        pipeline.run()
+
+
+def test_failures_stop_later_stages():
+    ran = []
+
+    def fail(results):
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline(workers=1)
+    pipeline.add("tree", fail)
+    pipeline.add("pages", lambda r: ran.append("pages"), ["tree"])
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run()
+
+    def stop(results):
+        raise StopPipeline("No Family Tree")
+
+    pipeline = Pipeline(workers=1)
+    pipeline.add("tree", stop)
+    pipeline.add("pages", lambda r: ran.append("pages"), ["tree"])
+    assert pipeline.run() is None
+    assert ran == []
+
+
+def test_scheduler_does_not_import_the_tree():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    code = "import sys, pipeline.scheduler; print('gedcom.tree' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=src,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+if __name__ == "__main__":
+    pytest.main()
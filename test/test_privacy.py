@@ -0,0 +1,106 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from gedcom.cache import load_from_cache
+from gedcom.privacy import LIVING, latest_births, living_persons, privatize
+from main import main
+
+ROYAL92 = os.path.join(os.path.dirname(__file__), "..", "royal92.ged")
+
+
+def event(tag: GedcomTag, date: str | None = None) -> Fact:
+    fact = Fact(1, tag, "")
+    if date:
+        fact.sub_facts.append(Fact(2, GedcomTag.DATE, date))
+    return fact
+
+
+def make_tree() -> FamilyTree:
+    """
+    G1 (died) + G2 (born 1900) have P1, undated, who with S1 (born 1990) has C1. O1 is
+    undated with a child O2 born 1850, A1 was born "AFT 1800" and B1 only has a burial.
+    """
+    events = {
+        "@G1@": [event(GedcomTag.BIRT, "1895"), event(GedcomTag.DEAT, "1970")],
+        "@G2@": [event(GedcomTag.BIRT, "12 MAR 1900")],
+        "@P1@": [],
+        "@S1@": [event(GedcomTag.BIRT, "1990")],
+        "@C1@": [],
+        "@O1@": [],
+        "@O2@": [event(GedcomTag.BIRT, "ABT 1850")],
+        "@A1@": [event(GedcomTag.BIRT, "AFT 1800")],
+        "@B1@": [event(GedcomTag.BURI)],
+    }
+    families = [
+        ("@F1@", "@G1@", "@G2@", ["@P1@"]),
+        ("@F2@", "@P1@", "@S1@", ["@C1@"]),
+        ("@F3@", "@O1@", None, ["@O2@"]),
+    ]
+    names = {xref: f"Name {xref[1:3]}" for xref in events}
+    facts = tree_facts(
+        families,
+        list(events),
+        names=names,
+        sub_facts=events,
+        family_facts={"@F2@": [event(GedcomTag.MARR, "2015")]},
+    )
+    return FamilyTree(facts)
+
+
+def test_living_is_inferred_from_relatives():
+    tree = make_tree()
+    latest = latest_births(tree)
+    assert latest["@G2@"] == 1900
+    assert latest["@P1@"] == 1895 + 60  # child of G1
+    assert latest["@O1@"] == 1850 - 12  # parent of O2
+    assert "@A1@" not in latest
+
+    living = living_persons(tree, year=2026)
+    assert living == {"@P1@", "@S1@", "@C1@", "@A1@"}
+
+
+def test_redact_and_omit():
+    tree = make_tree()
+    published, living = privatize(tree, "redact")
+    assert "@P1@" in living
+
+    person = published.persons["@S1@"]
+    assert person.name == LIVING and person.birthday is None
+    assert person.facts == []
+    assert not any(stage for _, stage in person.timeline.stages())
+    family = published.families["@F2@"]
+    assert family.name == "Living and Living"
+    assert all(f.tag != GedcomTag.MARR for f in family.facts)
+    assert published.persons["@G2@"] is tree.persons["@G2@"]
+    # The full tree keeps everything
+    assert tree.persons["@S1@"].name == "Name S1"
+    assert any(f.tag == GedcomTag.MARR for f in tree.families["@F2@"].facts)
+
+    published, living = privatize(tree, "omit")
+    assert not living & published.persons.keys()
+    assert published.families["@F1@"].children == []
+    assert "@F2@" not in published.families
+    assert privatize(tree, "off") == (tree, set())
+
+
+def test_cache_keeps_the_full_tree(tmp_path):
+    options = {"validate": False, "chart_generations": 0, "workers": 1}
+    main(ROYAL92, str(tmp_path), **options)
+    person_page = tmp_path / "persons" / "@I1@.html"  # Victoria, long dead
+    living_page = tmp_path / "persons" / "@I52@.html"
+    assert LIVING in living_page.read_text(encoding="utf-8")
+    assert all(p.name != LIVING for p in load_from_cache(tmp_path).persons.values())
+
+    main(ROYAL92, str(tmp_path), use_cache=True, privacy="off", **options)
+    assert LIVING not in living_page.read_text(encoding="utf-8")
+    assert person_page.exists()
+
+
+if __name__ == "__main__":
+    pytest.main()
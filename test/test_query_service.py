@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import json
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from service.lru import LRUCache
+from service.server import QueryService
+from pipeline.trace import TRACER
+
+
+def make_tree() -> FamilyTree:
+    families = [
+        ("@F1@", "@I1@", "@I2@", ["@I3@"]),
+        ("@F2@", "@I3@", "@I4@", ["@I5@"]),
+    ]
+    names = {
+        "@I1@": "John /Smith/",
+        "@I2@": "Mary /Jones/",
+        "@I3@": "Peter /Smith/",
+        "@I4@": "Anne /Brown/",
+        "@I5@": "Paul /Smith/",
+    }
+    return FamilyTree(tree_facts(families, names=names))
+
+
+def get(service: QueryService, target: str) -> tuple[int, object]:
+    status, body = service.handle(target)
+    return status, json.loads(body)
+
+
+def test_search_exact_prefix_and_fuzzy():
+    service = QueryService(make_tree())
+
+    _, exact = get(service, "/search?q=smith")
+    assert {r["id"] for r in exact} == {"@I1@", "@I3@", "@I5@"}
+
+    _, both = get(service, "/search?q=pet%20smi")
+    assert [r["id"] for r in both] == ["@I3@"]
+
+    _, fuzzy = get(service, "/search?q=smyth")
+    assert {r["id"] for r in fuzzy} == {"@I1@", "@I3@", "@I5@"}
+
+
+def test_lineage_and_relationship_queries():
+    service = QueryService(make_tree())
+
+    _, ancestors = get(service, "/ancestors/I5")
+    assert {(r["id"], r["generation"]) for r in ancestors} == {
+        ("@I3@", 1),
+        ("@I4@", 1),
+        ("@I1@", 2),
+        ("@I2@", 2),
+    }
+
+    _, relationship = get(service, "/relationship?from=I2&to=I4")
+    assert [(p["edge"], p["id"]) for p in relationship["path"]] == [
+        ("self", "@I2@"),
+        ("child", "@I3@"),
+        ("spouse", "@I4@"),
+    ]
+
+    _, grandparent = get(service, "/relationship?from=I5&to=I1")
+    assert grandparent["relationship"] == "grandparent"  # no SEX records
+    _, limited = get(service, "/relationship?from=I5&to=I1&depth=1")
+    assert limited["relationship"] is None
+
+    status, _ = get(service, "/person/I99")
+    assert status == 404
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache: LRUCache[str] = LRUCache(max_entries=2, max_bytes=10)
+    cache.put("a", "a", 4)
+    cache.put("b", "b", 4)
+    assert cache.get("a") == "a"
+    cache.put("c", "c", 4)  # over both bounds, evicts least recently used "b"
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.bytes == 8
+
+
+def test_cache_hits_and_misses_are_counted():
+    service = QueryService(make_tree())
+    TRACER.reset()
+    service.handle("/search?q=smith")
+    service.handle("/search?q=smith")
+    service.handle("/search?q=jones")
+    assert TRACER.counters["service.cache.hits"] == 1
+    assert TRACER.counters["service.cache.misses"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import make_tree
+from gedcom.relationship import RelationshipCalculator, name_relationship
+from gedcom.sex import Sex
+
+# Male IDs sort before "@M", female IDs after it
+TREE = [
+    ("@F1@", "@A1@", "@W1@", ["@B1@", "@B2@"]),  # A1 + W1 have sons B1, B2
+    ("@F2@", "@B1@", "@W2@", ["@C1@"]),
+    ("@F3@", "@B2@", "@W3@", ["@C2@"]),
+    ("@F4@", "@C1@", "@W4@", ["@D1@"]),
+    ("@F5@", "@C2@", "@W5@", ["@D2@"]),
+    ("@F6@", "@D2@", "@W6@", ["@E2@"]),
+    ("@F7@", "@B1@", "@W7@", ["@C3@"]),  # B1's second marriage
+]
+
+
+def test_name_relationship():
+    assert name_relationship(3, 5, Sex.M) == "second cousin twice removed"
+    assert name_relationship(4, 4, None) == "third cousin"
+    assert name_relationship(4, 0, Sex.F) == "2nd great-grandmother"
+    assert name_relationship(1, 3, Sex.M) == "grandnephew"
+    assert name_relationship(3, 1, Sex.F) == "grandaunt"
+
+
+def test_pairwise_relationships():
+    calc = RelationshipCalculator(make_tree(TREE, sexes=True))
+
+    cousin = calc.relationship("@D1@", "@E2@")
+    assert cousin.description == "second cousin once removed"
+    assert cousin.common_ancestors == ["@A1@", "@W1@"]
+
+    assert calc.relationship("@C1@", "@C3@").description == "half-brother"
+    assert calc.relationship("@E2@", "@A1@").description == "2nd great-grandfather"
+    assert calc.relationship("@C1@", "@W4@").description == "wife"
+    assert calc.relationship("@W2@", "@W3@") is None
+
+
+# WA is X1's great-grandmother through WQ and R1, and also the sister of X1's father
+# P1, so an aunt at the same distance
+COLLAPSED = [
+    ("@F1@", "@B1@", None, ["@P1@", "@WA@"]),
+    ("@F2@", "@P1@", "@WQ@", ["@X1@"]),
+    ("@F3@", "@R1@", None, ["@WQ@"]),
+    ("@F4@", None, "@WA@", ["@R1@"]),
+]
+
+
+def test_direct_ancestry_wins_ties():
+    calc = RelationshipCalculator(make_tree(COLLAPSED, sexes=True))
+    assert calc.relationship("@X1@", "@WA@").description == "great-grandmother"
+    assert calc.relationships_to("@X1@")["@WA@"] == "great-grandmother"
+
+
+def test_depth_limits_the_common_ancestors():
+    calc = RelationshipCalculator(make_tree(TREE, sexes=True))
+    # D1 and E2 meet at A1 and W1, three and four generations up
+    assert calc.relationship("@D1@", "@E2@", depth=4) is not None
+    assert calc.relationship("@D1@", "@E2@", depth=3) is None
+    assert calc.relationship("@D1@", "@C1@", depth=1).description == "father"
+
+    batch = calc.relationships_to("@D1@", depth=3)
+    assert "@E2@" not in batch
+    assert batch["@D2@"] == "second cousin"
+    assert batch["@A1@"] == "great-grandfather"
+    assert batch["@W4@"] == "mother"
+
+
+@pytest.mark.parametrize("families", [TREE, COLLAPSED])
+def test_batch_matches_pairwise(families):
+    tree = make_tree(families, sexes=True)
+    calc = RelationshipCalculator(tree)
+    for home_id in tree.persons:
+        batch = calc.relationships_to(home_id)
+        for person_id in tree.persons:
+            pair = calc.relationship(home_id, person_id)
+            assert batch.get(person_id) == (pair.description if pair else None)
+        limited = calc.relationships_to(home_id, depth=2)
+        for person_id in tree.persons:
+            pair = calc.relationship(home_id, person_id, depth=2)
+            assert limited.get(person_id) == (pair.description if pair else None)
+
+
+if __name__ == "__main__":
+    pytest.main()
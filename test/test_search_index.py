@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import json
+import pytest
+from gedcom.person import Person
+from gedcom.fact import Fact, GedcomTag
+from wiki import search_index
+from wiki.search_index import build_records, render_shard, shard_tokens
+
+
+def make_person(xref: str, name: str, birth: str) -> Person:
+    main_fact = Fact(0, GedcomTag.INDI, xref)
+    main_fact.sub_facts.append(Fact(1, GedcomTag.NAME, name))
+    birth_fact = Fact(1, GedcomTag.BIRT, "")
+    birth_fact.sub_facts.append(Fact(2, GedcomTag.DATE, birth))
+    birth_fact.sub_facts.append(Fact(2, GedcomTag.PLAC, "Zoë Town, England"))
+    main_fact.sub_facts.append(birth_fact)
+    return Person(main_fact)
+
+
+def test_records_and_postings():
+    persons = [
+        ("@I1@", make_person("@I1@", "John /Doe/", "1 JAN 1900")),
+        ("@I2@", make_person("@I2@", "Jane /Doe/", "1905")),
+    ]
+    records, postings = build_records(persons)
+
+    assert records[0] == ["@I1@", "John Doe", "1900-", "Zoë Town, England"]
+    assert postings["doe"] == [0, 1]
+    assert postings["1905"] == [1]
+    assert postings["zoe"] == [0, 1]
+    assert postings["i2"] == [1]
+
+
+def test_shards_record_index_order():
+    persons = [
+        ("@I1@", make_person("@I1@", "Mary /Jones/", "1900")),
+        ("@I2@", make_person("@I2@", "John /Smith/", "1900")),
+        ("@I3@", make_person("@I3@", "Joan /Jones/", "1900")),
+    ]
+    records, postings = build_records(persons)
+    shard = render_shard("jo", ["jones", "john", "joan"], records, postings)
+    data = json.loads(shard[shard.index("{") : shard.rindex(")")])
+
+    # Local records follow the sorted tokens, "o" maps them back to index order
+    assert [r[0] for r in data["r"]] == ["@I3@", "@I2@", "@I1@"]
+    assert data["o"] == [2, 1, 0]
+
+
+def test_dense_shards_split_on_longer_prefix(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_SHARD_POSTINGS", 2)
+    postings = {"john": [0, 1], "joan": [2], "jo": [3], "mary": [4]}
+    shards = shard_tokens(postings)
+
+    assert shards["ma"] == ["mary"]
+    assert shards["jo"] == ["jo"]
+    assert shards["joh"] == ["john"]
+    assert shards["joa"] == ["joan"]
+
+
+if __name__ == "__main__":
+    pytest.main()
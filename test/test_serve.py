@@ -0,0 +1,76 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from llm.bios import BioStore, lookup_bios
+from pipeline.trace import TRACER
+from wiki import serve
+from wiki.serve import WikiRenderer, serve_wiki
+
+
+def make_tree() -> FamilyTree:
+    names = {f"@I{i}@": f"Person{i} /Doe/" for i in range(1, 4)}
+    return FamilyTree(tree_facts([("@F1@", "@I1@", "@I2@", ["@I3@"])], names=names))
+
+
+def test_pages_render_on_demand_with_stable_etags():
+    renderer = WikiRenderer(make_tree())
+
+    body, content_type, etag = renderer.get("/persons/@I3@.html")
+    assert content_type.startswith("text/html")
+    assert b"Person3 Doe" in body
+    assert renderer.get("/persons/@I3@.html")[2] == etag
+    assert renderer.pages.hits == 1
+
+    assert renderer.get("/families/@F1@.html") is not None
+    assert renderer.get("/search/manifest.js") is not None
+    assert renderer.get("/persons/@I9@.html") is None
+
+
+def test_cache_hits_and_misses_are_counted():
+    renderer = WikiRenderer(make_tree())
+    TRACER.reset()
+    renderer.get("/persons/@I1@.html")
+    renderer.get("/persons/@I1@.html")
+    renderer.get("/persons/@I2@.html")
+    assert TRACER.counters["wiki.cache.hits"] == 1
+    assert TRACER.counters["wiki.cache.misses"] == 2
+
+
+def test_page_cache_is_bounded_by_size():
+    renderer = WikiRenderer(make_tree(), cache_bytes=1)
+    renderer.get("/persons/@I1@.html")
+    renderer.get("/persons/@I2@.html")
+    assert len(renderer.pages) == 0
+
+
+def test_serve_wiki_shows_stored_bios(tmp_path, monkeypatch):
+    tree = make_tree()
+    store = BioStore(str(tmp_path / "bios.sqlite"))
+    _, missing = lookup_bios(tree, store, ["@I3@"], model="test")
+    key, _ = missing["@I3@"]
+    store.put(key, "@I3@", "test", "A stored biography.")
+
+    renderers = []
+
+    def make_handler(renderer: WikiRenderer):
+        renderers.append(renderer)
+        return serve.BaseHTTPRequestHandler
+
+    def stop(self) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(serve, "make_handler", make_handler)
+    monkeypatch.setattr(serve.WikiHTTPServer, "serve_forever", stop)
+    serve_wiki(tree, port=0, bio_store=store, bio_options={"model": "test"})
+
+    body, _, _ = renderers[0].get("/persons/@I3@.html")
+    assert b"A stored biography." in body
+
+
+if __name__ == "__main__":
+    pytest.main()
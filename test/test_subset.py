@@ -0,0 +1,106 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import tree_facts
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from gedcom.parse import parse
+from gedcom.subset import extract_subset, select_branch
+from gedcom.write import write_gedcom
+from gedcom.cache import load_from_cache
+from main import main
+
+ROYAL92 = os.path.join(os.path.dirname(__file__), "..", "royal92.ged")
+
+
+def make_tree() -> FamilyTree:
+    """
+    G1 + G2 have P1 and U1. P1 + S1 have C1, who with S2 has D1. U1 + S3 have X1.
+    C1's birth cites @R1@, X1's birth cites @R2@.
+    """
+    families = [
+        ("@F1@", "@G1@", "@G2@", ["@P1@", "@U1@"]),
+        ("@F2@", "@P1@", "@S1@", ["@C1@"]),
+        ("@F3@", "@C1@", "@S2@", ["@D1@"]),
+        ("@F4@", "@U1@", "@S3@", ["@X1@"]),
+    ]
+    ids = {p for _, husb, wife, children in families for p in (husb, wife, *children)}
+    births = {}
+    for xref, source in (("@C1@", "@R1@"), ("@X1@", "@R2@")):
+        birth = Fact(1, GedcomTag.BIRT, "")
+        birth.sub_facts.append(Fact(2, GedcomTag.SOUR, source))
+        births[xref] = [birth]
+    facts = [Fact(0, GedcomTag.HEAD, "")]
+    facts += tree_facts(
+        families,
+        names={xref: f"{xref[1:3]} /Test/" for xref in ids},
+        sub_facts=births,
+        links=True,
+    )
+    for xref in ("@R1@", "@R2@"):
+        source = Fact(0, GedcomTag.SOUR, xref)
+        source.sub_facts.append(Fact(1, GedcomTag.TITL, f"Register {xref}"))
+        facts.append(source)
+    return FamilyTree(facts)
+
+
+def test_select_branch():
+    tree = make_tree()
+    assert select_branch(tree, ["@P1@"], 1, 1) == {
+        "@P1@",
+        "@G1@",
+        "@G2@",
+        "@C1@",
+        "@S1@",
+        "@S2@",
+    }
+    assert select_branch(tree, ["@P1@"], 0, 0, spouses=False) == {"@P1@"}
+    assert len(select_branch(tree, ["@G1@"])) == 10
+    assert select_branch(tree, ["@NOPE@"]) == set()
+
+
+def test_extract_subset(tmp_path):
+    tree = make_tree()
+    subset = extract_subset(tree, select_branch(tree, ["@P1@"], 1, 1))
+
+    assert set(subset.families) == {"@F1@", "@F2@", "@F3@"}
+    assert subset.families["@F1@"].children == ["@P1@"]
+    assert subset.families["@F3@"].children == []
+    assert subset.persons["@C1@"].fams == ["@F3@"]
+    assert set(subset.sources) == {"@R1@"}
+    assert subset.header is tree.header
+    # Facts are shared, links to the rest of the tree are left out
+    assert subset.persons["@C1@"].facts[1] is tree.persons["@C1@"].facts[1]
+    assert all(
+        f.value == "@F1@"
+        for f in subset.persons["@G1@"].facts
+        if f.tag in (GedcomTag.FAMS, GedcomTag.FAMC)
+    )
+    # The full tree is unchanged
+    assert tree.families["@F1@"].children == ["@P1@", "@U1@"]
+    assert len(tree.persons["@G1@"].fams) == 1
+
+    path = str(tmp_path / "branch.ged")
+    write_gedcom(subset, path)
+    copy = parse(path)
+    assert set(copy.persons) == set(subset.persons)
+    assert copy.families["@F2@"].children == ["@C1@"]
+    assert copy.sources["@R1@"].title == "Register @R1@"
+
+
+def test_branch_build_caches_the_full_tree(tmp_path):
+    options = {"validate": False, "chart_generations": 0, "workers": 1}
+    main(ROYAL92, str(tmp_path), branch=["@I1@"], branch_up=1, branch_down=1, **options)
+    persons = tmp_path / "persons"
+    branch_pages = len(list(persons.iterdir()))
+    assert len(load_from_cache(tmp_path).persons) == len(parse(ROYAL92).persons)
+
+    main(ROYAL92, str(tmp_path), use_cache=True, **options)
+    assert len(list(persons.iterdir())) > branch_pages
+
+
+if __name__ == "__main__":
+    pytest.main()
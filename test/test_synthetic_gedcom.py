@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tools")))
+
+import pytest
+from gedcom.parse import parse
+from synthetic_gedcom import write_synthetic_gedcom
+
+
+def test_generator_is_deterministic_and_parses(tmp_path):
+    first, second = tmp_path / "a.ged", tmp_path / "b.ged"
+    info = write_synthetic_gedcom(str(first), 500, intermarriage=0.5, depth=6, seed=3)
+    write_synthetic_gedcom(str(second), 500, intermarriage=0.5, depth=6, seed=3)
+    assert first.read_bytes() == second.read_bytes()
+    assert info["persons"] == 500
+
+    tree = parse(str(first))
+    assert len(tree.persons) == 500
+    assert len(tree.families) == info["families"]
+    assert len(tree.sources) == 5
+    linked = sum(1 for p in tree.persons.values() if p.famc or p.fams)
+    assert linked > 450
+    # Some couples are cousins, both with parents in the tree
+    assert any(
+        tree.persons[f.husb].famc and tree.persons[f.wife].famc
+        for f in tree.families.values()
+        if f.husb and f.wife
+    )
+
+
+def test_continuation_density(tmp_path):
+    path = tmp_path / "notes.ged"
+    write_synthetic_gedcom(str(path), 50, note_length=500, conc_density=0.0)
+    assert " CONC " not in path.read_text()
+    write_synthetic_gedcom(str(path), 50, note_length=500, conc_density=1.0)
+    text = path.read_text()
+    assert " CONC " in text and " CONT " in text
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from gedcom.tree import FamilyTree
+from gedcom.fact import Fact, GedcomTag
+from gedcom.parse import extract_fact
+from gedcom.timeline import build_timeline, timeline_of
+from wiki.templates.person_page import render_person_page
+
+
+def event(tag: GedcomTag, date: str | None = None, value: str = "") -> Fact:
+    fact = Fact(1, tag, value)
+    if date:
+        fact.sub_facts.append(Fact(2, GedcomTag.DATE, date))
+    return fact
+
+
+def test_facts_are_split_into_life_stages():
+    facts = [
+        event(GedcomTag.BIRT, "1 JAN 1900"),
+        event(GedcomTag.EDUC, "1918"),
+        event(GedcomTag.OCCU, "1919", "Baker"),
+        event(GedcomTag.RESI, "1965"),
+        event(GedcomTag.RETI, "1966"),
+        event(GedcomTag.BURI, "1980"),
+        event(GedcomTag.CENS, "1990"),
+        event(GedcomTag.NOTE, None, "undated"),
+        Fact(1, GedcomTag.FAMS, "@F1@"),
+    ]
+    timeline = build_timeline(facts, "1 JAN 1900", "1980")
+
+    assert timeline.birth_year == 1900
+    assert timeline.death_year == 1980
+    assert [f.tag for _, f in timeline.early] == [GedcomTag.BIRT, GedcomTag.EDUC]
+    assert [f.tag for _, f in timeline.mid] == [GedcomTag.OCCU, GedcomTag.RESI]
+    assert [f.tag for _, f in timeline.late] == [GedcomTag.RETI, GedcomTag.BURI]
+    # After death and undated; the family link is not an event
+    assert timeline.other == [(1990, facts[6]), (None, facts[7])]
+
+
+def test_without_birth_year_everything_is_other():
+    facts = [event(GedcomTag.OCCU, "1919"), event(GedcomTag.BURI, "1980")]
+    timeline = build_timeline(facts, None, None)
+    assert timeline.birth_year is None
+    assert timeline.death_year == datetime.now().year
+    assert [year for year, _ in timeline.other] == [1919, 1980]
+    assert not timeline.early and not timeline.mid and not timeline.late
+
+
+def test_persons_get_a_timeline_when_parsed():
+    indi = Fact(0, GedcomTag.INDI, "@I1@")
+    indi.sub_facts.append(Fact(1, GedcomTag.NAME, "Jane /Doe/"))
+    indi.sub_facts.append(event(GedcomTag.BIRT, "1850"))
+    indi.sub_facts.append(event(GedcomTag.OCCU, "1880", "Weaver"))
+    person = FamilyTree([indi]).persons["@I1@"]
+
+    assert person.timeline.birth_year == 1850
+    assert [f.value for _, f in person.timeline.mid] == ["Weaver"]
+
+    # People unpickled from an older cache have no timeline yet
+    del person.timeline
+    assert [f.value for _, f in timeline_of(person).mid] == ["Weaver"]
+
+
+def test_custom_tags_are_shown_on_the_person_page():
+    indi = extract_fact("0 @I1@ INDI")
+    for line in ("1 NAME Jane /Doe/", "1 _FSFTID LZ6X-9QK", "1 _UID 0123ABCD"):
+        indi.sub_facts.append(extract_fact(line))
+    tree = FamilyTree([indi])
+
+    html = render_person_page(tree, tree.persons["@I1@"])
+    assert "_FSFTID: LZ6X-9QK" in html
+    assert "0123ABCD" not in html  # known bookkeeping tags stay hidden
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import json
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from pipeline.scheduler import Pipeline
+from pipeline.trace import StageProfiler, Tracer
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_spans_and_counters_export(tmp_path):
+    tracer = Tracer()
+    pipeline = Pipeline(workers=2, tracer=tracer)
+
+    def parse(results):
+        with tracer.span("parse:lines", file="royal92.ged"):
+            tracer.count("records", 10)
+        tracer.count("records", 5)
+
+    pipeline.add("parse", parse)
+    pipeline.add("pages", lambda r: tracer.count("pages", 3), ["parse"])
+    pipeline.run()
+
+    assert tracer.counters == {"records": 15, "pages": 3}
+    assert set(tracer.totals()) == {"parse:lines", "stage:parse", "stage:pages"}
+
+    tracer.write_json(str(tmp_path / "trace.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    spans = {span["name"]: span for span in trace["spans"]}
+    assert spans["parse:lines"]["args"] == {"file": "royal92.ged"}
+    assert spans["stage:pages"]["start"] >= spans["stage:parse"]["start"]
+    assert trace["counters"]["records"] == 15
+
+    tracer.write_chrome_trace(str(tmp_path / "trace.chrome.json"))
+    events = json.loads((tmp_path / "trace.chrome.json").read_text())["traceEvents"]
+    phases = {event["ph"] for event in events}
+    assert phases == {"M", "X", "C"}
+    complete = [event for event in events if event["ph"] == "X"]
+    assert {event["cat"] for event in complete} == {"parse", "stage"}
+    assert all(event["dur"] >= 0 for event in complete)
+
+
+def test_stage_profiler_modes(tmp_path, capsys):
+    for mode, suffix in (("cprofile", ".prof"), ("sample", ".folded")):
+        profiler = StageProfiler(["render"], str(tmp_path), mode, interval=0.001)
+        pipeline = Pipeline(workers=1, tracer=Tracer(), profiler=profiler)
+        pipeline.add("render", lambda r: busy(0.05))
+        pipeline.add("other", lambda r: busy(0.01))
+        pipeline.run()
+        assert (tmp_path / f"render{suffix}").exists()
+        assert not (tmp_path / f"other{suffix}").exists()
+
+    folded = (tmp_path / "render.folded").read_text().splitlines()
+    assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert "busy" in folded[0]
+    assert "Profile of stage render" in capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        StageProfiler(["render"], str(tmp_path), "perf")
+
+
+if __name__ == "__main__":
+    pytest.main()
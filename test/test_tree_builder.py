@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from conftest import make_tree
+from gedcom.numbering import compute_numbering
+from graph.tree_builder import build_graph, tidy_layout
+from graph.tiles import write_tiles
+
+
+def test_intermarriage_emits_each_person_once():
+    # Cousins C1 and C2 marry, so R descends from G1 + G2 twice
+    families = [
+        ("@F1@", "@G1@", "@G2@", ["@P1@", "@P2@"]),
+        ("@F2@", "@P1@", "@S1@", ["@C1@"]),
+        ("@F3@", "@S2@", "@P2@", ["@C2@"]),
+        ("@F4@", "@C1@", "@C2@", ["@R@"]),
+    ]
+    ids = sorted({p for _, h, w, c in families for p in [h, w, *c]})
+
+    graph = build_graph(make_tree(families))
+    index = {pid: i for i, pid in enumerate(graph["ids"])}
+
+    assert sorted(graph["ids"]) == ids
+    edges = set(zip(graph["edges"][0::2], graph["edges"][1::2]))
+    assert (index["@C1@"], index["@R@"]) in edges
+    assert (index["@C2@"], index["@R@"]) in edges
+    assert len(edges) == 10
+
+    r = index["@R@"]
+    assert graph["parents"][r] in (index["@C1@"], index["@C2@"])
+    assert graph["generations"][r] == 3
+    assert graph["parents"][index["@G1@"]] == -1
+
+
+def test_nodes_are_labelled_with_their_numbers():
+    # R's parents F and M, and R's child K
+    families = [("@F1@", "@F@", "@M@", ["@R@"]), ("@F2@", "@R@", None, ["@K@"])]
+    names = {xref: xref.strip("@") for xref in ("@F@", "@M@", "@R@", "@K@")}
+    tree = make_tree(families, names=names, links=True)
+
+    graph = build_graph(tree)
+    assert dict(zip(graph["ids"], graph["names"]))["@R@"] == "R (@R@)"
+
+    graph = build_graph(tree, compute_numbering(tree, ["@R@"]))
+    assert dict(zip(graph["ids"], graph["names"])) == {
+        "@F@": "Sosa 2 · F (@F@)",
+        "@M@": "Sosa 3 · M (@M@)",
+        "@R@": "Sosa 1 · 1 · R (@R@)",
+        "@K@": "1.1 · K (@K@)",
+    }
+
+
+def test_tidy_layout_separates_and_centres():
+    # Forest: R1 has children A (with kids A1, A2, A3) and B (with kid B1); R2 is alone
+    ids = ["R1", "R2", "A", "B", "A1", "A2", "A3", "B1"]
+    parents = [-1, -1, 0, 0, 2, 2, 2, 3]
+    generations = [0, 0, 1, 1, 2, 2, 2, 2]
+    graph = {"ids": ids, "names": ids, "parents": parents, "generations": generations}
+    xs = tidy_layout(graph)
+    x = dict(zip(ids, xs))
+
+    assert min(xs) == 0
+    assert x["A2"] - x["A1"] == x["A3"] - x["A2"] == 1
+    assert x["B1"] - x["A3"] >= 2  # cousins keep a wider gap
+    assert x["A"] == x["A2"] and x["B"] == x["B1"]
+    assert x["R1"] == (x["A"] + x["B"]) / 2
+    assert x["R2"] > x["R1"]
+
+
+def test_tiles_cover_every_node(tmp_path):
+    ids = [f"@I{i}@" for i in range(6)]
+    graph = {
+        "ids": ids,
+        "names": ids,
+        "parents": [-1, 0, 0, 1, 1, 2],
+        "generations": [0, 1, 1, 2, 2, 2],
+        "edges": [0, 1, 0, 2, 1, 3, 1, 4, 2, 5],
+    }
+    assert write_tiles(graph, tidy_layout(graph), str(tmp_path)) > 0
+
+    tiles_dir = tmp_path / "tiles"
+    assert (tiles_dir / "index.js").exists()
+    top = max(int(p.name) for p in tiles_dir.iterdir() if p.is_dir())
+    names = "".join(
+        p.read_text(encoding="utf-8") for p in (tiles_dir / str(top)).iterdir()
+    )
+    assert all(f'"{xref}"' in names for xref in ids)
+
+
+def test_tiles_hold_edges_whose_endpoints_are_off_screen(tmp_path):
+    ids = ["@I0@", "@I1@", "@I2@"]
+    graph = {
+        "ids": ids,
+        "names": ids,
+        "parents": [-1, 0, 0],
+        "generations": [0, 1, 1],
+        "edges": [0, 1, 0, 2],
+    }
+    # The second child sits 40 siblings away, far past the first tile
+    write_tiles(graph, [0, 0, 40], str(tmp_path))
+
+    tiles_dir = tmp_path / "tiles"
+    top = max(int(p.name) for p in tiles_dir.iterdir() if p.is_dir())
+    # A tile in the middle of the edge, with neither endpoint in it
+    middle = (tiles_dir / str(top) / "5_0.js").read_text(encoding="utf-8")
+    assert '"n":[]' in middle
+    assert "[0,0,6400,120,0]" in middle
+
+
+if __name__ == "__main__":
+    pytest.main()
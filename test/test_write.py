@@ -0,0 +1,103 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from gedcom.fact import Fact, GedcomTag
+from gedcom.parse import parse
+from gedcom.tree import FamilyTree
+from gedcom.write import LINE_LENGTH, write_gedcom
+
+ROYAL92 = os.path.join(os.path.dirname(__file__), "..", "royal92.ged")
+
+
+def fact_tuple(fact: Fact) -> tuple:
+    return (fact.tag, fact.value, [fact_tuple(sub) for sub in fact.sub_facts])
+
+
+def tree_tuple(tree: FamilyTree) -> tuple:
+    persons = [
+        (p.xref_id, p.name, p.gedcom_names, p.famc, p.fams, [*map(fact_tuple, p.facts)])
+        for p in tree.persons.values()
+    ]
+    families = [
+        (f.xref_id, f.husb, f.wife, f.children, [*map(fact_tuple, f.facts)])
+        for f in tree.families.values()
+    ]
+    sources = [
+        (s.xref_id, s.title, s.origin, s.publisher, [*map(fact_tuple, s.facts)])
+        for s in tree.sources.values()
+    ]
+    return persons, families, sources, [*map(fact_tuple, tree.data)]
+
+
+def test_royal92_round_trip(tmp_path):
+    tree = parse(ROYAL92)
+    first, second = str(tmp_path / "first.ged"), str(tmp_path / "second.ged")
+    lines = write_gedcom(tree, first, "ANSEL")
+    copy = parse(first)
+    assert tree_tuple(copy) == tree_tuple(tree)
+    assert copy.persons["@I1@"].gedcom_names == ["Victoria  /Hanover/"]
+    assert copy.persons["@I1@"].name == "Victoria Hanover"
+
+    # The file written is the file read, byte for byte
+    with open(ROYAL92, "rb") as original, open(first, "rb") as written:
+        assert written.read() == original.read()
+    with open(ROYAL92, "rb") as original:
+        assert lines == original.read().count(b"\n")
+
+    write_gedcom(copy, second)
+    write_gedcom(parse(second), first)
+    with open(first, "rb") as a, open(second, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_long_values_are_split(tmp_path):
+    path = tmp_path / "notes.ged"
+    note = "word " * 200 + "\n\nsecond  paragraph ending in spaces  \nend"
+    path.write_text(
+        "0 HEAD\n0 @I1@ INDI\n1 NAME Ann /Lee/\n0 @S1@ SOUR\n1 TITL Register\n0 TRLR\n"
+    )
+    tree = parse(str(path))
+    tree.sources["@S1@"].facts.append(Fact(1, GedcomTag.NOTE, note))
+
+    write_gedcom(tree, str(path), "UNICODE")
+    text = path.read_text(encoding="utf-16")
+    assert max(len(line) for line in text.splitlines()) <= LINE_LENGTH
+    assert " CONC " in text and "2 CONT\n" in text
+    assert "1 CHAR UNICODE" in text
+
+    copy = parse(str(path))
+    assert copy.sources["@S1@"].facts[0].value == note.rstrip()
+    assert copy.sources["@S1@"].title == "Register"
+    assert copy.persons["@I1@"].gedcom_names == ["Ann /Lee/"]
+
+
+def test_continued_records_keep_their_xref(tmp_path):
+    path = tmp_path / "note.ged"
+    path.write_text(
+        "0 HEAD\n0 @N1@ NOTE First part\n1 CONC  second part\n1 CONT third line\n"
+        "0 @N2@ NOTE\n1 CONT\n1 CONT after two breaks\n0 TRLR\n"
+    )
+    tree = parse(str(path))
+    values = [fact.value for fact in tree.data]
+    assert values == [
+        "@N1@ NOTE First part second part\nthird line",
+        "@N2@ NOTE\n\nafter two breaks",
+    ]
+
+    write_gedcom(tree, str(path))
+    assert path.read_text().splitlines()[2:8] == [
+        "0 @N1@ NOTE First part second part",
+        "1 CONT third line",
+        "0 @N2@ NOTE",
+        "1 CONT",
+        "1 CONT after two breaks",
+        "0 TRLR",
+    ]
+    assert [fact.value for fact in parse(str(path)).data] == values
+
+
+if __name__ == "__main__":
+    pytest.main()
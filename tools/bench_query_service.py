@@ -0,0 +1,122 @@
+# Load generator for src/service/server.py, reports p50/p99 latency under concurrent load
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from service.server import make_server, load_tree
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def build_requests(tree, count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    ids = list(tree.persons)
+    names = [p.name.split()[0] for p in tree.persons.values() if p.name]
+    targets = []
+    for _ in range(count):
+        kind = rng.random()
+        pid = quote(rng.choice(ids))
+        if kind < 0.4:
+            targets.append(f"/person/{pid}")
+        elif kind < 0.7:
+            name = rng.choice(names)
+            if rng.random() < 0.3 and len(name) > 3:
+                name = name[:-1]  # exercise prefix/fuzzy matching
+            targets.append(f"/search?q={quote(name)}")
+        elif kind < 0.8:
+            targets.append(f"/ancestors/{pid}?depth=5")
+        elif kind < 0.9:
+            targets.append(f"/descendants/{pid}?depth=3")
+        else:
+            other = quote(rng.choice(ids))
+            targets.append(f"/relationship?from={pid}&to={other}")
+    return targets
+
+
+def run(host: str, port: int, targets: list[str], concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    chunks = [targets[i::concurrency] for i in range(concurrency)]
+
+    def worker(chunk: list[str]) -> None:
+        conn = http.client.HTTPConnection(host, port)
+        local = []
+        for target in chunk:
+            start = time.perf_counter()
+            conn.request("GET", target)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, chunks))
+    return latencies
+
+
+def main(args) -> None:
+    tree = load_tree(args.output_path, args.ged_path)
+    if tree is None:
+        print("No cache found, run main.py first or pass --ged_path")
+        return
+
+    targets = build_requests(tree, args.requests, args.seed)
+    results = {}
+    for concurrency in args.concurrency:
+        # A fresh server per level, so no level runs against a cache warmed by another
+        start = time.perf_counter()
+        server = make_server(tree, "127.0.0.1", 0, args.cache_entries)
+        build = time.perf_counter() - start
+        host, port = server.server_address[0], server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        start = time.perf_counter()
+        latencies = sorted(run(host, port, targets, concurrency))
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        server.server_close()
+        cache = server.service.cache
+        results[str(concurrency)] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3),
+            "cache_hit_rate": round(cache.hits / max(1, cache.hits + cache.misses), 3),
+            "index_build_s": round(build, 2),
+        }
+        print(f"concurrency={concurrency}: {results[str(concurrency)]}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"tree": repr(tree), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the query service")
+    parser.add_argument("--output_path", type=str, default="out/")
+    parser.add_argument("--ged_path", type=str, default="royal92.ged")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--cache_entries", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, help="Write results as JSON to this file")
+    main(parser.parse_args())
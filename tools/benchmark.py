@@ -0,0 +1,284 @@
+# Times each build stage on synthetic trees of growing size, results go to a JSON file
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from gedcom.tree import FamilyTree
+from gedcom.parse import parse_facts
+from gedcom.cache import write_to_cache, load_from_cache
+from gedcom.write import write_gedcom
+from gedcom.data_validation import generate_validation_html
+from graph.tree_builder import build_graph, tidy_layout
+from graph.charts import pedigree_layout, descendant_layout
+from wiki.templates.index_page import render_index_page, sort_persons
+from wiki.templates.person_page import render_person_page
+from wiki.templates.family_page import render_family_page
+from wiki.templates.source_page import render_source_page
+from wiki.search_index import write_search_index
+from gedcom.fact import GedcomTag
+from synthetic_gedcom import LINE_WIDTH, write_synthetic_gedcom
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def timed(results: dict, name: str, fn, items: int | None = None):
+    gc.collect()
+    start = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - start
+    entry = {"seconds": round(seconds, 4)}
+    if items:
+        entry["items"] = items
+        entry["per_item_ms"] = round(1000 * seconds / items, 4)
+    results[name] = entry
+    print(f"  {name:<16} {seconds:8.3f}s" + (f"  ({items:,} items)" if items else ""))
+    return value
+
+
+def sample(values: list, limit: int) -> list:
+    return values[:limit] if limit else values
+
+
+def bench_tree(path: str, render_sample: int, work_dir: str) -> dict:
+    stages: dict = {}
+    facts = timed(stages, "parse", lambda: parse_facts(path))
+    tree = timed(stages, "tree", lambda: FamilyTree(facts))
+    del facts
+
+    timed(stages, "validation", lambda: generate_validation_html(tree))
+    sorted_persons = timed(stages, "sort_persons", lambda: sort_persons(tree))
+    timed(stages, "render_index", lambda: render_index_page(tree, sorted_persons))
+    timed(stages, "search_index", lambda: write_search_index(work_dir, sorted_persons))
+
+    persons = sample(list(tree.persons.values()), render_sample)
+    families = sample(list(tree.families.values()), render_sample)
+    sources = sample(list(tree.sources.values()), render_sample)
+    timed(
+        stages,
+        "render_person",
+        lambda: [render_person_page(tree, p) for p in persons],
+        len(persons),
+    )
+    timed(
+        stages,
+        "render_family",
+        lambda: [render_family_page(tree, f) for f in families],
+        len(families),
+    )
+    timed(
+        stages,
+        "render_source",
+        lambda: [render_source_page(tree, s) for s in sources],
+        len(sources),
+    )
+    timed(
+        stages,
+        "charts",
+        lambda: [
+            (pedigree_layout(tree, p.xref_id, 4), descendant_layout(tree, p.xref_id, 4))
+            for p in persons
+        ],
+        len(persons),
+    )
+
+    graph = timed(stages, "graph_build", lambda: build_graph(tree))
+    timed(stages, "graph_layout", lambda: tidy_layout(graph))
+    del graph
+
+    export_path = os.path.join(work_dir, "export.ged")
+    timed(stages, "export", lambda: write_gedcom(tree, export_path))
+    os.remove(export_path)
+    timed(stages, "cache_save", lambda: write_to_cache(tree, work_dir))
+    stages["cache_save"]["bytes"] = os.path.getsize(os.path.join(work_dir, "cache.pkl"))
+    counts = {
+        "persons": len(tree.persons),
+        "families": len(tree.families),
+        "sources": len(tree.sources),
+    }
+    del tree
+    timed(stages, "cache_load", lambda: load_from_cache(work_dir))
+    return {**counts, "stages": stages}
+
+
+def bench_long_notes(work_dir: str, note_lines: int, notes: int) -> dict:
+    """Parse people whose notes run over `note_lines` CONC/CONT lines each."""
+    path = os.path.join(work_dir, f"long_notes_{notes}_{note_lines}.ged")
+    if not os.path.exists(path):
+        write_synthetic_gedcom(
+            path,
+            notes,
+            note_length=note_lines * LINE_WIDTH,
+            conc_density=1.0,
+            depth=2,
+        )
+    stages: dict = {}
+    facts = timed(stages, "parse_long_notes", lambda: parse_facts(path), notes)
+    chars = sum(
+        len(sub.value)
+        for record in facts
+        for sub in record.sub_facts
+        if sub.tag == GedcomTag.NOTE
+    )
+    stages["parse_long_notes"]["note_chars"] = chars
+    return {"notes": notes, "note_lines": note_lines, "stages": stages}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    old: dict, new: dict, threshold: float, min_seconds: float = 0.05
+) -> list[str]:
+    """
+    Stages that got more than `threshold` slower, per item where sampled. Stages that
+    took under `min_seconds` before are too noisy to judge and only printed.
+    """
+    regressions = []
+    for size, result in new["results"].items():
+        before = old["results"].get(size)
+        if not before:
+            continue
+        label = f"{int(size):,} persons" if size.isdigit() else size
+        print(f"\n{label} vs {old['meta'].get('commit')}:")
+        for name, entry in result["stages"].items():
+            then = before["stages"].get(name)
+            if not then:
+                continue
+            key = "per_item_ms" if "per_item_ms" in entry else "seconds"
+            if not then.get(key):
+                continue
+            ratio = entry[key] / then[key]
+            flag = ""
+            if ratio > 1 + threshold and then["seconds"] >= min_seconds:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}:{name}")
+            print(
+                f"  {name:<16} {then[key]:10.4f} -> {entry[key]:10.4f} {ratio:6.2f}x{flag}"
+            )
+    return regressions
+
+
+def main(args) -> int:
+    os.makedirs(args.work_dir, exist_ok=True)
+    generator_options = {
+        "facts_per_person": args.facts_per_person,
+        "note_length": args.note_length,
+        "conc_density": args.conc_density,
+        "intermarriage": args.intermarriage,
+        "depth": args.depth,
+        "seed": args.seed,
+    }
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "render_sample": args.render_sample,
+            "generator": generator_options,
+        },
+        "results": {},
+    }
+
+    for size in args.sizes:
+        # Generated files are reused between runs, the generator is deterministic
+        key = "_".join(str(v) for v in generator_options.values())
+        path = os.path.join(args.work_dir, f"synthetic_{size}_{key}.ged")
+        if not os.path.exists(path):
+            start = time.perf_counter()
+            info = write_synthetic_gedcom(path, size, **generator_options)
+            print(f"Generated {path} in {time.perf_counter() - start:.1f}s: {info}")
+
+        print(f"{size:,} persons ({os.path.getsize(path) / 1e6:.0f} MB):")
+        with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+            result = bench_tree(path, args.render_sample, work_dir)
+        result["file_bytes"] = os.path.getsize(path)
+        result["max_rss_mb"] = round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        )
+        report["results"][str(size)] = result
+
+    if args.note_lines:
+        print(f"{args.notes} notes of {args.note_lines:,} lines:")
+        report["results"]["long_notes"] = bench_long_notes(
+            args.work_dir, args.note_lines, args.notes
+        )
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(
+                json.load(f), report, args.threshold, args.min_seconds
+            )
+        if regressions:
+            print(f"\n{len(regressions)} stages regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the build on synthetic trees"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--work_dir", type=str, default="out/bench")
+    parser.add_argument("--out", type=str, default="out/bench/results.json")
+    parser.add_argument(
+        "--compare", type=str, help="Earlier results file to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown ratio above which --compare reports a regression",
+    )
+    parser.add_argument(
+        "--min_seconds",
+        type=float,
+        default=0.05,
+        help="Stages faster than this are not reported as regressions",
+    )
+    parser.add_argument(
+        "--render_sample",
+        type=int,
+        default=2000,
+        help="Pages per renderer to time, 0 renders every record",
+    )
+    parser.add_argument(
+        "--note_lines",
+        type=int,
+        default=10_000,
+        help="Also time parsing notes of this many CONC/CONT lines, 0 skips it",
+    )
+    parser.add_argument("--notes", type=int, default=20, help="Notes for --note_lines")
+    parser.add_argument("--facts_per_person", type=int, default=3)
+    parser.add_argument("--note_length", type=int, default=200)
+    parser.add_argument("--conc_density", type=float, default=0.5)
+    parser.add_argument("--intermarriage", type=float, default=0.05)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,277 @@
+# Deterministic synthetic GEDCOM generator for benchmarks and scaling tests
+import argparse
+import random
+from typing import TextIO
+
+# fmt: off
+FIRST_NAMES = [
+    "John", "Mary", "William", "Elizabeth", "Henry", "Anne", "Charles", "Margaret",
+    "Edward", "Catherine", "George", "Jane", "Thomas", "Isabel", "Richard", "Alice",
+    "Robert", "Eleanor", "James", "Joan", "Louis", "Sophia", "Frederick", "Maria",
+]
+SURNAMES = [
+    "Smith", "Tudor", "Stuart", "York", "Windsor", "Hanover", "Bourbon", "Habsburg",
+    "Valois", "Plantagenet", "Wittelsbach", "Oldenburg", "Savoy", "Orange", "Wettin",
+]
+PLACES = [
+    "London, England", "Paris, France", "Vienna, Austria", "Madrid, Spain",
+    "Berlin, Prussia", "Copenhagen, Denmark", "Turin, Savoy", "Edinburgh, Scotland",
+]
+# fmt: on
+OCCUPATIONS = ["Farmer", "Weaver", "Baker", "Clerk", "Soldier", "Merchant", "Priest"]
+EXTRA_EVENTS = ["CHR", "OCCU", "RESI", "EDUC", "CENS", "EMIG", "BURI"]
+WORDS = (
+    "the family lived in the parish for many years and records of the household "
+    "appear in several registers letters and wills of the period"
+).split()
+MONTHS = "JAN FEB MAR APR MAY JUN JUL AUG SEP OCT NOV DEC".split()
+LINE_WIDTH = 72  # value characters per CONC/CONT line
+
+
+class SyntheticGedcom:
+    """
+    Writes a GEDCOM file of `persons` people as independent lineages, each `depth`
+    generations deep. Every family has 1-4 children and each child marries with
+    probability `marriage_rate`; with probability `intermarriage` the spouse is an
+    unmarried cousin from the same generation of the lineage instead of someone new,
+    which is what makes real royal trees a graph instead of a tree.
+
+    Each person gets a birth, a death for earlier generations and `facts_per_person`
+    further events. With `note_length` > 0 they also get a note of that many
+    characters, split over CONC/CONT lines with probability `conc_density`.
+    The same arguments and seed always produce the same file.
+    """
+
+    def __init__(
+        self,
+        persons: int = 10_000,
+        facts_per_person: int = 3,
+        note_length: int = 200,
+        conc_density: float = 0.5,
+        intermarriage: float = 0.05,
+        depth: int = 12,
+        marriage_rate: float = 0.7,
+        sources: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.persons = persons
+        self.facts_per_person = facts_per_person
+        self.note_length = note_length
+        self.conc_density = conc_density
+        self.intermarriage = intermarriage
+        self.depth = depth
+        self.marriage_rate = marriage_rate
+        self.sources = persons // 100 if sources is None else sources
+        self.rng = random.Random(seed)
+        self.person_count = 0
+        self.family_count = 0
+        self.lines = 0
+
+    def _write(self, out: TextIO, lines: list[str]) -> None:
+        out.write("\n".join(lines))
+        out.write("\n")
+        self.lines += len(lines)
+
+    def _date(self, year: int) -> str:
+        rng = self.rng
+        return f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {year}"
+
+    def _note(self, level: int) -> list[str]:
+        rng = self.rng
+        words: list[str] = []
+        length = 0
+        while length < self.note_length:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        text = " ".join(words)[: self.note_length]
+        if rng.random() >= self.conc_density:
+            return [f"{level} NOTE {text}"]
+        # CONT starts a new line of the note, CONC continues the current one
+        lines = [f"{level} NOTE {text[:LINE_WIDTH]}"]
+        for i in range(LINE_WIDTH, len(text), LINE_WIDTH):
+            tag = "CONT" if rng.random() < 0.3 else "CONC"
+            lines.append(f"{level + 1} {tag} {text[i : i + LINE_WIDTH]}")
+        return lines
+
+    def _person(
+        self,
+        xref: str,
+        sex: str,
+        surname: str,
+        birth_year: int,
+        famc: str | None,
+        fams: list[str],
+    ) -> list[str]:
+        rng = self.rng
+        given = rng.choice(FIRST_NAMES)
+        lines = [
+            f"0 {xref} INDI",
+            f"1 NAME {given} /{surname}/",
+            f"1 SEX {sex}",
+            "1 BIRT",
+            f"2 DATE {self._date(birth_year)}",
+            f"2 PLAC {rng.choice(PLACES)}",
+        ]
+        if self.sources:
+            lines.append(f"2 SOUR @S{rng.randrange(self.sources) + 1}@")
+        if birth_year < 1930:
+            lines += ["1 DEAT", f"2 DATE {self._date(birth_year + rng.randint(1, 90))}"]
+        for _ in range(self.facts_per_person):
+            tag = rng.choice(EXTRA_EVENTS)
+            value = f" {rng.choice(OCCUPATIONS)}" if tag == "OCCU" else ""
+            lines += [
+                f"1 {tag}{value}",
+                f"2 DATE {self._date(birth_year + rng.randint(0, 70))}",
+                f"2 PLAC {rng.choice(PLACES)}",
+            ]
+        if self.note_length:
+            lines += self._note(1)
+        if famc:
+            lines.append(f"1 FAMC {famc}")
+        lines += [f"1 FAMS {fam}" for fam in fams]
+        return lines
+
+    def _lineage(self, out: TextIO) -> None:
+        """One founding couple and `depth` generations of their descendants."""
+        rng = self.rng
+        surname = rng.choice(SURNAMES)
+        base_year = 1500 + rng.randint(0, 200)
+
+        def new_id() -> str:
+            self.person_count += 1
+            return f"@I{self.person_count}@"
+
+        # (sex, surname, birth year, famc) by xref of people whose record is not
+        # written yet, and the families they are a spouse in
+        people: dict[str, tuple[str, str, int, str | None]] = {}
+        spouse_in: dict[str, list[str]] = {}
+
+        def flush(xref: str) -> None:
+            sex, name, year, famc = people.pop(xref)
+            self._write(
+                out, self._person(xref, sex, name, year, famc, spouse_in.pop(xref, []))
+            )
+
+        husband, wife = new_id(), new_id()
+        people[husband] = ("M", surname, base_year, None)
+        people[wife] = ("F", rng.choice(SURNAMES), base_year + 2, None)
+        couples = [(husband, wife)]
+
+        for generation in range(self.depth):
+            year = base_year + 28 * (generation + 1)
+            unmarried: list[str] = []
+            next_couples: list[tuple[str, str]] = []
+            for husband, wife in couples:
+                if self.person_count >= self.persons:
+                    break
+                self.family_count += 1
+                fam = f"@F{self.family_count}@"
+                spouse_in.setdefault(husband, []).append(fam)
+                spouse_in.setdefault(wife, []).append(fam)
+                lines = [f"0 {fam} FAM", f"1 HUSB {husband}", f"1 WIFE {wife}"]
+                lines += ["1 MARR", f"2 DATE {self._date(year - 3)}"]
+                for _ in range(rng.randint(1, 4)):
+                    if self.person_count >= self.persons:
+                        break
+                    child = new_id()
+                    sex = rng.choice("MF")
+                    people[child] = (
+                        sex,
+                        people[husband][1],
+                        year + rng.randint(0, 15),
+                        fam,
+                    )
+                    lines.append(f"1 CHIL {child}")
+                    if (
+                        generation + 1 < self.depth
+                        and rng.random() < self.marriage_rate
+                    ):
+                        unmarried.append(child)
+                self._write(out, lines)
+
+            # Parents are complete once their family is written
+            for husband, wife in couples:
+                if husband in people:
+                    flush(husband)
+                if wife in people:
+                    flush(wife)
+
+            rng.shuffle(unmarried)
+            while unmarried:
+                child = unmarried.pop()
+                sex = people[child][0]
+                cousin = next(
+                    (i for i, other in enumerate(unmarried) if people[other][0] != sex),
+                    None,
+                )
+                if cousin is not None and rng.random() < self.intermarriage:
+                    spouse = unmarried.pop(cousin)
+                elif self.person_count < self.persons:
+                    spouse = new_id()
+                    people[spouse] = (
+                        "F" if sex == "M" else "M",
+                        rng.choice(SURNAMES),
+                        people[child][2],
+                        None,
+                    )
+                else:
+                    continue
+                pair = (child, spouse) if sex == "M" else (spouse, child)
+                next_couples.append(pair)
+            couples = next_couples
+            if not couples:
+                break
+
+        for xref in list(people):
+            flush(xref)
+
+    def write(self, path: str) -> dict:
+        """Write the file. :return: the number of persons, families and lines written."""
+        with open(path, "w", encoding="utf-8", newline="\n") as out:
+            self._write(
+                out,
+                [
+                    "0 HEAD",
+                    "1 SOUR synthetic_gedcom",
+                    "1 GEDC",
+                    "2 VERS 5.5.1",
+                    "1 CHAR UTF-8",
+                ],
+            )
+            for i in range(self.sources):
+                self._write(
+                    out, [f"0 @S{i + 1}@ SOUR", f"1 TITL Parish register {i + 1}"]
+                )
+            while self.person_count < self.persons:
+                self._lineage(out)
+            self._write(out, ["0 TRLR"])
+        return {
+            "persons": self.person_count,
+            "families": self.family_count,
+            "sources": self.sources,
+            "lines": self.lines,
+        }
+
+
+def write_synthetic_gedcom(path: str, persons: int = 10_000, **options) -> dict:
+    return SyntheticGedcom(persons, **options).write(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic GEDCOM file")
+    parser.add_argument("path", type=str, help="File to write")
+    parser.add_argument("--persons", type=int, default=10_000)
+    parser.add_argument("--facts_per_person", type=int, default=3)
+    parser.add_argument("--note_length", type=int, default=200)
+    parser.add_argument("--conc_density", type=float, default=0.5)
+    parser.add_argument("--intermarriage", type=float, default=0.05)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--marriage_rate", type=float, default=0.7)
+    parser.add_argument("--sources", type=int, help="Default: one per 100 persons")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    options = vars(args)
+    path = options.pop("path")
+    print(write_synthetic_gedcom(path, **options))